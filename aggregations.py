@@ -0,0 +1,63 @@
+import pandas as pd
+
+# Same placeholders analyze_netflix_trends.main used to fill in pandas
+UNKNOWN_COUNTRY = 'Unknown'
+UNCATEGORIZED_GENRE = 'Uncategorized'
+
+COUNTRY = f"COALESCE(country, '{UNKNOWN_COUNTRY}')"
+GENRE = f"COALESCE(genre, '{UNCATEGORIZED_GENRE}')"
+
+def yearly_type_counts(conn):
+    """Titles per release year (rows) and type (columns)."""
+    counts = pd.read_sql_query("""
+        SELECT release_year, type, COUNT(*) AS titles
+        FROM netflix_titles
+        WHERE release_year IS NOT NULL AND type IS NOT NULL
+        GROUP BY release_year, type
+    """, conn)
+    return counts.pivot(index='release_year', columns='type', values='titles').fillna(0).astype(int)
+
+def yearly_genre_counts(conn):
+    """Titles per release year (rows) and primary genre (columns)."""
+    counts = pd.read_sql_query(f"""
+        SELECT release_year, {GENRE} AS genre, COUNT(*) AS titles
+        FROM netflix_titles
+        WHERE release_year IS NOT NULL
+        GROUP BY release_year, {GENRE}
+    """, conn)
+    return counts.pivot(index='release_year', columns='genre', values='titles').fillna(0).astype(int)
+
+def country_genre_awards(conn):
+    """Mean awards per country (rows) and genre (columns)."""
+    awards = pd.read_sql_query(f"""
+        SELECT {COUNTRY} AS country, {GENRE} AS genre, AVG(awards) AS awards
+        FROM netflix_titles
+        GROUP BY {COUNTRY}, {GENRE}
+    """, conn)
+    return awards.pivot(index='country', columns='genre', values='awards')
+
+def genre_award_stats(conn, min_titles=10):
+    """Mean and count of awards per genre, for genres with enough rated titles."""
+    return pd.read_sql_query(f"""
+        SELECT {GENRE} AS genre, AVG(awards) AS mean, COUNT(awards) AS count
+        FROM netflix_titles
+        GROUP BY {GENRE}
+        HAVING COUNT(awards) >= ?
+        ORDER BY genre
+    """, conn, params=(min_titles,))
+
+def top_country_titles(conn, limit=10):
+    """Title-level rows for the countries with the most titles."""
+    return pd.read_sql_query(f"""
+        WITH top_countries AS (
+            SELECT {COUNTRY} AS country
+            FROM netflix_titles
+            GROUP BY {COUNTRY}
+            ORDER BY COUNT(*) DESC
+            LIMIT ?
+        )
+        SELECT title, {COUNTRY} AS country, release_year, political_context_score,
+               {GENRE} AS genre, awards
+        FROM netflix_titles
+        WHERE {COUNTRY} IN (SELECT country FROM top_countries)
+    """, conn, params=(limit,))
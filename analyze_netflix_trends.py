@@ -1,38 +1,21 @@
 import sqlite3
-import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
 import seaborn as sns
 import matplotlib.pyplot as plt
+import aggregations
 
 # Configuration
 DB_PATH = "netflix_titles.db"
 
-def load_data():
-    """Load data from SQLite database into a pandas DataFrame."""
-    conn = sqlite3.connect(DB_PATH)
-    query = """
-    SELECT 
-        show_id, type, title, country, date_added, release_year,
-        rating, duration, listed_in, description, awards,
-        political_context_score, genre
-    FROM netflix_titles
-    """
-    df = pd.read_sql_query(query, conn)
-    conn.close()
-    return df
-
-def create_content_timeline(df):
-    """Create content trend timeline visualization."""
+def create_content_timeline(yearly_type, yearly_genre):
+    """Create content trend timeline visualization from year x type / year x genre counts."""
     # Content volume by year
     fig = make_subplots(rows=2, cols=1,
                        subplot_titles=('Content Volume by Year and Type',
                                      'Genre Distribution Over Time'))
     
-    # Content volume by type
-    yearly_type = df.groupby(['release_year', 'type']).size().unstack(fill_value=0)
-    
     # Plot content volume
     for content_type in yearly_type.columns:
         fig.add_trace(
@@ -41,9 +24,6 @@ def create_content_timeline(df):
             row=1, col=1
         )
     
-    # Genre distribution
-    yearly_genre = df.groupby(['release_year', 'genre']).size().unstack(fill_value=0)
-    
     # Plot genre distribution
     for genre in yearly_genre.columns:
         fig.add_trace(
@@ -55,11 +35,8 @@ def create_content_timeline(df):
     fig.update_layout(height=800, title_text="Netflix Content Trends Over Time")
     fig.write_html("content_timeline.html")
 
-def create_country_genre_matrix(df):
+def create_country_genre_matrix(awards_matrix):
     """Create country x genre x awards matrix visualization."""
-    # Calculate average awards per genre per country
-    awards_matrix = df.groupby(['country', 'genre'])['awards'].mean().unstack()
-    
     # Create heatmap
     plt.figure(figsize=(15, 10))
     sns.heatmap(awards_matrix, annot=True, cmap='YlOrRd', fmt='.1f')
@@ -69,13 +46,10 @@ def create_country_genre_matrix(df):
     plt.close()
 
 def analyze_political_context(df):
-    """Analyze content in political context."""
-    # Filter for countries with significant data
-    main_countries = df['country'].value_counts().nlargest(10).index
-    
+    """Analyze content in political context (df holds the main countries' titles)."""
     # Create visualization
     fig = px.scatter(
-        df[df['country'].isin(main_countries)],
+        df,
         x='release_year',
         y='political_context_score',
         color='genre',
@@ -86,12 +60,8 @@ def analyze_political_context(df):
     
     fig.write_html("political_context.html")
 
-def analyze_genre_performance(df):
-    """Analyze genre performance and awards."""
-    # Awards per genre
-    genre_awards = df.groupby('genre')['awards'].agg(['mean', 'count']).reset_index()
-    genre_awards = genre_awards[genre_awards['count'] >= 10]  # Filter for genres with enough data
-    
+def analyze_genre_performance(genre_awards):
+    """Analyze genre performance and awards (mean/count per genre)."""
     fig = px.bar(
         genre_awards,
         x='genre',
@@ -103,18 +73,16 @@ def analyze_genre_performance(df):
     fig.write_html("genre_awards.html")
 
 def main():
-    # Load data
-    df = load_data()
-    
-    # Clean data
-    df['country'] = df['country'].fillna('Unknown')
-    df['genre'] = df['genre'].fillna('Uncategorized')
+    # Let SQLite do the grouping; only the small result frames come back
+    conn = sqlite3.connect(DB_PATH)
     
     # Create visualizations
-    create_content_timeline(df)
-    create_country_genre_matrix(df)
-    analyze_political_context(df)
-    analyze_genre_performance(df)
+    create_content_timeline(aggregations.yearly_type_counts(conn), aggregations.yearly_genre_counts(conn))
+    create_country_genre_matrix(aggregations.country_genre_awards(conn))
+    analyze_political_context(aggregations.top_country_titles(conn, limit=10))
+    analyze_genre_performance(aggregations.genre_award_stats(conn, min_titles=10))
+    
+    conn.close()
     
     print("Analysis complete. Check the output files for visualizations.")
 
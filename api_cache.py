@@ -0,0 +1,175 @@
+import hashlib
+import os
+import time
+import threading
+from collections import OrderedDict
+from datetime import datetime, timezone
+from functools import wraps
+
+from flask import Response, request
+
+from compression import MIN_COMPRESS_SIZE, choose_encoding, compress
+
+class ResponseCache:
+    """Bounded in-process cache of serialized API responses.
+
+    Entries are keyed by endpoint path and query string. The whole cache is
+    dropped as soon as any watched file (the SQLite database and the dashboard
+    preferences JSON) changes, so responses never outlive the data they came from.
+
+    The same data version drives the HTTP validators: cached views answer
+    If-None-Match / If-Modified-Since with a 304 without running the view,
+    and bodies are gzip/brotli compressed once per entry rather than per request.
+    """
+
+    def __init__(self, watched_paths, max_entries=256, ttl=600):
+        self.watched_paths = list(watched_paths)
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._version = None
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self.not_modified = 0
+
+    def data_version(self):
+        """Return a stamp that changes whenever a watched file is modified."""
+        version = []
+        for path in self.watched_paths:
+            try:
+                stat = os.stat(path)
+                version.append((path, stat.st_mtime_ns, stat.st_size))
+            except OSError:
+                version.append((path, None, None))
+        return tuple(version)
+
+    def etag(self, key, version=None):
+        """Validator for one cached response under the current data version."""
+        if version is None:
+            version = self.data_version()
+        return hashlib.sha1(repr((version, key)).encode()).hexdigest()[:20]
+
+    def last_modified(self, version=None):
+        """Newest modification time of the watched files, to the second."""
+        if version is None:
+            version = self.data_version()
+        mtimes = [mtime for _, mtime, _ in version if mtime is not None]
+        if not mtimes:
+            return None
+        return datetime.fromtimestamp(max(mtimes) // 1_000_000_000, timezone.utc)
+
+    def _check_version(self):
+        version = self.data_version()
+        if version != self._version:
+            if self._entries:
+                self.invalidations += 1
+            self._entries.clear()
+            self._version = version
+
+    def get(self, key):
+        """Return the cached (body, mimetype) for key, or None."""
+        with self._lock:
+            self._check_version()
+            entry = self._entries.get(key)
+            if entry is None or time.monotonic() - entry[0] > self.ttl:
+                self._entries.pop(key, None)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1], entry[2]
+
+    def set(self, key, body, mimetype):
+        with self._lock:
+            self._check_version()
+            self._entries[key] = (time.monotonic(), body, mimetype, {})
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def compressed(self, key, body, encoding):
+        """Return body compressed with encoding, reusing the entry's copy if any."""
+        with self._lock:
+            entry = self._entries.get(key)
+            variants = entry[3] if entry is not None and entry[1] is body else None
+            if variants is not None and encoding in variants:
+                return variants[encoding]
+        data = compress(body, encoding)
+        if variants is not None:
+            with self._lock:
+                variants[encoding] = data
+        return data
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.invalidations += 1
+
+    def stats(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'ttl': self.ttl,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / total if total else 0.0,
+                'invalidations': self.invalidations,
+                'not_modified': self.not_modified
+            }
+
+    def cached(self, view):
+        """Decorator caching the serialized body of a successful Flask view."""
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            key = (request.path, tuple(sorted(request.args.items(multi=True))))
+            version = self.data_version()
+            etag = self.etag(key, version)
+            last_modified = self.last_modified(version)
+
+            if self._is_fresh(etag, last_modified):
+                with self._lock:
+                    self.not_modified += 1
+                return self._add_validators(Response(status=304), etag, last_modified)
+
+            cached = self.get(key)
+            if cached is None:
+                response = view(*args, **kwargs)
+                if not isinstance(response, Response) or response.status_code != 200:
+                    return response
+                if response.is_streamed:
+                    return self._add_validators(response, etag, last_modified)
+                body, mimetype = response.get_data(), response.mimetype
+                self.set(key, body, mimetype)
+            else:
+                body, mimetype = cached
+
+            response = Response(body, mimetype=mimetype)
+            encoding = choose_encoding(request.headers.get('Accept-Encoding'))
+            if encoding and len(body) >= MIN_COMPRESS_SIZE:
+                response.set_data(self.compressed(key, body, encoding))
+                response.headers['Content-Encoding'] = encoding
+            return self._add_validators(response, etag, last_modified)
+        return wrapper
+
+    @staticmethod
+    def _is_fresh(etag, last_modified):
+        # If-None-Match wins over If-Modified-Since when both are sent
+        if request.if_none_match:
+            return request.if_none_match.contains_weak(etag)
+        since = request.if_modified_since
+        return since is not None and last_modified is not None and last_modified <= since
+
+    @staticmethod
+    def _add_validators(response, etag, last_modified):
+        # Weak, because the gzip/brotli/identity bodies share one validator
+        response.set_etag(etag, weak=True)
+        if last_modified is not None:
+            response.last_modified = last_modified
+        response.vary.add('Accept-Encoding')
+        # Browsers may keep the body but must revalidate before reusing it
+        response.cache_control.no_cache = True
+        return response
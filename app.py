@@ -1,90 +1,220 @@
-from flask import Flask, render_template, jsonify
+from flask import Flask, render_template, jsonify, request, Response, stream_with_context
 import json
 import pandas as pd
-import sqlite3
 from datetime import datetime
+from api_cache import ResponseCache
+from db_utils import ReadOnlyPool
+import queries
+from search_index import to_match_query
 
 app = Flask(__name__)
 
 # Configuration
 DB_PATH = "netflix_titles.db"
+PREFERENCES_PATH = "dashboards/country_preferences.json"
+
+# Responses only change when the enrichment/dashboard pipeline rewrites these files
+# (the -wal file catches writes that have not been checkpointed into the DB yet)
+response_cache = ResponseCache([DB_PATH, DB_PATH + '-wal', PREFERENCES_PATH])
+
+# Read-only connections are reused across requests instead of opened per request
+db_pool = ReadOnlyPool(DB_PATH)
+
+# Row endpoints: selectable fields and the default projection clients got before
+COVID_FIELDS = queries.COVID_COLUMNS
+COVID_DEFAULT_FIELDS = ['country', 'release_year', 'type', 'genre', 'awards']
+COUNTRY_FIELDS = queries.COUNTRY_COLUMNS
+COUNTRY_DEFAULT_FIELDS = ['release_year', 'type', 'genre', 'awards', 'political_context_score']
+MAX_PAGE_SIZE = 5000
+SEARCH_FIELDS = queries.SEARCH_RESULT_COLUMNS
+SEARCH_DEFAULT_FIELDS = ['show_id', 'title', 'type', 'country', 'release_year']
+SEARCH_PAGE_SIZE = 20
 
 def get_db_connection():
-    conn = sqlite3.connect(DB_PATH)
-    conn.row_factory = sqlite3.Row
-    return conn
+    """Borrow a pooled read-only connection: `with get_db_connection() as conn:`."""
+    return db_pool.connection()
+
+class BadRequest(ValueError):
+    pass
+
+@app.errorhandler(BadRequest)
+def handle_bad_request(error):
+    return jsonify({'error': str(error)}), 400
+
+def parse_row_options(allowed_fields, default_fields, default_limit=MAX_PAGE_SIZE):
+    """Read fields=, limit=, after= and format= from the query string.
+    
+    Returns (fields, limit, after, stream). limit is None when the client
+    did not ask for pagination, which keeps the original unpaged response;
+    after= without limit= pages by default_limit. NDJSON streams every row
+    and has no place for a cursor, so it cannot be combined with paging.
+    """
+    fields = default_fields
+    if request.args.get('fields'):
+        fields = [f.strip() for f in request.args['fields'].split(',') if f.strip()]
+        unknown = sorted(set(fields) - set(allowed_fields))
+        if unknown or not fields:
+            raise BadRequest(f"Unknown fields {unknown}; choose from {allowed_fields}")
+    
+    limit = request.args.get('limit')
+    after = request.args.get('after')
+    if limit is not None or after is not None:
+        try:
+            limit = min(int(limit or default_limit), MAX_PAGE_SIZE)
+        except ValueError:
+            raise BadRequest("limit must be an integer")
+        if limit < 1:
+            raise BadRequest("limit must be positive")
+    
+    output_format = request.args.get('format', 'json')
+    if output_format not in ('json', 'ndjson'):
+        raise BadRequest("format must be json or ndjson")
+    if output_format == 'ndjson' and limit is not None:
+        raise BadRequest("format=ndjson streams every row; use JSON for limit and after")
+    return fields, limit, after, output_format == 'ndjson'
+
+def fetch_page(name, params, fields, limit):
+    """Run a named row query and return (records, next_cursor).
+    
+    Paged statements fetch one extra row so we can tell whether there is
+    a next page.
+    """
+    with get_db_connection() as conn:
+        rows = queries.execute(conn, name, params).fetchall()
+    
+    next_cursor = None
+    if limit is not None and len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = rows[-1]['show_id']
+    return [{field: row[field] for field in fields} for row in rows], next_cursor
+
+def stream_rows(name, params, fields):
+    """Stream query results as NDJSON straight from the SQLite cursor."""
+    def generate():
+        with get_db_connection() as conn:
+            for row in queries.execute(conn, name, params):
+                yield json.dumps({field: row[field] for field in fields}) + '\n'
+    return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
 
 @app.route('/')
 def index():
     return render_template('index.html')
 
 @app.route('/api/countries')
+@response_cache.cached
 def get_countries():
-    conn = get_db_connection()
-    df = pd.read_sql_query("SELECT DISTINCT country FROM netflix_titles WHERE country IS NOT NULL", conn)
-    countries = []
-    for country_list in df['country'].unique():
-        countries.extend([c.strip() for c in country_list.split(',')])
-    countries = sorted(list(set(countries)))
-    conn.close()
-    return jsonify(countries)
+    with get_db_connection() as conn:
+        rows = queries.execute(conn, 'countries').fetchall()
+    return jsonify([row['country'] for row in rows])
 
 @app.route('/api/country/<country>')
+@response_cache.cached
 def get_country_data(country):
-    with open('dashboards/country_preferences.json', 'r') as f:
+    fields, limit, after, stream = parse_row_options(COUNTRY_FIELDS, COUNTRY_DEFAULT_FIELDS)
+    name = queries.row_statement('country_titles', limit, after)
+    params = queries.row_params(limit, after, country=country)
+    if stream:
+        return stream_rows(name, params, fields)
+    
+    with open(PREFERENCES_PATH, 'r') as f:
         preferences = json.load(f)
     
     country_pref = next((p for p in preferences if p['country'] == country), None)
     
-    conn = get_db_connection()
-    df = pd.read_sql_query(f"""
-        SELECT release_year, type, genre, awards, political_context_score
-        FROM netflix_titles
-        WHERE country LIKE '%{country}%'
-    """, conn)
-    conn.close()
-    
-    return jsonify({
+    records, next_cursor = fetch_page(name, params, fields, limit)
+    response = {
         'preferences': country_pref,
-        'yearly_data': df.to_dict(orient='records')
-    })
+        'yearly_data': records
+    }
+    if limit is not None:
+        response['next_cursor'] = next_cursor
+    return jsonify(response)
 
 @app.route('/api/covid-analysis')
+@response_cache.cached
 def get_covid_analysis():
-    conn = get_db_connection()
-    df = pd.read_sql_query("""
-        SELECT country, release_year, type, genre, awards
-        FROM netflix_titles
-        WHERE release_year BETWEEN 2020 AND 2022
-    """, conn)
-    conn.close()
+    fields, limit, after, stream = parse_row_options(COVID_FIELDS, COVID_DEFAULT_FIELDS)
+    name = queries.row_statement('covid_titles', limit, after)
+    params = queries.row_params(limit, after)
+    if stream:
+        return stream_rows(name, params, fields)
     
-    return jsonify(df.to_dict(orient='records'))
+    records, next_cursor = fetch_page(name, params, fields, limit)
+    if limit is None:
+        return jsonify(records)
+    return jsonify({'data': records, 'next_cursor': next_cursor})
 
 @app.route('/api/political-matrix')
+@response_cache.cached
 def get_political_matrix():
-    conn = get_db_connection()
-    df = pd.read_sql_query("""
-        SELECT country, release_year, genre, awards, political_context_score
-        FROM netflix_titles
-        WHERE political_context_score > 0
-    """, conn)
-    conn.close()
+    with get_db_connection() as conn:
+        df = pd.read_sql_query(queries.STATEMENTS['political_matrix'], conn)
     
-    # Group by country and year
-    matrix_data = df.groupby(['country', 'release_year']).agg({
-        'political_context_score': 'mean',
-        'awards': 'mean',
-        'genre': lambda x: x.value_counts().index[0] if len(x) > 0 else None
-    }).reset_index()
-    
-    return jsonify(matrix_data.to_dict(orient='records'))
+    return jsonify(df.to_dict(orient='records'))
 
 @app.route('/api/global-preferences')
+@response_cache.cached
 def get_global_preferences():
-    with open('dashboards/country_preferences.json', 'r') as f:
+    with open(PREFERENCES_PATH, 'r') as f:
         preferences = json.load(f)
     return jsonify(preferences)
 
+@app.route('/api/search')
+@response_cache.cached
+def search_titles():
+    """Ranked title search: ?q=...&country=&year=&type=&limit=&after=&fields=
+
+    Results are ordered by bm25 relevance, so after= is an opaque offset
+    cursor (the next_cursor of the previous page) rather than a show_id.
+    """
+    query = to_match_query(request.args.get('q'))
+    if query is None:
+        raise BadRequest("q must contain at least one word")
+    fields, limit, after, _ = parse_row_options(SEARCH_FIELDS, SEARCH_DEFAULT_FIELDS, SEARCH_PAGE_SIZE)
+    limit = limit or SEARCH_PAGE_SIZE
+    try:
+        offset = int(after or 0)
+        year = int(request.args['year']) if request.args.get('year') else None
+    except ValueError:
+        raise BadRequest("after and year must be integers")
+    if offset < 0:
+        raise BadRequest("after must not be negative")
+
+    params = {
+        'query': query,
+        'type': request.args.get('type') or None,
+        'year': year,
+        'country': request.args.get('country') or None,
+        'limit': limit + 1,
+        'offset': offset
+    }
+    with get_db_connection() as conn:
+        rows = queries.execute(conn, 'search_titles', params).fetchall()
+
+    next_cursor = str(offset + limit) if len(rows) > limit else None
+    records = [dict({field: row[field] for field in fields}, score=round(row['score'], 4))
+               for row in rows[:limit]]
+    return jsonify({'data': records, 'next_cursor': next_cursor})
+
+@app.route('/api/cache-stats')
+def get_cache_stats():
+    return jsonify(response_cache.stats())
+
+@app.route('/api/pool-stats')
+def get_pool_stats():
+    return jsonify(db_pool.stats())
+
+def report_query_plans():
+    """Log how SQLite will run each endpoint's statement (see queries.py)."""
+    try:
+        with get_db_connection() as conn:
+            problems = queries.report_query_plans(conn)
+    except Exception as e:
+        print(f"Could not check query plans: {e}")
+        return
+    if problems:
+        print(f"Warning: {len(problems)} statement(s) fall back to full scans: {', '.join(problems)}")
+
 if __name__ == '__main__':
+    report_query_plans()
     app.run(debug=True) 
\ No newline at end of file
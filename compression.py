@@ -0,0 +1,59 @@
+import gzip
+
+try:
+    import brotli
+except ImportError:  # brotli is optional; gzip is always available
+    brotli = None
+
+# Configuration
+MIN_COMPRESS_SIZE = 1024
+
+# Levels for responses compressed on the fly (fast enough per request) and
+# for assets compressed once at build time by scripts/precompress.py
+DYNAMIC_LEVELS = {'gzip': 6, 'br': 5}
+STATIC_LEVELS = {'gzip': 9, 'br': 11}
+
+# Content-Encoding tokens we can produce, most preferred first
+ENCODINGS = (['br'] if brotli is not None else []) + ['gzip']
+SUFFIXES = {'br': '.br', 'gzip': '.gz'}
+
+def compress(data, encoding, levels=DYNAMIC_LEVELS):
+    """Compress bytes for the given Content-Encoding token.
+
+    The default levels suit per-request compression; pass STATIC_LEVELS
+    for build-time assets where size matters more than speed.
+    """
+    if encoding == 'gzip':
+        # mtime=0 keeps the output identical for identical input
+        return gzip.compress(data, compresslevel=levels['gzip'], mtime=0)
+    if encoding == 'br' and brotli is not None:
+        return brotli.compress(data, quality=levels['br'])
+    raise ValueError(f"Unsupported encoding: {encoding}")
+
+def accepted_encodings(header):
+    """Parse an Accept-Encoding header into {token: q}."""
+    accepted = {}
+    for part in (header or '').split(','):
+        token, _, params = part.strip().partition(';')
+        token = token.strip().lower()
+        if not token:
+            continue
+        q = 1.0
+        params = params.strip()
+        if params.startswith('q='):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        accepted[token] = q
+    return accepted
+
+def choose_encoding(header, available=None):
+    """Pick the best encoding the client accepts, or None for identity."""
+    accepted = accepted_encodings(header)
+    best, best_q = None, 0.0
+    for encoding in available if available is not None else ENCODINGS:
+        q = accepted.get(encoding, accepted.get('*', 0.0))
+        if q > best_q:
+            best, best_q = encoding, q
+    return best
@@ -1,13 +1,27 @@
-import sqlite3
+import argparse
+import hashlib
+import os
 import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
+from plotly.offline import get_plotlyjs, get_plotlyjs_version
+from concurrent.futures import ProcessPoolExecutor
 import json
 import numpy as np
+import re
+from data_access import load_titles, split_list
+from keyword_index import load_keyword_index
 
 # Configuration
 DB_PATH = "netflix_titles.db"
+DASHBOARD_DIR = "dashboards"
+
+FINGERPRINT_PATH = os.path.join(DASHBOARD_DIR, "dashboard_fingerprints.json")
+
+# Dashboards reference one shared plotly.min.js in DASHBOARD_DIR instead of
+# embedding the ~3MB bundle in every HTML file
+PLOTLY_JS = 'directory'
 
 # Define content type categories
 ESCAPIST_GENRES = [
@@ -20,19 +34,13 @@ REALITY_GENRES = [
     'History', 'News'
 ]
 
+# Description keywords that nudge a title towards reality or escapism
+REALITY_KEYWORDS = ['war', 'politics', 'crisis', 'conflict', 'documentary', 'true story', 'based on']
+ESCAPIST_KEYWORDS = ['magical', 'fantasy', 'adventure', 'dream', 'imagination', 'fairy tale']
+
 def load_data():
-    """Load data from SQLite database into a pandas DataFrame."""
-    conn = sqlite3.connect(DB_PATH)
-    query = """
-    SELECT 
-        show_id, type, title, country, date_added, release_year,
-        rating, duration, listed_in, description, awards,
-        political_context_score, genre
-    FROM netflix_titles
-    """
-    df = pd.read_sql_query(query, conn)
-    conn.close()
-    return df
+    """Load the prepared titles frame (see data_access.load_titles)."""
+    return load_titles(DB_PATH)
 
 def calculate_content_preference_scores(row):
     """Calculate both escapism and reality scores for content."""
@@ -53,14 +61,12 @@ def calculate_content_preference_scores(row):
     # Check description for keywords
     if pd.notna(row['description']):
         # Reality keywords
-        reality_keywords = ['war', 'politics', 'crisis', 'conflict', 'documentary', 'true story', 'based on']
-        for keyword in reality_keywords:
+        for keyword in REALITY_KEYWORDS:
             if keyword in row['description'].lower():
                 reality_score += 0.5
         
         # Escapist keywords
-        escapist_keywords = ['magical', 'fantasy', 'adventure', 'dream', 'imagination', 'fairy tale']
-        for keyword in escapist_keywords:
+        for keyword in ESCAPIST_KEYWORDS:
             if keyword in row['description'].lower():
                 escapism_score += 0.5
     
@@ -69,14 +75,63 @@ def calculate_content_preference_scores(row):
         'reality_score': max(reality_score, 0)
     })
 
+def count_pattern_matches(values, patterns):
+    """Count how many of the patterns occur (case-insensitively) in each value.
+
+    Matching is done once per distinct value and broadcast back, so repeated
+    genre lists and descriptions (one row per title x country) are only scanned once.
+    """
+    codes, uniques = pd.factorize(pd.Series(values, dtype=object))
+    lowered = pd.Series(uniques, dtype=object).str.lower()
+    
+    unique_counts = np.zeros(len(uniques))
+    for pattern in patterns:
+        unique_counts += lowered.str.contains(pattern.lower(), regex=False, na=False).to_numpy(dtype=float)
+    
+    # Missing values (code -1) score zero
+    counts = np.zeros(len(codes))
+    present = codes >= 0
+    counts[present] = unique_counts[codes[present]]
+    return counts
+
+def count_keyword_matches(df, keywords, keyword_index=None):
+    """Description keyword counts per row, from the keyword index when one is given."""
+    if keyword_index is None:
+        return count_pattern_matches(df['description'], keywords)
+    return keyword_index.count_matches(df['show_id'], keywords)
+
+def calculate_content_preference_scores_batch(df, keyword_index=None):
+    """Vectorized equivalent of calculate_content_preference_scores for a whole frame.
+
+    keyword_index (see keyword_index.py) must have been built from the same
+    titles as df; without it the descriptions are scanned directly.
+    """
+    escapism_score = (
+        count_pattern_matches(df['listed_in'], ESCAPIST_GENRES)
+        + 0.5 * count_keyword_matches(df, ESCAPIST_KEYWORDS, keyword_index)
+    )
+    reality_score = (
+        count_pattern_matches(df['listed_in'], REALITY_GENRES)
+        + 0.5 * count_keyword_matches(df, REALITY_KEYWORDS, keyword_index)
+    )
+    
+    return pd.DataFrame({
+        'escapism_score': np.maximum(escapism_score, 0),
+        'reality_score': np.maximum(reality_score, 0)
+    }, index=df.index)
+
+def add_content_preference_scores(df, keyword_index=None):
+    """Return df with escapism_score and reality_score columns added."""
+    return pd.concat([df, calculate_content_preference_scores_batch(df, keyword_index)], axis=1)
+
 def determine_content_preference(df):
     """Calculate overall content preference for all countries."""
-    # Calculate scores for each title
-    scores = df.apply(calculate_content_preference_scores, axis=1)
-    df = pd.concat([df, scores], axis=1)
+    # Calculate scores for each title unless the caller already has them
+    if 'escapism_score' not in df.columns:
+        df = add_content_preference_scores(df)
     
     # Calculate country preferences
-    country_preferences = df.groupby('country').agg({
+    country_preferences = df.groupby('country', observed=True).agg({
         'escapism_score': 'mean',
         'reality_score': 'mean'
     }).reset_index()
@@ -101,7 +156,7 @@ def create_global_preference_heatmap(country_preferences):
         values='preference_ratio',
         index='country',
         aggfunc='first'
-    ).sort_values(ascending=False)
+    )['preference_ratio'].sort_values(ascending=False)
     
     # Create heatmap
     fig.add_trace(go.Heatmap(
@@ -125,13 +180,22 @@ def create_global_preference_heatmap(country_preferences):
     
     return fig
 
+def dashboard_path(country, output_dir=DASHBOARD_DIR):
+    return os.path.join(output_dir, f"{country.lower().replace(' ', '_')}_dashboard.html")
+
 def create_country_dashboard(df, country, country_preferences):
     """Create a dashboard for a specific country."""
     # Filter for the specific country
-    country_data = df[df['country'].str.contains(country, na=False)]
+    # Match whole list entries so "Niger" does not pick up "Nigeria"
+    country_pattern = rf'(?:^|,)\s*{re.escape(country)}\s*(?:,|$)'
+    country_data = df[df['country'].str.contains(country_pattern, na=False)]
     
     # Get country's preference
     country_pref = country_preferences[country_preferences['country'] == country].iloc[0]
+    return render_country_dashboard(country_data, country, country_pref)
+
+def render_country_dashboard(country_data, country, country_pref, output_dir=DASHBOARD_DIR):
+    """Render one country's dashboard from its own rows and preference record."""
     preference_label = country_pref['preference']
     
     # Create subplots
@@ -152,7 +216,7 @@ def create_country_dashboard(df, country, country_preferences):
     )
     
     # 1. Content volume trend
-    yearly_content = country_data.groupby(['release_year', 'type']).size().unstack(fill_value=0)
+    yearly_content = country_data.groupby(['release_year', 'type'], observed=True).size().unstack(fill_value=0)
     for content_type in yearly_content.columns:
         fig.add_trace(
             go.Scatter(x=yearly_content.index, y=yearly_content[content_type],
@@ -162,6 +226,7 @@ def create_country_dashboard(df, country, country_preferences):
     
     # 2. Genre distribution
     genre_counts = country_data['genre'].value_counts()
+    genre_counts = genre_counts[genre_counts > 0]  # categoricals also list unused genres
     fig.add_trace(
         go.Bar(x=genre_counts.index, y=genre_counts.values, name='Genres'),
         row=1, col=2
@@ -185,7 +250,7 @@ def create_country_dashboard(df, country, country_preferences):
     )
     
     # 4. Awards by genre
-    genre_awards = country_data.groupby('genre')['awards'].mean()
+    genre_awards = country_data.groupby('genre', observed=True)['awards'].mean()
     fig.add_trace(
         go.Bar(x=genre_awards.index, y=genre_awards.values, name='Average Awards'),
         row=2, col=2
@@ -210,7 +275,7 @@ def create_country_dashboard(df, country, country_preferences):
     )
     
     # Save dashboard
-    fig.write_html(f"dashboards/{country.lower().replace(' ', '_')}_dashboard.html")
+    fig.write_html(dashboard_path(country, output_dir), include_plotlyjs=PLOTLY_JS)
     
     return country_pref['preference_ratio']
 
@@ -249,39 +314,142 @@ def create_preference_comparison_dashboard(country_preferences):
         showlegend=True
     )
     
-    fig.write_html("dashboards/global_preference_comparison.html")
+    fig.write_html(os.path.join(DASHBOARD_DIR, "global_preference_comparison.html"), include_plotlyjs=PLOTLY_JS)
+
+def split_by_country(df):
+    """Group rows by each entry of their comma-separated country list, once.
+    
+    Returns {country: rows}, matching the whole-entry filter used by
+    create_country_dashboard without rescanning the frame per country.
+    """
+    countries = split_list(df['country'])
+    return {country: df.iloc[rows.index] for country, rows in countries.groupby(countries, sort=False)}
+
+def write_plotly_bundle(output_dir=DASHBOARD_DIR):
+    """Write the shared plotly.min.js referenced by every dashboard.
+    
+    An existing bundle is kept only if its banner names the plotly.js
+    version the installed plotly package renders for.
+    """
+    bundle_path = os.path.join(output_dir, 'plotly.min.js')
+    banner = f"plotly.js v{get_plotlyjs_version()}\n"
+    if os.path.exists(bundle_path):
+        with open(bundle_path, 'r', encoding='utf-8') as f:
+            if banner in f.read(256):
+                return
+    with open(bundle_path, 'w', encoding='utf-8') as f:
+        f.write(get_plotlyjs())
+
+def frame_fingerprint(frame):
+    """Content hash of a frame's values (row order matters, index does not)."""
+    hashes = pd.util.hash_pandas_object(frame, index=False)
+    return hashlib.sha1(hashes.to_numpy().tobytes()).hexdigest()
+
+def country_fingerprint(country_data, country_pref):
+    """Hash everything a country dashboard is drawn from."""
+    digest = hashlib.sha1(frame_fingerprint(country_data.sort_values('show_id')).encode())
+    digest.update(json.dumps(country_pref.to_dict(), sort_keys=True, default=str).encode())
+    return digest.hexdigest()
+
+def load_fingerprints(path=FINGERPRINT_PATH):
+    try:
+        with open(path, 'r') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def save_fingerprints(fingerprints, path=FINGERPRINT_PATH):
+    with open(path, 'w') as f:
+        json.dump(fingerprints, f, indent=2, sort_keys=True)
 
-def main():
-    # Load data
-    df = load_data()
+def _render_country_job(job):
+    return render_country_dashboard(*job)
+
+def remove_country_dashboards(countries, output_dir=DASHBOARD_DIR):
+    """Delete the dashboards of countries that are no longer rendered."""
+    removed = [country for country in countries if os.path.exists(dashboard_path(country, output_dir))]
+    for country in removed:
+        os.remove(dashboard_path(country, output_dir))
+    if removed:
+        print(f"Removed {len(removed)} dashboards for countries no longer in the data: {', '.join(sorted(removed))}")
+    return removed
+
+def render_country_dashboards(df, country_preferences, workers=None, output_dir=DASHBOARD_DIR,
+                              previous_fingerprints=None, force=False):
+    """Render country dashboards, in parallel when workers != 1.
+    
+    Each job carries only its own country's rows, so workers do not receive
+    or rescan the full frame. Unless force is set, countries whose fingerprint
+    matches previous_fingerprints (and whose HTML still exists) are left
+    alone. Dashboards of countries that were in previous_fingerprints but are
+    no longer rendered are deleted.
+    Returns the {country: fingerprint} map for the current data.
+    """
+    previous_fingerprints = previous_fingerprints or {}
+    preferences = country_preferences.set_index('country', drop=False)
+    fingerprints = {}
+    jobs = []
+    skipped = []
+    for country, country_data in split_by_country(df).items():
+        if country not in preferences.index:
+            # Only seen inside multi-country entries, so it has no preference row
+            skipped.append(country)
+            continue
+        country_pref = preferences.loc[country]
+        fingerprints[country] = country_fingerprint(country_data, country_pref)
+        if (not force and fingerprints[country] == previous_fingerprints.get(country)
+                and os.path.exists(dashboard_path(country, output_dir))):
+            continue
+        jobs.append((country_data, country, country_pref, output_dir))
+    
+    if skipped:
+        print(f"Skipping {len(skipped)} countries without a preference score: {', '.join(sorted(skipped))}")
+    print(f"Rendering {len(jobs)} country dashboards ({len(fingerprints) - len(jobs)} unchanged)")
+    remove_country_dashboards(set(previous_fingerprints) - set(fingerprints), output_dir)
+    
+    write_plotly_bundle(output_dir)
+    if workers == 1 or len(jobs) <= 1:
+        for job in jobs:
+            _render_country_job(job)
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            list(executor.map(_render_country_job, jobs, chunksize=4))
+    return fingerprints
+
+def main(workers=None, force=False):
+    # Load data and score every title once; the country dashboards chart the scores too
+    df = add_content_preference_scores(load_data(), load_keyword_index(DB_PATH))
     
     # Create dashboards directory if it doesn't exist
-    import os
-    if not os.path.exists('dashboards'):
-        os.makedirs('dashboards')
+    os.makedirs(DASHBOARD_DIR, exist_ok=True)
+    write_plotly_bundle()
+    previous = load_fingerprints()
     
     # Calculate content preferences for all countries
     country_preferences = determine_content_preference(df)
     
-    # Create global preference heatmap
-    heatmap = create_global_preference_heatmap(country_preferences)
-    heatmap.write_html("dashboards/global_preference_heatmap.html")
-    
-    # Get unique countries
-    countries = []
-    for country_list in df['country'].dropna().unique():
-        countries.extend([c.strip() for c in country_list.split(',')])
-    countries = list(set(countries))
-    
-    # Create dashboard for each country
-    for country in countries:
-        create_country_dashboard(df, country, country_preferences)
-    
-    # Create preference comparison dashboard
-    create_preference_comparison_dashboard(country_preferences)
+    # Global pages only change when the aggregated preferences do
+    global_fingerprint = frame_fingerprint(country_preferences)
+    global_pages = ["global_preference_heatmap.html", "global_preference_comparison.html"]
+    if (force or global_fingerprint != previous.get('global')
+            or not all(os.path.exists(os.path.join(DASHBOARD_DIR, page)) for page in global_pages)):
+        # Create global preference heatmap
+        heatmap = create_global_preference_heatmap(country_preferences)
+        heatmap.write_html(os.path.join(DASHBOARD_DIR, "global_preference_heatmap.html"), include_plotlyjs=PLOTLY_JS)
+        
+        # Create preference comparison dashboard
+        create_preference_comparison_dashboard(country_preferences)
+    else:
+        print("Global preferences unchanged, keeping global pages")
+    
+    # Create dashboard for each changed country
+    country_fingerprints = render_country_dashboards(
+        df, country_preferences, workers, previous_fingerprints=previous.get('countries'), force=force
+    )
     
     # Save preference data
-    country_preferences.to_json('dashboards/country_preferences.json', orient='records')
+    country_preferences.to_json(os.path.join(DASHBOARD_DIR, 'country_preferences.json'), orient='records')
+    save_fingerprints({'global': global_fingerprint, 'countries': country_fingerprints})
     
     print("Dashboards generated successfully!")
     print("\nContent preference analysis available in:")
@@ -291,4 +459,10 @@ def main():
     print("- country_preferences.json")
 
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Generate the country content preference dashboards.")
+    parser.add_argument('--workers', type=int, default=None,
+                        help="Render processes (default: one per CPU, 1 renders in-process)")
+    parser.add_argument('--force', action='store_true',
+                        help="Re-render every dashboard even if its data is unchanged")
+    args = parser.parse_args()
+    main(args.workers, args.force)
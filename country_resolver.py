@@ -0,0 +1,159 @@
+import argparse
+import json
+import os
+import sqlite3
+import threading
+
+import requests
+
+from db_utils import BatchWriter, configure_for_writes
+from lookups import CACHE_PATH, LookupCache, RateLimiter, run_lookups
+from setup_database import refresh_bridge_tables
+
+try:
+    from imdb import IMDb
+except ImportError:  # only needed for the IMDb provider
+    IMDb = None
+
+# Configuration
+DB_PATH = "netflix_titles.db"
+OMDB_API_URL = "http://www.omdbapi.com/"
+COUNTRY_CACHE_TTL_DAYS = 90
+
+MISSING_COUNTRY_FILTER = "country IS NULL OR TRIM(country) = ''"
+
+class OMDbProvider:
+    """Look up a title's country list through the OMDb API."""
+
+    name = 'omdb'
+
+    def __init__(self, api_key=None, api_url=OMDB_API_URL):
+        self.api_key = api_key or os.environ.get('OMDB_API_KEY')
+        if not self.api_key:
+            raise ValueError("OMDb needs an API key (set OMDB_API_KEY)")
+        self.api_url = api_url
+        self._local = threading.local()
+
+    def lookup(self, title, rate_limiter=None):
+        if rate_limiter:
+            rate_limiter.acquire()
+        if not hasattr(self._local, 'session'):
+            self._local.session = requests.Session()
+        response = self._local.session.get(self.api_url, params={'t': title, 'apikey': self.api_key}, timeout=30)
+        data = response.json()
+        if data.get('Response') == 'True' and data.get('Country') not in (None, 'N/A'):
+            return data['Country']
+        return None
+
+class IMDbProvider:
+    """Look up a title's primary country through IMDbPY."""
+
+    name = 'imdb'
+
+    def __init__(self, imdb_factory=IMDb):
+        if imdb_factory is None:
+            raise RuntimeError("IMDbPY is not installed; run `pip install cinemagoer`")
+        self.imdb_factory = imdb_factory
+        self._local = threading.local()
+
+    def lookup(self, title, rate_limiter=None):
+        """Search, then fetch the first hit: two IMDb requests, each rate limited."""
+        if not hasattr(self._local, 'imdb'):
+            self._local.imdb = self.imdb_factory()
+        if rate_limiter:
+            rate_limiter.acquire()
+        results = self._local.imdb.search_movie(title)
+        if results:
+            if rate_limiter:
+                rate_limiter.acquire()
+            movie = self._local.imdb.get_movie(results[0].movieID)
+            countries = movie.get('countries')
+            if countries:
+                return countries[0]
+        return None
+
+class FixtureProvider:
+    """Resolve countries from a local {title: country} mapping or JSON file."""
+
+    name = 'fixture'
+
+    def __init__(self, fixture):
+        if isinstance(fixture, (str, os.PathLike)):
+            with open(fixture, 'r', encoding='utf-8') as f:
+                fixture = json.load(f)
+        self.countries = dict(fixture)
+
+    def lookup(self, title, rate_limiter=None):
+        # Local data: nothing to rate limit
+        return self.countries.get(title)
+
+PROVIDERS = {
+    'omdb': OMDbProvider,
+    'imdb': IMDbProvider,
+    'fixture': FixtureProvider
+}
+
+def resolve_missing_countries(provider, db_path=DB_PATH, workers=4, requests_per_second=1,
+                              cache_path=CACHE_PATH, batch_size=100):
+    """Fill blank countries in netflix_titles using the given provider.
+
+    Identical titles are looked up once. Every answer, including "not found",
+    is checkpointed in the lookup cache as it arrives, so rerunning after an
+    interruption only queries the titles that were not reached yet.
+    Returns the number of titles updated.
+    """
+    conn = configure_for_writes(sqlite3.connect(db_path, timeout=15))
+    rows = conn.execute(f"SELECT show_id, title FROM netflix_titles WHERE {MISSING_COUNTRY_FILTER}").fetchall()
+    rows = [(show_id, title.strip()) for show_id, title in rows if title and title.strip()]
+    print(f"Found {len(rows)} titles missing country data.")
+
+    cache = LookupCache(cache_path, namespace=f'country:{provider.name}', ttl_days=COUNTRY_CACHE_TTL_DAYS)
+    # Providers charge the limiter per remote request, not per title
+    rate_limiter = RateLimiter(requests_per_second, burst=workers)
+    try:
+        countries = run_lookups(
+            [(title, None) for _, title in rows],
+            lambda key: provider.lookup(key[0], rate_limiter),
+            workers=workers,
+            cache=cache
+        )
+    finally:
+        cache.close()
+
+    # Only fill rows that are still blank in case another run got there first
+    updated = []
+    update_sql = f"UPDATE netflix_titles SET country = ? WHERE show_id = ? AND ({MISSING_COUNTRY_FILTER})"
+    with BatchWriter(conn, update_sql, batch_size=batch_size, label='countries') as writer:
+        for show_id, title in rows:
+            country = countries.get((title, None))
+            if country:
+                writer.add((country, show_id))
+                updated.append(show_id)
+
+    refresh_bridge_tables(conn, show_ids=updated)
+    conn.close()
+    print(f"Filled {len(updated)} of {len(rows)} missing countries.")
+    return len(updated)
+
+def main():
+    parser = argparse.ArgumentParser(description="Fill missing countries in netflix_titles.")
+    parser.add_argument('--provider', choices=sorted(PROVIDERS), default='imdb')
+    parser.add_argument('--fixture', help="JSON {title: country} file for the fixture provider")
+    parser.add_argument('--db', default=DB_PATH)
+    parser.add_argument('--cache', default=CACHE_PATH)
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--rate', type=float, default=1, help="Lookups per second across all workers")
+    args = parser.parse_args()
+
+    if args.provider == 'fixture':
+        if not args.fixture:
+            parser.error("--fixture is required with --provider fixture")
+        provider = FixtureProvider(args.fixture)
+    else:
+        provider = PROVIDERS[args.provider]()
+
+    resolve_missing_countries(provider, args.db, workers=args.workers,
+                              requests_per_second=args.rate, cache_path=args.cache)
+
+if __name__ == "__main__":
+    main()
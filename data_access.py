@@ -0,0 +1,101 @@
+import glob
+import hashlib
+import os
+import sqlite3
+
+import pandas as pd
+
+# Configuration
+DB_PATH = "netflix_titles.db"
+SNAPSHOT_DIR = ".cache"
+
+TITLE_COLUMNS = [
+    'show_id', 'type', 'title', 'country', 'date_added', 'release_year',
+    'rating', 'duration', 'listed_in', 'description', 'awards',
+    'political_context_score', 'genre'
+]
+
+# Low-cardinality text columns are stored as categoricals
+CATEGORY_COLUMNS = ['type', 'rating', 'duration', 'country', 'listed_in', 'genre', 'primary_genre']
+SMALL_INT_COLUMNS = ['release_year', 'awards']
+
+def db_version(db_path=DB_PATH):
+    """Stamp that changes whenever the database (or its WAL) is written."""
+    digest = hashlib.sha1(os.path.abspath(db_path).encode())
+    for path in (db_path, db_path + '-wal'):
+        if os.path.exists(path):
+            stat = os.stat(path)
+            digest.update(f"{stat.st_mtime_ns}:{stat.st_size}".encode())
+    digest.update(','.join(TITLE_COLUMNS).encode())
+    return digest.hexdigest()[:16]
+
+def split_list(values):
+    """Explode a comma-separated column into one stripped entry per row.
+
+    The result is indexed by row position, with duplicates within a row
+    ("France, France") dropped.
+    """
+    parts = pd.Series(values, dtype=object).reset_index(drop=True).str.split(',').explode().str.strip()
+    parts = parts[parts.notna() & (parts != '')]
+    return parts[~pd.MultiIndex.from_arrays([parts.index, parts.to_numpy()]).duplicated()]
+
+def fill_category(series, value):
+    """fillna for categoricals, adding the fill value as a category if needed."""
+    if isinstance(series.dtype, pd.CategoricalDtype) and value not in series.cat.categories:
+        series = series.cat.add_categories([value])
+    return series.fillna(value)
+
+def _compact_int(series):
+    """int16 when there are no gaps, float32 otherwise (keeps NaN semantics)."""
+    series = pd.to_numeric(series, errors='coerce')
+    if series.notna().all() and series.between(-32768, 32767).all():
+        return series.astype('int16')
+    return series.astype('float32')
+
+def prepare_titles(df):
+    """Derive shared columns and shrink dtypes."""
+    df = df.copy()
+    # Same rule as enrich_netflix_data.extract_primary_genre
+    df['primary_genre'] = df['listed_in'].str.split(',').str[0].str.strip()
+    for column in SMALL_INT_COLUMNS:
+        df[column] = _compact_int(df[column])
+    df['political_context_score'] = pd.to_numeric(df['political_context_score'], errors='coerce').astype('float32')
+    for column in CATEGORY_COLUMNS:
+        df[column] = df[column].astype('category')
+    return df
+
+def _snapshot_path(db_path):
+    return os.path.join(SNAPSHOT_DIR, f"netflix_titles-{db_version(db_path)}.feather")
+
+def load_titles(db_path=DB_PATH, use_cache=True):
+    """Load the prepared titles frame, from a Feather snapshot when possible.
+
+    The snapshot is keyed on db_version(), so it is rebuilt automatically
+    after the database changes. Snapshots need pyarrow; without it every
+    call reads from SQLite.
+    """
+    snapshot = _snapshot_path(db_path)
+    if use_cache and os.path.exists(snapshot):
+        try:
+            return pd.read_feather(snapshot)
+        except ImportError:
+            use_cache = False
+
+    conn = sqlite3.connect(db_path)
+    df = pd.read_sql_query(f"SELECT {', '.join(TITLE_COLUMNS)} FROM netflix_titles", conn)
+    conn.close()
+    df = prepare_titles(df)
+
+    if use_cache:
+        try:
+            os.makedirs(SNAPSHOT_DIR, exist_ok=True)
+            df.to_feather(snapshot + '.tmp')
+            os.replace(snapshot + '.tmp', snapshot)
+        except ImportError:
+            print("pyarrow is not installed; skipping the titles snapshot")
+        else:
+            # Older snapshots belong to previous versions of the database
+            for stale in glob.glob(os.path.join(SNAPSHOT_DIR, 'netflix_titles-*.feather')):
+                if stale != snapshot:
+                    os.remove(stale)
+    return df
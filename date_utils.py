@@ -0,0 +1,93 @@
+import threading
+from collections import Counter
+from datetime import datetime
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+# Configuration
+DATE_FORMATS = ['%B %d, %Y', '%Y-%m-%d', '%d/%m/%Y', '%m/%d/%Y']
+ISO_FORMAT = '%Y-%m-%d'
+CACHE_SIZE = 8192
+UNPARSED = 'unparsed'
+
+_format_counts = Counter()
+_counts_lock = threading.Lock()
+
+def candidate_formats(date_str):
+    """DATE_FORMATS that could match, judged from the string's shape.
+
+    Only these are tried with strptime, so a "September 25, 2021" never
+    goes through three failing numeric formats first. The order among the
+    candidates is the DATE_FORMATS order, so 01/02/2020 is still read
+    day-first as it always was.
+    """
+    if not date_str:
+        return []
+    if date_str[0].isalpha():
+        return [f for f in DATE_FORMATS if f.startswith('%B')]
+    if '/' in date_str:
+        return [f for f in DATE_FORMATS if '/' in f]
+    if '-' in date_str:
+        return [f for f in DATE_FORMATS if '-' in f]
+    return []
+
+@lru_cache(maxsize=CACHE_SIZE)
+def _parse(date_str):
+    for date_format in candidate_formats(date_str):
+        try:
+            return datetime.strptime(date_str, date_format), date_format
+        except ValueError:
+            continue
+    return None, None
+
+def parse_date(value):
+    """(datetime, format) for a date string in any of DATE_FORMATS, or (None, None)."""
+    if value is None:
+        return None, None
+    parsed, date_format = _parse(str(value).strip())
+    with _counts_lock:
+        _format_counts[date_format or UNPARSED] += 1
+    return parsed, date_format
+
+def normalize_date(value):
+    """ISO date for a date string, or the value unchanged if it cannot be parsed."""
+    if not value:
+        return value
+    parsed, _ = parse_date(value)
+    return parsed.strftime(ISO_FORMAT) if parsed is not None else value
+
+def normalize_dates(values):
+    """normalize_date over a pandas column, parsing each distinct value once."""
+    values = pd.Series(values, dtype=object)
+    codes, uniques = pd.factorize(values)
+    normalized = np.array([normalize_date(value) for value in uniques] + [None], dtype=object)
+    # factorize marks missing values with -1; keep them as they were
+    result = np.where(codes < 0, values.to_numpy(), normalized[codes])
+    return pd.Series(result, index=values.index, dtype=object)
+
+def parse_dates(values):
+    """datetime64 column for date strings in any of DATE_FORMATS; NaT when unparseable."""
+    values = pd.Series(values, dtype=object)
+    codes, uniques = pd.factorize(values)
+    parsed = pd.to_datetime(pd.Series([parse_date(value)[0] for value in uniques], dtype=object))
+    return pd.Series(parsed.reindex(codes).to_numpy(), index=values.index, dtype='datetime64[ns]')
+
+def format_stats():
+    """How often each format (or UNPARSED) was seen, plus the parse cache counters."""
+    info = _parse.cache_info()
+    with _counts_lock:
+        counts = dict(_format_counts)
+    return {'formats': counts, 'cache_hits': info.hits, 'cache_misses': info.misses, 'cached': info.currsize}
+
+def report_format_stats():
+    stats = format_stats()
+    seen = ', '.join(f"{date_format}: {count}" for date_format, count in sorted(stats['formats'].items()))
+    print(f"Date formats seen: {seen or 'none'} "
+          f"({stats['cache_misses']} distinct strings parsed, {stats['cache_hits']} cache hits)")
+
+def reset_format_stats():
+    with _counts_lock:
+        _format_counts.clear()
+    _parse.cache_clear()
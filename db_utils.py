@@ -0,0 +1,208 @@
+import os
+import pathlib
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+
+# Configuration
+DEFAULT_BATCH_SIZE = 1000
+DEFAULT_PROGRESS_EVERY = 1000
+
+# Read-only connection tuning for the API
+READ_MMAP_SIZE = 256 * 1024 * 1024
+READ_CACHE_KIB = 32 * 1024
+STATEMENT_CACHE_SIZE = 256
+MAX_IDLE_CONNECTIONS = 8
+
+def quote(column):
+    # "cast" is an SQL keyword
+    return f'"{column}"'
+
+def configure_for_writes(conn):
+    """Switch to WAL journaling so writers do not block readers, and stop
+    fsyncing on every commit (WAL + NORMAL is still crash-safe)."""
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    return conn
+
+class BatchWriter:
+    """Buffer parameter tuples and write them with executemany in chunks.
+
+    Each chunk is written inside its own transaction, so an interrupted run
+    keeps every chunk flushed before the interruption. Progress is printed
+    every `progress_every` rows instead of once per row.
+
+        with BatchWriter(conn, "UPDATE t SET x = ? WHERE id = ?", total=len(rows)) as writer:
+            for row in rows:
+                writer.add((row.x, row.id))
+    """
+
+    def __init__(self, conn, sql, batch_size=DEFAULT_BATCH_SIZE, total=None,
+                 progress_every=DEFAULT_PROGRESS_EVERY, label='rows'):
+        self.conn = conn
+        self.sql = sql
+        self.batch_size = batch_size
+        self.total = total
+        self.progress_every = progress_every
+        self.label = label
+        self.written = 0
+        self._pending = []
+        self._last_report = 0
+        self._started = time.monotonic()
+
+    def add(self, params):
+        self._pending.append(params)
+        if len(self._pending) >= self.batch_size:
+            self.flush()
+
+    def add_many(self, rows):
+        for params in rows:
+            self.add(params)
+
+    def flush(self):
+        if not self._pending:
+            return
+        with self.conn:
+            self.conn.executemany(self.sql, self._pending)
+        self.written += len(self._pending)
+        self._pending = []
+        if self.progress_every and self.written - self._last_report >= self.progress_every:
+            self.report()
+
+    def report(self):
+        self._last_report = self.written
+        of_total = f"/{self.total}" if self.total is not None else ""
+        elapsed = time.monotonic() - self._started
+        print(f"Wrote {self.written}{of_total} {self.label} ({elapsed:.1f}s)")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        # Keep whatever was buffered before an interruption, unless the
+        # database itself is what failed
+        if exc_type is None or not issubclass(exc_type, sqlite3.Error):
+            self.flush()
+            self.report()
+        return False
+
+def connect_read_only(db_path, cached_statements=STATEMENT_CACHE_SIZE):
+    """Open db_path read-only with the pragmas the API wants.
+
+    mode=ro plus query_only guarantee the API never writes; in WAL mode the
+    reader keeps seeing a consistent snapshot while enrichment writes. The
+    statement cache keeps prepared statements for the connection's lifetime.
+    """
+    uri = pathlib.Path(db_path).resolve().as_uri() + '?mode=ro'
+    conn = sqlite3.connect(uri, uri=True, check_same_thread=False, cached_statements=cached_statements)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA query_only=ON")
+    conn.execute(f"PRAGMA mmap_size={READ_MMAP_SIZE}")
+    conn.execute(f"PRAGMA cache_size=-{READ_CACHE_KIB}")
+    conn.execute("PRAGMA temp_store=MEMORY")
+    return conn
+
+class ReadOnlyPool:
+    """Reuse read-only connections across requests.
+
+    A request borrows a connection with `with pool.connection() as conn:`
+    and hands it back afterwards, so connection setup, pragmas and the
+    prepared-statement cache are paid once per pooled connection rather
+    than once per request. At most `max_idle` connections are kept; extra
+    ones opened under a burst are closed when returned. Each connection
+    remembers the file (device and inode) it was opened on; once the
+    database file is replaced, connections to the old file are closed on
+    return or on their next checkout, so readers do not keep serving it.
+    """
+
+    def __init__(self, db_path, max_idle=MAX_IDLE_CONNECTIONS, cached_statements=STATEMENT_CACHE_SIZE):
+        self.db_path = db_path
+        self.max_idle = max_idle
+        self.cached_statements = cached_statements
+        self._idle = []
+        self._lock = threading.Lock()
+        self._file_ids = {}
+        self.opened = 0
+        self.reused = 0
+        self.closed = 0
+        self.in_use = 0
+
+    def _current_file_id(self):
+        try:
+            stat = os.stat(self.db_path)
+            return stat.st_dev, stat.st_ino
+        except OSError:
+            return None
+
+    def _acquire(self):
+        file_id = self._current_file_id()
+        with self._lock:
+            stale = [conn for conn in self._idle if self._file_ids[conn] != file_id]
+            self._idle = [conn for conn in self._idle if self._file_ids[conn] == file_id]
+            conn = self._idle.pop() if self._idle else None
+            if conn is not None:
+                self.reused += 1
+            self.in_use += 1
+        for old in stale:
+            self._close(old)
+        if conn is None:
+            try:
+                conn = connect_read_only(self.db_path, self.cached_statements)
+            except Exception:
+                with self._lock:
+                    self.in_use -= 1
+                raise
+            with self._lock:
+                self._file_ids[conn] = file_id
+                self.opened += 1
+        return conn
+
+    def _release(self, conn, discard=False):
+        file_id = self._current_file_id()
+        with self._lock:
+            self.in_use -= 1
+            current = self._file_ids.get(conn) == file_id
+            if not discard and current and len(self._idle) < self.max_idle:
+                self._idle.append(conn)
+                return
+        self._close(conn)
+
+    def _close(self, conn):
+        conn.close()
+        with self._lock:
+            self._file_ids.pop(conn, None)
+            self.closed += 1
+
+    @contextmanager
+    def connection(self):
+        conn = self._acquire()
+        discard = False
+        try:
+            yield conn
+        except sqlite3.Error:
+            # Do not hand a connection in an unknown state to the next request
+            discard = True
+            raise
+        finally:
+            self._release(conn, discard)
+
+    def close(self):
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for conn in idle:
+            self._close(conn)
+
+    def stats(self):
+        with self._lock:
+            checkouts = self.opened + self.reused
+            return {
+                'db_path': self.db_path,
+                'opened': self.opened,
+                'reused': self.reused,
+                'closed': self.closed,
+                'idle': len(self._idle),
+                'in_use': self.in_use,
+                'max_idle': self.max_idle,
+                'reuse_rate': self.reused / checkouts if checkouts else 0.0
+            }
@@ -1,15 +1,28 @@
 import sqlite3
-from imdb import IMDb
+import threading
 import pandas as pd
 from datetime import datetime
 import requests
 import json
+from setup_database import refresh_political_matrix
+from lookups import CACHE_PATH, LookupCache, RateLimiter, run_lookups
+from db_utils import BatchWriter, configure_for_writes
+from events import EVENTS_PATH, events_from_dict, load_event_index
+
+try:
+    from imdb import IMDb
+except ImportError:  # only needed when fetching from IMDb for real
+    IMDb = None
 
 # Configuration
 DB_PATH = "netflix_titles.db"
 GDELT_BASE_URL = "https://api.gdeltproject.org/api/v2/doc/doc"
+IMDB_WORKERS = 8
+IMDB_REQUESTS_PER_SECOND = 4
+WRITE_BATCH_SIZE = 1000
+AWARDS_CACHE_TTL_DAYS = 30
 
-# Major events database (you'll need to expand this)
+# Built-in events, used when major_country_events.csv cannot be read
 MAJOR_EVENTS = {
     'USA': {
         2016: {'events': ['Presidential Election', 'Political Polarization'], 'intensity': 'High', 'keywords': 'election,polarization'},
@@ -40,22 +53,65 @@ def calculate_political_context_score(country, year, events_dict=MAJOR_EVENTS):
     
     return base_score * (1 + (event_count * 0.5))
 
+def fetch_awards_count(imdb, title, rate_limiter=None):
+    """Get awards count from IMDb, letting lookup errors propagate.
+    
+    A lookup is two IMDb requests, so rate_limiter is charged once for each.
+    """
+    if rate_limiter:
+        rate_limiter.acquire()
+    results = imdb.search_movie(title)
+    if results:
+        if rate_limiter:
+            rate_limiter.acquire()
+        movie = imdb.get_movie(results[0].movieID)
+        if 'awards' in movie.keys():
+            awards_text = movie.get('awards', '')
+            # Count nominations and wins
+            nominations = awards_text.count('nominat')
+            wins = awards_text.count('win') + awards_text.count('won')
+            return nominations + wins
+    return 0
+
 def get_awards_count(imdb, title):
     """Get awards count from IMDb."""
     try:
-        results = imdb.search_movie(title)
-        if results:
-            movie = imdb.get_movie(results[0].movieID)
-            if 'awards' in movie.keys():
-                awards_text = movie.get('awards', '')
-                # Count nominations and wins
-                nominations = awards_text.count('nominat')
-                wins = awards_text.count('win') + awards_text.count('won')
-                return nominations + wins
+        return fetch_awards_count(imdb, title)
     except Exception as e:
         print(f"Error getting awards for {title}: {e}")
     return 0
 
+def fetch_all_awards(rows, imdb_factory=IMDb, workers=IMDB_WORKERS,
+                     requests_per_second=IMDB_REQUESTS_PER_SECOND, cache_path=CACHE_PATH,
+                     ttl_days=AWARDS_CACHE_TTL_DAYS):
+    """Look up awards for (title, release_year) pairs concurrently.
+    
+    Lookups go through a shared rate limiter and a persistent cache, so a rerun
+    only hits IMDb for new titles or expired entries. Each worker thread gets
+    its own IMDb client.
+    """
+    if imdb_factory is None:
+        raise RuntimeError("IMDbPY is not installed; run `pip install cinemagoer`")
+    
+    local = threading.local()
+    rate_limiter = RateLimiter(requests_per_second, burst=workers)
+    
+    def fetch(key):
+        if not hasattr(local, 'imdb'):
+            local.imdb = imdb_factory()
+        return fetch_awards_count(local.imdb, key[0], rate_limiter)
+    
+    cache = LookupCache(cache_path, namespace='imdb_awards', ttl_days=ttl_days)
+    try:
+        return run_lookups(
+            [(title, year) for title, year in rows if title],
+            fetch,
+            workers=workers,
+            cache=cache
+        )
+    finally:
+        cache.close()
+
 def extract_primary_genre(listed_in):
     """Extract primary genre from listed_in field."""
     if not listed_in:
@@ -63,45 +119,44 @@ def extract_primary_genre(listed_in):
     genres = [g.strip() for g in listed_in.split(',')]
     return genres[0] if genres else None
 
-def main():
-    conn = sqlite3.connect(DB_PATH)
+def main(db_path=DB_PATH, imdb_factory=IMDb, cache_path=CACHE_PATH, batch_size=WRITE_BATCH_SIZE,
+         events_path=EVENTS_PATH):
+    conn = configure_for_writes(sqlite3.connect(db_path))
     cursor = conn.cursor()
-    ia = IMDb()
 
     # Get all titles
     cursor.execute("SELECT show_id, title, country, release_year, listed_in FROM netflix_titles")
     rows = cursor.fetchall()
+    
+    # Fetch awards up front; titles whose lookup failed keep a count of 0
+    awards = fetch_all_awards([(row[1], row[3]) for row in rows], imdb_factory, cache_path=cache_path)
 
-    for show_id, title, country, release_year, listed_in in rows:
-        # Update awards
-        awards_count = get_awards_count(ia, title)
-        
-        # Calculate political context score
-        if country and release_year:
-            # Handle multiple countries
-            countries = [c.strip() for c in country.split(',')] if country else []
-            max_score = 0
-            for c in countries:
-                score = calculate_political_context_score(c, release_year)
-                max_score = max(max_score, score)
-        else:
-            max_score = 0
-
-        # Extract primary genre
-        primary_genre = extract_primary_genre(listed_in)
-        
-        # Update database
-        cursor.execute("""
-            UPDATE netflix_titles 
-            SET awards = ?,
-                political_context_score = ?,
-                genre = ?
-            WHERE show_id = ?
-        """, (awards_count, max_score, primary_genre, show_id))
-        
-        print(f"Updated {title}: Awards={awards_count}, Political Score={max_score}, Genre={primary_genre}")
+    # Political context for every title in one vectorized lookup
+    # (the max over each title's countries, as calculate_political_context_score did per title)
+    event_index = load_event_index(events_path, fallback=events_from_dict(MAJOR_EVENTS))
+    political_scores = event_index.score_titles([row[2] for row in rows], [row[3] for row in rows])
 
-    conn.commit()
+    update_sql = """
+        UPDATE netflix_titles 
+        SET awards = ?,
+            political_context_score = ?,
+            genre = ?
+        WHERE show_id = ?
+    """
+    with BatchWriter(conn, update_sql, batch_size=batch_size, total=len(rows), label='titles') as writer:
+        for (show_id, title, country, release_year, listed_in), score in zip(rows, political_scores):
+            # Update awards
+            awards_count = awards.get((title, release_year), 0)
+            
+            # Extract primary genre
+            primary_genre = extract_primary_genre(listed_in)
+            
+            writer.add((awards_count, float(score), primary_genre, show_id))
+    
+    # Rebuild the country/year aggregate served by /api/political-matrix
+    matrix_rows = refresh_political_matrix(conn)
+    print(f"Refreshed political_matrix ({matrix_rows} rows)")
+    
     conn.close()
 
 if __name__ == "__main__":
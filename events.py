@@ -0,0 +1,298 @@
+import argparse
+import os
+import re
+import sqlite3
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+from data_access import split_list
+from date_utils import parse_dates
+
+# Configuration
+DB_PATH = "netflix_titles.db"
+EVENTS_PATH = "major_country_events.csv"  # an Excel workbook despite the extension
+
+INTENSITY_SCORES = {'Low': 1, 'Moderate': 2, 'High': 3}
+BASELINE_SCORE = 1  # a known country/year with no recorded events
+NO_CONTEXT_SCORE = 0  # titles without a country or release year
+
+# Spellings in the events sheet (and MAJOR_EVENTS) that differ from the catalog
+COUNTRY_ALIASES = {
+    'USA': 'United States',
+    'Sourth Korea': 'South Korea',
+    'Columbia': 'Colombia',
+}
+
+# Events mentioning any of these are scored as High intensity, the rest as Moderate
+HIGH_INTENSITY_WORDS = [
+    'coup', 'riot', 'shooting', 'attack', 'massacre', 'conflict', 'violence', 'war',
+    'uprising', 'insurrection', 'crackdown', 'cleansing', 'security law', 'impeachment'
+]
+
+# "(2019 - 2020) Name", "Name (2021)", "2024 Name"
+YEAR_PATTERN = re.compile(r'\(?\s*((?:19|20)\d{2})\s*(?:-\s*((?:19|20)\d{2}))?\s*\)?')
+
+# Words left out of an event's keywords
+KEYWORD_STOPWORDS = {'a', 'an', 'and', 'at', 'by', 'for', 'from', 'in', 'of', 'on', 'the', 'to', 'fallout'}
+
+def normalize_country(name):
+    name = str(name).strip()
+    return COUNTRY_ALIASES.get(name, name)
+
+def classify_intensity(event):
+    text = event.lower()
+    return 'High' if any(word in text for word in HIGH_INTENSITY_WORDS) else 'Moderate'
+
+def event_keywords(event):
+    """Comma-separated lowercase keywords, in the MAJOR_EVENTS 'keywords' style."""
+    words = re.findall(r"\b[a-z][a-z'-]+", event.lower())
+    return ','.join(dict.fromkeys(w.strip("-'") for w in words if w not in KEYWORD_STOPWORDS))
+
+def parse_event(text):
+    """Split an event cell into (name, start_year, end_year); None if it has no year."""
+    text = ' '.join(str(text).split())
+    match = YEAR_PATTERN.search(text)
+    if not match:
+        return None
+    start = int(match.group(1))
+    end = int(match.group(2)) if match.group(2) else start
+    name = (text[:match.start()] + ' ' + text[match.end():]).strip(' -+')
+    return ' '.join(name.split()), min(start, end), max(start, end)
+
+def read_events_sheet(path=EVENTS_PATH):
+    """Read the raw Country / Event 1..N sheet, whichever format it is saved in."""
+    with open(path, 'rb') as f:
+        is_workbook = f.read(2) == b'PK'
+    return pd.read_excel(path) if is_workbook else pd.read_csv(path)
+
+def load_events(path=EVENTS_PATH):
+    """One row per event: country, event, start_year, end_year, intensity."""
+    sheet = read_events_sheet(path)
+    records = []
+    for row in sheet.itertuples(index=False):
+        country = normalize_country(row[0])
+        for cell in row[1:]:
+            if pd.isna(cell) or not str(cell).strip():
+                continue
+            parsed = parse_event(cell)
+            if parsed is None:
+                print(f"Skipping event without a year for {country}: {cell!r}")
+                continue
+            name, start, end = parsed
+            records.append((country, name, start, end, classify_intensity(name)))
+    return pd.DataFrame(records, columns=['country', 'event', 'start_year', 'end_year', 'intensity'])
+
+def events_from_dict(events_dict):
+    """Flatten a MAJOR_EVENTS-style {country: {year: {...}}} mapping into load_events rows."""
+    records = []
+    for country, years in events_dict.items():
+        for year, info in years.items():
+            for name in info.get('events', []):
+                records.append((normalize_country(country), name, year, year, info.get('intensity', 'Low')))
+    return pd.DataFrame(records, columns=['country', 'event', 'start_year', 'end_year', 'intensity'])
+
+def score_events(events):
+    """Score per (country, year) with the calculate_political_context_score rule.
+
+    Multi-year events count in every year they span; the strongest
+    intensity recorded for the year sets the base score.
+    """
+    years = events.assign(year=[range(s, e + 1) for s, e in zip(events['start_year'], events['end_year'])])
+    years = years.explode('year').astype({'year': int})
+    years['base'] = years['intensity'].map(INTENSITY_SCORES).fillna(INTENSITY_SCORES['Low'])
+    grouped = years.groupby(['country', 'year']).agg(base=('base', 'max'), count=('event', 'size'))
+    return grouped['base'] * (1 + grouped['count'] * 0.5)
+
+class EventIndex:
+    """Dense (country_id, year) -> political context score lookup.
+
+    Built once from the events sheet; scoring the catalog is then a single
+    array lookup over the exploded country lists plus a per-title max.
+    """
+
+    def __init__(self, scores):
+        self.countries = pd.Index(sorted(scores.index.get_level_values('country').unique()))
+        years = scores.index.get_level_values('year')
+        self.min_year = int(years.min()) if len(scores) else 0
+        n_years = int(years.max()) - self.min_year + 1 if len(scores) else 0
+        self.table = np.full((len(self.countries), n_years), BASELINE_SCORE, dtype=np.float32)
+        self.table[self.countries.get_indexer(scores.index.get_level_values('country')),
+                   years.to_numpy(dtype=int) - self.min_year] = scores.to_numpy()
+
+    @classmethod
+    def from_events(cls, events):
+        return cls(score_events(events))
+
+    def lookup(self, countries, years):
+        """Vectorized score for parallel arrays of country names and years."""
+        codes = self.countries.get_indexer(pd.Index(countries))
+        offsets = pd.to_numeric(pd.Series(years), errors='coerce').to_numpy(dtype=float) - self.min_year
+        valid = (codes >= 0) & (offsets >= 0) & (offsets < self.table.shape[1])
+        scores = np.full(len(codes), BASELINE_SCORE, dtype=np.float32)
+        scores[valid] = self.table[codes[valid], offsets[valid].astype(int)]
+        return scores
+
+    def score_titles(self, countries, years):
+        """Max score over each title's comma-separated countries.
+
+        Titles without a country or a release year score NO_CONTEXT_SCORE,
+        matching the per-title loop this replaces.
+        """
+        years = pd.to_numeric(pd.Series(years), errors='coerce').reset_index(drop=True)
+        parts = split_list(countries)
+        parts = parts[years.reindex(parts.index).notna().to_numpy()]
+        if parts.empty:
+            return np.full(len(years), NO_CONTEXT_SCORE, dtype=np.float32)
+        scores = pd.Series(self.lookup(parts.to_numpy(), years.reindex(parts.index).to_numpy()), index=parts.index)
+        best = scores.groupby(level=0).max()
+        return best.reindex(range(len(years)), fill_value=NO_CONTEXT_SCORE).to_numpy(dtype=np.float32)
+
+@lru_cache(maxsize=4)
+def _cached_index(path, mtime_ns):
+    return EventIndex.from_events(load_events(path))
+
+def load_event_index(path=EVENTS_PATH, fallback=None):
+    """EventIndex for the events sheet, built once per file version.
+
+    When the sheet is missing or cannot be read (e.g. openpyxl is not
+    installed) the index is built from `fallback` events instead.
+    """
+    try:
+        return _cached_index(path, os.stat(path).st_mtime_ns)
+    except (OSError, ImportError, ValueError) as e:
+        if fallback is None:
+            raise
+        print(f"Could not load events from {path} ({e}); using built-in events")
+        return EventIndex.from_events(fallback)
+
+def create_events_table(cursor):
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS events (
+            event_id INTEGER PRIMARY KEY,
+            country TEXT NOT NULL,
+            event TEXT NOT NULL,
+            start_date TEXT NOT NULL,
+            end_date TEXT NOT NULL,
+            intensity TEXT NOT NULL,
+            keywords TEXT
+        )
+    """)
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_events_country_dates ON events (country, start_date, end_date)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_events_dates ON events (start_date, end_date)")
+
+def ingest_events(conn, events):
+    """Replace the events table with the given load_events frame.
+
+    The sheet only records years, so an event covers 1 January of its
+    first year through 31 December of its last.
+    """
+    cursor = conn.cursor()
+    create_events_table(cursor)
+    rows = [
+        (country, event, f"{start:04d}-01-01", f"{end:04d}-12-31", intensity, event_keywords(event))
+        for country, event, start, end, intensity in events[
+            ['country', 'event', 'start_year', 'end_year', 'intensity']].itertuples(index=False)
+    ]
+    with conn:
+        cursor.execute("DELETE FROM events")
+        cursor.executemany("""
+            INSERT INTO events (country, event, start_date, end_date, intensity, keywords)
+            VALUES (?, ?, ?, ?, ?, ?)
+        """, rows)
+    return len(rows)
+
+def read_events_table(conn, countries=None):
+    """Events as a frame with parsed start/end dates, optionally for some countries."""
+    sql = "SELECT event_id, country, event, start_date, end_date, intensity, keywords FROM events"
+    params = []
+    if countries is not None:
+        countries = list(countries)
+        sql += f" WHERE country IN ({', '.join('?' * len(countries))})"
+        params = countries
+    events = pd.read_sql_query(sql, conn, params=params)
+    for column in ('start_date', 'end_date'):
+        events[column] = pd.to_datetime(events[column], format='%Y-%m-%d')
+    return events
+
+def _expand_ranges(lo, hi):
+    """(owner, position) pairs for the half-open ranges [lo[i], hi[i])."""
+    counts = np.maximum(hi - lo, 0)
+    owners = np.repeat(np.arange(len(lo)), counts)
+    offsets = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+    return owners, np.repeat(lo, counts) + offsets
+
+def match_events(titles, events, window_days=0):
+    """Range-join titles to the events of their countries by date_added.
+
+    A title matches an event when one of its countries is the event's country
+    and date_added falls within [start_date - window_days, end_date + window_days].
+
+    This is a sorted merge per country: with the events sorted by start,
+    two binary searches bound the only events that can contain a date (those
+    starting no earlier than the date minus the longest event), so the cost
+    is O((titles + events) log events + candidates) instead of comparing
+    every title with every event.
+
+    titles needs show_id, country and date_added columns; events comes from
+    read_events_table. Returns one row per (title, country, event) match.
+    """
+    columns = ['show_id', 'country', 'date_added', 'event_id', 'event', 'start_date', 'end_date', 'intensity', 'keywords']
+    titles = titles.reset_index(drop=True)
+    parts = split_list(titles['country'])
+    exploded = pd.DataFrame({
+        'show_id': titles['show_id'].to_numpy()[parts.index],
+        'country': parts.to_numpy(),
+        'date_added': parse_dates(titles['date_added']).to_numpy()[parts.index]
+    }).dropna(subset=['date_added'])
+
+    window = pd.Timedelta(days=window_days)
+    dates_by_country = exploded.groupby('country', sort=False)
+    matches = []
+    for country, country_events in events.groupby('country', sort=False):
+        if country not in dates_by_country.groups:
+            continue
+        country_titles = dates_by_country.get_group(country)
+        country_events = country_events.sort_values('start_date')
+        starts = (country_events['start_date'] - window).to_numpy()
+        ends = (country_events['end_date'] + window).to_numpy()
+        longest = (ends - starts).max()
+
+        dates = country_titles['date_added'].to_numpy()
+        lo = np.searchsorted(starts, dates - longest, side='left')
+        hi = np.searchsorted(starts, dates, side='right')
+        title_positions, event_positions = _expand_ranges(lo, hi)
+        found = ends[event_positions] >= dates[title_positions]
+
+        matched = country_titles.iloc[title_positions[found]].reset_index(drop=True)
+        matched_events = country_events.iloc[event_positions[found]].drop(columns='country').reset_index(drop=True)
+        matches.append(pd.concat([matched, matched_events], axis=1))
+
+    if not matches:
+        return pd.DataFrame(columns=columns)
+    return pd.concat(matches, ignore_index=True)[columns]
+
+def title_events(conn, window_days=0, countries=None):
+    """Match every title in netflix_titles to its countries' events by date_added."""
+    titles = pd.read_sql_query("SELECT show_id, country, date_added FROM netflix_titles", conn)
+    return match_events(titles, read_events_table(conn, countries), window_days)
+
+def main():
+    parser = argparse.ArgumentParser(description="Load major_country_events into the events table.")
+    parser.add_argument('--db', default=DB_PATH)
+    parser.add_argument('--events', default=EVENTS_PATH)
+    parser.add_argument('--window-days', type=int, default=30,
+                        help="Report how many titles were added within this many days of an event")
+    args = parser.parse_args()
+
+    conn = sqlite3.connect(args.db)
+    count = ingest_events(conn, load_events(args.events))
+    print(f"Loaded {count} events into {args.db}")
+    matches = title_events(conn, args.window_days)
+    print(f"{matches['show_id'].nunique()} titles were added within {args.window_days} days of an event "
+          f"({len(matches)} title/event matches)")
+    conn.close()
+
+if __name__ == '__main__':
+    main()
@@ -8,12 +8,27 @@ const country = urlParams.get('country');
 document.getElementById('country-title').textContent = `${country} Analysis`;
 document.title = `Netflix Analysis - ${country}`;
 
-// Load country data
+// Load country data, fetching only this country's shard when the manifest is available
 async function loadCountryData() {
+    try {
+        const manifestResponse = await fetch('../data/manifest.json');
+        if (manifestResponse.ok) {
+            const manifest = await manifestResponse.json();
+            const shard = manifest.countries[country];
+            if (!shard) {
+                return [];
+            }
+            const response = await fetch(`../data/${shard.file}`);
+            return await response.json();
+        }
+    } catch (error) {
+        console.warn('Shard manifest unavailable, loading full dataset:', error);
+    }
+
     try {
         const response = await fetch('../data/netflix_titles.json');
         const data = await response.json();
-        return data.filter(item => item.country === country);
+        return data.filter(item => item.countries ? item.countries.includes(country) : item.country === country);
     } catch (error) {
         console.error('Error loading data:', error);
         return [];
@@ -30,39 +30,76 @@ document.addEventListener('DOMContentLoaded', async () => {
     await visualizations.initialize();
 });
 
+// Full title export, needed by the charts that plot individual titles
+async function loadTitles() {
+    const response = await fetch(`${BASE_PATH}data/netflix_titles.json`);
+    return response.json();
+}
+
+// Per-country title counts and genre lists for the country list, plus the
+// titles when they had to be fetched to compute them (null otherwise)
+async function loadCountryStats() {
+    // Prefer the precomputed per-country summary written by scripts/process_data.py
+    try {
+        const summaryResponse = await fetch(`${BASE_PATH}data/summary.json`);
+        if (summaryResponse.ok) {
+            const summary = await summaryResponse.json();
+            const countryStats = {};
+            Object.entries(summary.countries).forEach(([country, stats]) => {
+                countryStats[country] = {
+                    total: stats.total,
+                    movies: stats.movies,
+                    shows: stats.shows,
+                    genres: new Set(stats.genres),
+                    escapismScore: 0,
+                    realityScore: 0
+                };
+            });
+            return { countryStats, titles: null };
+        }
+    } catch (error) {
+        console.warn('Summary unavailable, computing from full dataset:', error);
+    }
+
+    const data = await loadTitles();
+    
+    // Get unique countries and their content counts
+    const countryStats = {};
+    data.forEach(item => {
+        const country = item.country;
+        if (country && country.trim()) {
+            const cleanCountry = country.trim();
+            if (!countryStats[cleanCountry]) {
+                countryStats[cleanCountry] = {
+                    total: 0,
+                    movies: 0,
+                    shows: 0,
+                    genres: new Set(),
+                    escapismScore: 0,
+                    realityScore: 0
+                };
+            }
+            countryStats[cleanCountry].total++;
+            if (item.type === 'Movie') {
+                countryStats[cleanCountry].movies++;
+            } else {
+                countryStats[cleanCountry].shows++;
+            }
+            // Individual genres, like the genres lists in summary.json
+            (item.genres || []).forEach(genre => countryStats[cleanCountry].genres.add(genre));
+        }
+    });
+
+    return { countryStats, titles: data };
+}
+
 // Load and display country list
 async function loadCountryList() {
+    let titles = null;
     try {
-        const response = await fetch(`${BASE_PATH}data/netflix_titles.json`);
-        const data = await response.json();
-        
-        // Get unique countries and their content counts
-        const countryStats = {};
-        data.forEach(item => {
-            const country = item.country;
-            if (country && country.trim()) {
-                const cleanCountry = country.trim();
-                if (!countryStats[cleanCountry]) {
-                    countryStats[cleanCountry] = {
-                        total: 0,
-                        movies: 0,
-                        shows: 0,
-                        genres: new Set(),
-                        escapismScore: 0,
-                        realityScore: 0
-                    };
-                }
-                countryStats[cleanCountry].total++;
-                if (item.type === 'Movie') {
-                    countryStats[cleanCountry].movies++;
-                } else {
-                    countryStats[cleanCountry].shows++;
-                }
-                if (item.listed_in) {
-                    countryStats[cleanCountry].genres.add(item.listed_in);
-                }
-            }
-        });
+        const loaded = await loadCountryStats();
+        const countryStats = loaded.countryStats;
+        titles = loaded.titles;
 
         // Calculate escapism and reality scores
         Object.keys(countryStats).forEach(country => {
@@ -110,17 +147,24 @@ async function loadCountryList() {
 
         // Update global metrics
         updateGlobalMetrics(countryStats);
-        
-        // Initialize visualizations
-        createGlobalHeatmap(data);
         createPreferenceComparison(countryStats);
-        createCovidAnalysis(data);
-        createPoliticalMatrix(data);
 
     } catch (error) {
         console.error('Error loading country data:', error);
         document.getElementById('country-list').innerHTML = 
             '<div class="error">Error loading country data. Please try again later.</div>';
+        return;
+    }
+
+    // The remaining charts plot individual titles, which summary.json does not have
+    try {
+        const data = titles || await loadTitles();
+        createGlobalHeatmap(data);
+        createCovidAnalysis(data);
+        createPoliticalMatrix(data);
+    } catch (error) {
+        console.error('Error loading title data:', error);
+        showError('Failed to load Netflix data');
     }
 }
 
@@ -129,16 +173,16 @@ function updateGlobalMetrics(countryStats) {
     // Find most escapist country
     const mostEscapist = Object.entries(countryStats)
         .reduce((max, [country, stats]) => 
-            stats.escapismScore > (max.score || 0) ? 
+            stats.escapismScore > max.score ? 
             { country, score: stats.escapismScore } : max
-        , {});
+        , { country: 'N/A', score: 0 });
 
     // Find most reality-based country
     const mostReality = Object.entries(countryStats)
         .reduce((max, [country, stats]) => 
-            stats.realityScore > (max.score || 0) ? 
+            stats.realityScore > max.score ? 
             { country, score: stats.realityScore } : max
-        , {});
+        , { country: 'N/A', score: 0 });
 
     // Update DOM
     document.getElementById('most-escapist-country').textContent = mostEscapist.country;
@@ -0,0 +1,217 @@
+import argparse
+import re
+import sqlite3
+
+import pandas as pd
+
+# Configuration
+DB_PATH = "netflix_titles.db"
+BATCH_SIZE = 1000
+TRIGRAM_SIZE = 3
+
+TOKEN_PATTERN = re.compile(r'\w+', re.UNICODE)
+
+def tokenize(text):
+    """Distinct lowercased word tokens of a description."""
+    return set(TOKEN_PATTERN.findall(text.lower())) if text else set()
+
+def trigrams(term):
+    """Distinct three-character substrings of a term."""
+    return {term[i:i + TRIGRAM_SIZE] for i in range(len(term) - TRIGRAM_SIZE + 1)}
+
+def create_keyword_index(conn):
+    """Create the description keyword index tables.
+
+    keyword_postings maps each distinct token to the titles whose
+    description contains it. keyword_documents holds the description each
+    title was indexed from, so changed titles can be found with a join
+    instead of re-tokenizing the catalog. keyword_trigrams maps every
+    trigram of a vocabulary term to that term, so the terms containing a
+    partial word are found without scanning the vocabulary.
+    """
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS keyword_documents (
+            show_id TEXT PRIMARY KEY,
+            description TEXT
+        )
+    """)
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS keyword_postings (
+            term TEXT NOT NULL,
+            show_id TEXT NOT NULL,
+            PRIMARY KEY (term, show_id)
+        ) WITHOUT ROWID
+    """)
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_keyword_postings_show_id ON keyword_postings (show_id)")
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS keyword_trigrams (
+            trigram TEXT NOT NULL,
+            term TEXT NOT NULL,
+            PRIMARY KEY (trigram, term)
+        ) WITHOUT ROWID
+    """)
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_keyword_trigrams_term ON keyword_trigrams (term)")
+
+def add_trigrams(conn, terms):
+    conn.executemany("INSERT OR IGNORE INTO keyword_trigrams VALUES (?, ?)",
+                     ((trigram, term) for term in terms for trigram in trigrams(term)))
+
+def remove_trigrams(conn, terms):
+    conn.executemany("DELETE FROM keyword_trigrams WHERE term = ?", ((term,) for term in terms))
+
+def has_postings(conn, term):
+    return conn.execute("SELECT 1 FROM keyword_postings WHERE term = ? LIMIT 1", (term,)).fetchone() is not None
+
+def stale_show_ids(conn):
+    """Titles that were added, edited or deleted since they were last indexed."""
+    rows = conn.execute("""
+        SELECT t.show_id FROM netflix_titles t
+        LEFT JOIN keyword_documents d ON d.show_id = t.show_id
+        WHERE d.show_id IS NULL OR d.description IS NOT t.description
+        UNION
+        SELECT d.show_id FROM keyword_documents d
+        WHERE NOT EXISTS (SELECT 1 FROM netflix_titles t WHERE t.show_id = d.show_id)
+    """).fetchall()
+    return [row[0] for row in rows]
+
+def update_keyword_index(conn, show_ids=None):
+    """Re-index the given titles (default: every stale title) and return how many.
+
+    The first call indexes the whole catalog; after that only titles whose
+    description changed are tokenized again, and only terms that enter or
+    leave the vocabulary touch keyword_trigrams.
+    """
+    had_trigrams = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'keyword_trigrams'"
+    ).fetchone() is not None
+    create_keyword_index(conn)
+    if not had_trigrams:
+        # Index built before keyword_trigrams existed
+        with conn:
+            add_trigrams(conn, [row[0] for row in conn.execute("SELECT DISTINCT term FROM keyword_postings")])
+    if show_ids is None:
+        show_ids = stale_show_ids(conn)
+    show_ids = list(show_ids)
+    with conn:
+        for start in range(0, len(show_ids), BATCH_SIZE):
+            batch = show_ids[start:start + BATCH_SIZE]
+            placeholders = ', '.join('?' * len(batch))
+            old_terms = [row[0] for row in conn.execute(
+                f"SELECT DISTINCT term FROM keyword_postings WHERE show_id IN ({placeholders})", batch
+            )]
+            conn.execute(f"DELETE FROM keyword_postings WHERE show_id IN ({placeholders})", batch)
+            conn.execute(f"DELETE FROM keyword_documents WHERE show_id IN ({placeholders})", batch)
+            documents = conn.execute(
+                f"SELECT show_id, description FROM netflix_titles WHERE show_id IN ({placeholders})", batch
+            ).fetchall()
+            postings = [(term, show_id) for show_id, description in documents for term in tokenize(description)]
+            new_terms = {term for term, _ in postings if not has_postings(conn, term)}
+            conn.executemany("INSERT OR REPLACE INTO keyword_documents VALUES (?, ?)", documents)
+            conn.executemany("INSERT OR IGNORE INTO keyword_postings VALUES (?, ?)", postings)
+            add_trigrams(conn, new_terms)
+            remove_trigrams(conn, [term for term in old_terms if not has_postings(conn, term)])
+    return len(show_ids)
+
+class KeywordIndex:
+    """In-memory posting lists for scoring description keywords.
+
+    A keyword matches exactly the titles whose lowercased description
+    contains it as a substring (the rule calculate_content_preference_scores
+    has always used), so 'war' still matches "award" and "warrior".
+    A keyword made only of word characters can only occur inside a single
+    token, so its titles are the union of the posting lists of the
+    vocabulary terms containing it: the term itself straight from the
+    postings, the rest from the terms sharing all of its trigrams. Multi-word
+    keywords ('true story') intersect the candidates of each word and
+    confirm them against the indexed description.
+    """
+
+    def __init__(self, postings, documents, trigram_terms):
+        self.postings = postings
+        self.documents = documents
+        self.trigram_terms = trigram_terms
+        self._matches = {}
+
+    def terms_containing(self, part):
+        """Vocabulary terms that contain part."""
+        if len(part) < TRIGRAM_SIZE:
+            # Too short to have a trigram; rare enough to scan for
+            return [term for term in self.postings if part in term]
+        candidates = None
+        for trigram in trigrams(part):
+            terms = self.trigram_terms.get(trigram)
+            if not terms:
+                return []
+            candidates = set(terms) if candidates is None else candidates & terms
+        return [term for term in candidates if part in term]
+
+    def _containing(self, part):
+        titles = set(self.postings.get(part, ()))
+        for term in self.terms_containing(part):
+            titles |= self.postings[term]
+        return titles
+
+    def titles_matching(self, keyword):
+        """Set of show_ids whose description contains keyword (case-insensitively)."""
+        keyword = keyword.lower()
+        if keyword not in self._matches:
+            parts = TOKEN_PATTERN.findall(keyword)
+            if parts == [keyword]:
+                titles = self._containing(keyword)
+            else:
+                candidates = self.documents.keys()
+                for part in parts:
+                    candidates = self._containing(part).intersection(candidates)
+                titles = {show_id for show_id in candidates
+                          if self.documents[show_id] is not None and keyword in self.documents[show_id].lower()}
+            self._matches[keyword] = frozenset(titles)
+        return self._matches[keyword]
+
+    def count_matches(self, show_ids, keywords):
+        """Number of keywords matched by each title, aligned with show_ids."""
+        counts = pd.Series(0.0, index=pd.Index(self.documents.keys()))
+        for keyword in keywords:
+            titles = self.titles_matching(keyword)
+            if titles:
+                counts[list(titles)] += 1
+        return counts.reindex(pd.Series(show_ids, dtype=object), fill_value=0.0).to_numpy()
+
+def read_keyword_index(conn):
+    postings = {}
+    for term, show_id in conn.execute("SELECT term, show_id FROM keyword_postings"):
+        postings.setdefault(term, set()).add(show_id)
+    documents = dict(conn.execute("SELECT show_id, description FROM keyword_documents"))
+    trigram_terms = {}
+    for trigram, term in conn.execute("SELECT trigram, term FROM keyword_trigrams"):
+        trigram_terms.setdefault(trigram, set()).add(term)
+    return KeywordIndex(postings, documents, trigram_terms)
+
+def load_keyword_index(db_path=DB_PATH):
+    """Bring the persisted index up to date and load it, or None if it cannot be."""
+    try:
+        conn = sqlite3.connect(db_path)
+        try:
+            updated = update_keyword_index(conn)
+            if updated:
+                print(f"Re-indexed keywords for {updated} titles")
+            return read_keyword_index(conn)
+        finally:
+            conn.close()
+    except sqlite3.Error as e:
+        print(f"Keyword index unavailable, scanning descriptions instead: {e}")
+        return None
+
+def main():
+    parser = argparse.ArgumentParser(description="Count titles whose description mentions each keyword.")
+    parser.add_argument('keywords', nargs='+')
+    parser.add_argument('--db', default=DB_PATH)
+    args = parser.parse_args()
+
+    index = load_keyword_index(args.db)
+    if index is None:
+        raise SystemExit(1)
+    for keyword in args.keywords:
+        print(f"{keyword}: {len(index.titles_matching(keyword))} titles")
+
+if __name__ == '__main__':
+    main()
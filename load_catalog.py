@@ -0,0 +1,194 @@
+import argparse
+import csv
+import os
+import sqlite3
+import time
+from itertools import islice
+
+from db_utils import configure_for_writes, quote
+from keyword_index import update_keyword_index
+from setup_database import ENRICHMENT_COLUMNS, create_title_indexes, refresh_bridge_tables, setup_database
+
+# Configuration
+CSV_PATH = "netflix_titles.csv"
+DB_PATH = "netflix_titles.db"
+CHUNK_SIZE = 5000
+
+# netflix_titles.csv columns and their SQLite types
+CATALOG_COLUMNS = {
+    'show_id': 'TEXT NOT NULL PRIMARY KEY',
+    'type': 'TEXT',
+    'title': 'TEXT',
+    'director': 'TEXT',
+    'cast': 'TEXT',
+    'country': 'TEXT',
+    'date_added': 'TEXT',
+    'release_year': 'INTEGER',
+    'rating': 'TEXT',
+    'duration': 'TEXT',
+    'listed_in': 'TEXT',
+    'description': 'TEXT'
+}
+INTEGER_COLUMNS = [column for column, sql_type in CATALOG_COLUMNS.items() if sql_type.startswith('INTEGER')]
+
+def create_titles_table(conn, table='netflix_titles', temporary=False):
+    columns = {**CATALOG_COLUMNS, **({} if temporary else ENRICHMENT_COLUMNS)}
+    definitions = ',\n            '.join(f"{quote(name)} {sql_type}" for name, sql_type in columns.items())
+    conn.execute(f"""
+        CREATE {'TEMP ' if temporary else ''}TABLE IF NOT EXISTS {table} (
+            {definitions}
+        )
+    """)
+
+def _convert(value, integer):
+    value = value.strip()
+    if not value:
+        return None
+    if integer:
+        try:
+            return int(value)
+        except ValueError:
+            return None
+    return value
+
+def iter_chunks(csv_path, chunk_size=CHUNK_SIZE):
+    """Stream the CSV as lists of typed row tuples in CATALOG_COLUMNS order."""
+    with open(csv_path, newline='', encoding='utf-8') as f:
+        reader = csv.reader(f)
+        header = [name.strip() for name in next(reader)]
+        missing = set(CATALOG_COLUMNS) - set(header)
+        if missing:
+            raise ValueError(f"{csv_path} is missing columns: {sorted(missing)}")
+        positions = [header.index(column) for column in CATALOG_COLUMNS]
+        integer = [column in INTEGER_COLUMNS for column in CATALOG_COLUMNS]
+        while True:
+            rows = list(islice(reader, chunk_size))
+            if not rows:
+                return
+            yield [
+                tuple(_convert(row[i], is_int) if i < len(row) else None for i, is_int in zip(positions, integer))
+                for row in rows
+            ]
+
+def _insert_sql(table, verb='INSERT'):
+    columns = ', '.join(quote(column) for column in CATALOG_COLUMNS)
+    placeholders = ', '.join('?' * len(CATALOG_COLUMNS))
+    return f"{verb} INTO {table} ({columns}) VALUES ({placeholders})"
+
+def checkpoint(db_path):
+    """Fold db_path's WAL back into the database file before it is replaced.
+
+    Unlinking the -wal file instead would drop commits that were not yet
+    checkpointed and pull it out from under readers that have it open.
+    """
+    if os.path.exists(db_path):
+        conn = sqlite3.connect(db_path)
+        conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        conn.close()
+
+def load_full(csv_path=CSV_PATH, db_path=DB_PATH, chunk_size=CHUNK_SIZE):
+    """Build a fresh database from the CSV and swap it in place of db_path.
+
+    The load writes to a scratch file with journaling and fsync switched
+    off, inserts every chunk in one transaction, and only then builds the
+    indexes, bridge tables and events table. A failed load leaves the
+    existing database untouched. Enrichment columns start empty.
+    """
+    scratch = db_path + '.loading'
+    for path in (scratch, scratch + '-journal'):
+        if os.path.exists(path):
+            os.remove(path)
+
+    started = time.monotonic()
+    conn = sqlite3.connect(scratch)
+    conn.execute("PRAGMA journal_mode=OFF")
+    conn.execute("PRAGMA synchronous=OFF")
+    conn.execute("PRAGMA cache_size=-65536")
+    create_titles_table(conn)
+    insert_sql = _insert_sql('netflix_titles', 'INSERT OR REPLACE')
+    loaded = 0
+    with conn:
+        for chunk in iter_chunks(csv_path, chunk_size):
+            conn.executemany(insert_sql, chunk)
+            loaded += len(chunk)
+            print(f"Loaded {loaded} rows ({time.monotonic() - started:.1f}s)")
+    conn.close()
+
+    # Indexes, bridge tables and events are cheaper to build once the rows are in
+    setup_database(scratch)
+    conn = configure_for_writes(sqlite3.connect(scratch))
+    conn.close()
+
+    checkpoint(db_path)
+    os.replace(scratch, db_path)
+    print(f"Built {db_path} from {csv_path}: {loaded} titles in {time.monotonic() - started:.1f}s")
+    return loaded
+
+def load_upsert(csv_path=CSV_PATH, db_path=DB_PATH, chunk_size=CHUNK_SIZE):
+    """Merge a refreshed CSV into an existing database, keyed on show_id.
+
+    New titles are inserted and changed catalog fields are updated in place;
+    enrichment columns (awards, scores, genre) are kept. Only the titles
+    that actually changed get their bridge rows and keywords rebuilt.
+    Returns (inserted, updated).
+    """
+    started = time.monotonic()
+    # Merges run against the live database, so keep WAL + synchronous=NORMAL
+    conn = configure_for_writes(sqlite3.connect(db_path))
+    create_titles_table(conn)
+    # The unique show_id index is what ON CONFLICT(show_id) needs on older databases
+    create_title_indexes(conn.cursor())
+
+    create_titles_table(conn, 'catalog_staging', temporary=True)
+    conn.execute("DELETE FROM catalog_staging")
+    insert_sql = _insert_sql('catalog_staging', 'INSERT OR REPLACE')
+    with conn:
+        for chunk in iter_chunks(csv_path, chunk_size):
+            conn.executemany(insert_sql, chunk)
+
+    columns = [column for column in CATALOG_COLUMNS if column != 'show_id']
+    old = ', '.join(f"t.{quote(column)}" for column in columns)
+    new = ', '.join(f"s.{quote(column)}" for column in columns)
+    changed = conn.execute(f"""
+        SELECT s.show_id, t.show_id IS NULL
+        FROM catalog_staging s
+        LEFT JOIN netflix_titles t ON t.show_id = s.show_id
+        WHERE t.show_id IS NULL OR ({old}) IS NOT ({new})
+    """).fetchall()
+
+    all_columns = ', '.join(quote(column) for column in CATALOG_COLUMNS)
+    updates = ', '.join(f"{quote(column)} = excluded.{quote(column)}" for column in columns)
+    with conn:
+        # WHERE true keeps the parser from reading ON CONFLICT as a join constraint
+        conn.execute(f"""
+            INSERT INTO netflix_titles ({all_columns})
+            SELECT {all_columns} FROM catalog_staging WHERE true
+            ON CONFLICT(show_id) DO UPDATE SET {updates}
+        """)
+    conn.execute("DROP TABLE catalog_staging")
+
+    changed_ids = [show_id for show_id, _ in changed]
+    inserted = sum(1 for _, is_new in changed if is_new)
+    refresh_bridge_tables(conn, show_ids=changed_ids)
+    update_keyword_index(conn, show_ids=changed_ids)
+    conn.close()
+    print(f"Merged {csv_path} into {db_path}: {inserted} new, {len(changed_ids) - inserted} updated "
+          f"({time.monotonic() - started:.1f}s)")
+    return inserted, len(changed_ids) - inserted
+
+def main():
+    parser = argparse.ArgumentParser(description="Load netflix_titles.csv into SQLite.")
+    parser.add_argument('--csv', default=CSV_PATH)
+    parser.add_argument('--db', default=DB_PATH)
+    parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE)
+    parser.add_argument('--upsert', action='store_true',
+                        help="Merge into the existing database on show_id instead of rebuilding it")
+    args = parser.parse_args()
+
+    if args.upsert:
+        load_upsert(args.csv, args.db, args.chunk_size)
+    else:
+        load_full(args.csv, args.db, args.chunk_size)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,137 @@
+import json
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+# Configuration
+CACHE_PATH = "lookup_cache.db"
+DEFAULT_TTL_DAYS = 30
+PROGRESS_EVERY = 100
+
+class RateLimiter:
+    """Thread-safe token bucket shared by all lookup workers."""
+
+    def __init__(self, rate, burst=1):
+        self.rate = rate
+        self.capacity = max(burst, 1)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Block until a token is available, then consume it."""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+class LookupCache:
+    """Persistent SQLite cache of external lookups keyed by (title, year).
+
+    Each provider/lookup kind gets its own namespace so IMDb awards and
+    country lookups can share one cache file.
+    """
+
+    def __init__(self, path=CACHE_PATH, namespace='default', ttl_days=DEFAULT_TTL_DAYS):
+        self.namespace = namespace
+        self.ttl = ttl_days * 86400 if ttl_days is not None else None
+        self.conn = sqlite3.connect(path)
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS lookup_cache (
+                namespace TEXT NOT NULL,
+                title TEXT NOT NULL,
+                year INTEGER NOT NULL,
+                value TEXT,
+                fetched_at REAL NOT NULL,
+                PRIMARY KEY (namespace, title, year)
+            )
+        """)
+        self.conn.commit()
+
+    @staticmethod
+    def _row_key(key):
+        title, year = key
+        # NULL years would never match in the primary key, so store them as 0
+        return title, int(year) if year else 0
+
+    def get_many(self, keys):
+        """Return {key: value} for every key with a fresh cache entry."""
+        cutoff = time.time() - self.ttl if self.ttl is not None else float('-inf')
+        found = {}
+        for key in keys:
+            row = self.conn.execute(
+                "SELECT value, fetched_at FROM lookup_cache WHERE namespace = ? AND title = ? AND year = ?",
+                (self.namespace, *self._row_key(key))
+            ).fetchone()
+            if row and row[1] >= cutoff:
+                found[key] = json.loads(row[0])
+        return found
+
+    def put_many(self, items):
+        """Store {key: value} pairs, replacing older entries."""
+        now = time.time()
+        self.conn.executemany(
+            "INSERT OR REPLACE INTO lookup_cache (namespace, title, year, value, fetched_at) VALUES (?, ?, ?, ?, ?)",
+            [(self.namespace, *self._row_key(key), json.dumps(value), now) for key, value in items.items()]
+        )
+        self.conn.commit()
+
+    def close(self):
+        self.conn.close()
+
+def run_lookups(keys, fetch, workers=8, rate_limiter=None, cache=None, flush_every=50,
+                progress_every=PROGRESS_EVERY):
+    """Resolve keys with fetch(key) on a thread pool, skipping cached keys.
+
+    Duplicate keys are fetched once. Results are written to the cache in
+    batches as they complete, so an interrupted run keeps what it fetched.
+    Keys whose fetch raised are left out of the result and never cached.
+    rate_limiter is charged once per key; a fetch that makes several remote
+    requests should acquire a token before each of them instead.
+    Progress is printed every `progress_every` completed lookups.
+    Returns a {key: value} dict covering cached and newly fetched keys.
+    """
+    unique_keys = list(dict.fromkeys(keys))
+    results = cache.get_many(unique_keys) if cache else {}
+    pending = [key for key in unique_keys if key not in results]
+    if not pending:
+        return results
+
+    def limited_fetch(key):
+        if rate_limiter:
+            rate_limiter.acquire()
+        return fetch(key)
+
+    print(f"Looking up {len(pending)} titles ({len(results)} cached)")
+    fetched = {}
+    failures = 0
+    started = time.monotonic()
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = {executor.submit(limited_fetch, key): key for key in pending}
+        for done, future in enumerate(as_completed(futures), 1):
+            key = futures[future]
+            if progress_every and done % progress_every == 0:
+                print(f"Looked up {done}/{len(pending)} titles ({time.monotonic() - started:.1f}s)")
+            try:
+                fetched[key] = future.result()
+            except Exception as e:
+                failures += 1
+                print(f"Lookup failed for {key[0]}: {e}")
+                continue
+            if cache and len(fetched) >= flush_every:
+                cache.put_many(fetched)
+                results.update(fetched)
+                fetched = {}
+
+    if cache and fetched:
+        cache.put_many(fetched)
+    results.update(fetched)
+    print(f"Lookups: {len(unique_keys) - len(pending)} cached, {len(pending) - failures} fetched, {failures} failed")
+    return results
@@ -0,0 +1,129 @@
+import sqlite3
+import sys
+
+from search_index import SEARCH_COLUMNS
+
+# Columns each row endpoint can return; app.py projects the requested subset
+COVID_COLUMNS = ['show_id', 'country', 'release_year', 'type', 'genre', 'awards']
+COUNTRY_COLUMNS = ['show_id', 'release_year', 'type', 'genre', 'awards', 'political_context_score']
+SEARCH_RESULT_COLUMNS = ['show_id', 'title', 'type', 'country', 'release_year', 'director', 'description']
+
+# Tables that are small aggregates and are meant to be read in full
+FULL_READ_TABLES = {'political_matrix'}
+
+def _row_statements(name, select, where, cursor_column):
+    """Unpaged, first-page and next-page variants of one row query.
+
+    Keeping every variant as its own fixed string means each one is
+    prepared once per connection and reused from sqlite3's statement cache.
+    """
+    return {
+        name: f"{select} WHERE {where}",
+        f"{name}_page": f"{select} WHERE {where} ORDER BY {cursor_column} LIMIT :limit",
+        f"{name}_after": (f"{select} WHERE {where} AND {cursor_column} > :after "
+                          f"ORDER BY {cursor_column} LIMIT :limit")
+    }
+
+STATEMENTS = {
+    # title_country is maintained by setup_database.py; its index covers the DISTINCT
+    'countries': "SELECT DISTINCT country FROM title_country ORDER BY country",
+    # Aggregated by setup_database.refresh_political_matrix during enrichment
+    'political_matrix': """
+        SELECT country, release_year, political_context_score, awards, genre
+        FROM political_matrix
+        ORDER BY country, release_year
+    """,
+    # Page on tc.show_id so the (country, show_id) index supplies the order
+    **_row_statements(
+        'country_titles',
+        f"SELECT {', '.join('t.' + column for column in COUNTRY_COLUMNS)} "
+        "FROM title_country tc JOIN netflix_titles t ON t.show_id = tc.show_id",
+        "tc.country = :country",
+        'tc.show_id'
+    ),
+    # Ranked full-text search; each filter is skipped when its parameter is NULL
+    'search_titles': f"""
+        SELECT {', '.join('t.' + column for column in SEARCH_RESULT_COLUMNS)},
+               bm25(title_search, {', '.join(str(weight) for weight in SEARCH_COLUMNS.values())}) AS score
+        FROM title_search
+        JOIN netflix_titles t ON t.rowid = title_search.rowid
+        WHERE title_search MATCH :query
+          AND (:type IS NULL OR t.type = :type)
+          AND (:year IS NULL OR t.release_year = :year)
+          AND (:country IS NULL OR EXISTS (
+              SELECT 1 FROM title_country tc WHERE tc.show_id = t.show_id AND tc.country = :country))
+        ORDER BY score, t.rowid
+        LIMIT :limit OFFSET :offset
+    """,
+    **_row_statements(
+        'covid_titles',
+        f"SELECT {', '.join(COVID_COLUMNS)} FROM netflix_titles",
+        "release_year BETWEEN 2020 AND 2022",
+        'show_id'
+    )
+}
+
+# Representative parameters for EXPLAIN QUERY PLAN
+SAMPLE_PARAMS = {'country': 'United States', 'after': 's1', 'limit': 100, 'query': '"war"',
+                 'type': 'Movie', 'year': 2020, 'offset': 0}
+
+def row_statement(name, limit=None, after=None):
+    """Name of the paging variant of a row query for the given options."""
+    if limit is None:
+        return name
+    return f"{name}_after" if after is not None else f"{name}_page"
+
+def row_params(limit=None, after=None, **params):
+    """Named parameters for a row_statement, fetching one extra row per page."""
+    if limit is not None:
+        params['limit'] = limit + 1
+    if after is not None:
+        params['after'] = after
+    return params
+
+def execute(conn, name, params=None):
+    return conn.execute(STATEMENTS[name], params or {})
+
+def query_plan(conn, name):
+    """EXPLAIN QUERY PLAN detail lines for one named statement."""
+    sql = STATEMENTS[name]
+    params = {key: value for key, value in SAMPLE_PARAMS.items() if f':{key}' in sql}
+    return [row[-1] for row in conn.execute(f"EXPLAIN QUERY PLAN {sql}", params)]
+
+def full_scans(plan):
+    """Plan steps that read a whole table without an index."""
+    return [
+        step for step in plan
+        if step.startswith('SCAN ') and ' USING ' not in step and ' VIRTUAL TABLE ' not in step
+        and step.split()[1] not in FULL_READ_TABLES
+    ]
+
+def report_query_plans(conn, out=sys.stdout):
+    """Print the plan of every statement and return {name: [full scans]}.
+
+    Statements whose tables are missing (e.g. before setup_database.py has
+    run) are reported as errors rather than aborting startup.
+    """
+    problems = {}
+    for name in STATEMENTS:
+        try:
+            plan = query_plan(conn, name)
+        except sqlite3.Error as e:
+            print(f"[plan] {name}: ERROR {e}", file=out)
+            problems[name] = [str(e)]
+            continue
+        scans = full_scans(plan)
+        status = "FULL SCAN" if scans else "ok"
+        print(f"[plan] {name}: {status}", file=out)
+        for step in plan:
+            print(f"         {step}", file=out)
+        if scans:
+            problems[name] = scans
+    return problems
+
+if __name__ == '__main__':
+    from db_utils import connect_read_only
+    conn = connect_read_only(sys.argv[1] if len(sys.argv) > 1 else "netflix_titles.db")
+    problems = report_query_plans(conn)
+    conn.close()
+    sys.exit(1 if problems else 0)
@@ -1,25 +1,45 @@
 import sqlite3
-import json
-from datetime import datetime
+import time
 import os
+import sys
 
-def clean_netflix_data():
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from process_data import CHUNK_SIZE, RecordWriter
+from date_utils import normalize_date, report_format_stats
+
+CLEANED_COLUMNS = [
+    'show_id', 'type', 'title', 'director', 'cast', 'country', 'date_added',
+    'release_year', 'rating', 'duration', 'listed_in', 'description',
+    'awards', 'political_context_score', 'event_keywords', 'genre'
+]
+
+def first_item(column):
+    """SQL for the first stripped entry of a comma-separated column."""
+    return f"TRIM(substr({column}, 1, instr({column} || ',', ',') - 1), ' ' || char(9, 10, 13))"
+
+def clean_netflix_data(db_path='../netflix_titles.db', output_path='../data/netflix_titles.json'):
     print("Starting data cleanup process...")
-    
+    started = time.monotonic()
+
     # Connect to SQLite database
-    conn = sqlite3.connect('../netflix_titles.db')
+    conn = sqlite3.connect(db_path)
+    conn.create_function('normalize_date', 1, normalize_date, deterministic=True)
     cursor = conn.cursor()
-    
-    # Get all titles
-    cursor.execute("SELECT * FROM netflix_titles")
-    
-    records = cursor.fetchall()
-    total_records = len(records)
+
+    cursor.execute("SELECT COUNT(*) FROM netflix_titles")
+    total_records = cursor.fetchone()[0]
     print(f"Found {total_records} records to process")
-    
+
+    # Enrichment columns may not have been added yet
+    cursor.execute("PRAGMA table_info(netflix_titles)")
+    source_columns = {row[1] for row in cursor.fetchall()}
+    def source(column):
+        return f'"{column}"' if column in source_columns else 'NULL'
+
     # Drop existing table if exists
     cursor.execute("DROP TABLE IF EXISTS netflix_titles_cleaned")
-    
+
     # Create a temporary table for cleaned data
     cursor.execute("""
         CREATE TABLE netflix_titles_cleaned (
@@ -41,104 +61,60 @@ def clean_netflix_data():
             genre TEXT
         )
     """)
-    
-    # Process each record
-    cleaned_data = []
-    for i, record in enumerate(records, 1):
-        # Extract data
-        data = {
-            'show_id': record[0],
-            'type': record[1],
-            'title': record[2],
-            'director': record[3],
-            'cast': record[4],
-            'country': record[5],
-            'date_added': record[6],
-            'release_year': record[7],
-            'rating': record[8],
-            'duration': record[9],
-            'listed_in': record[10],
-            'description': record[11],
-            'awards': record[12] or 0,
-            'political_context_score': record[13] or 0,
-            'event_keywords': record[14],
-            'genre': record[15] if len(record) > 15 else None
-        }
-        
-        # Clean country (take only first country)
-        if data['country']:
-            data['country'] = data['country'].split(',')[0].strip()
-            
-        # Clean genres (ensure consistent format)
-        if data['listed_in']:
-            genres = [g.strip() for g in data['listed_in'].split(',')]
-            data['listed_in'] = genres[0]  # Take only primary genre
-            
-        # Clean date format
-        if data['date_added']:
-            try:
-                # Try different date formats
-                date_formats = ['%B %d, %Y', '%Y-%m-%d', '%d/%m/%Y', '%m/%d/%Y']
-                date_str = str(data['date_added']).strip()
-                
-                for date_format in date_formats:
-                    try:
-                        date_obj = datetime.strptime(date_str, date_format)
-                        data['date_added'] = date_obj.strftime('%Y-%m-%d')
-                        break
-                    except ValueError:
-                        continue
-            except Exception as e:
-                print(f"Warning: Could not parse date '{data['date_added']}' for title '{data['title']}'")
-                data['date_added'] = None
-        
-        # Insert cleaned record
-        cursor.execute("""
-            INSERT INTO netflix_titles_cleaned
-            (show_id, type, title, director, cast, country, date_added, 
-             release_year, rating, duration, listed_in, description,
-             awards, political_context_score, event_keywords, genre)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        """, (
-            data['show_id'], data['type'], data['title'], data['director'],
-            data['cast'], data['country'], data['date_added'], data['release_year'],
-            data['rating'], data['duration'], data['listed_in'], data['description'],
-            data['awards'], data['political_context_score'], data['event_keywords'],
-            data['genre']
-        ))
-        
-        cleaned_data.append(data)
-        
-        if i % 100 == 0:
-            print(f"Processed {i}/{total_records} records")
-            conn.commit()
-    
-    # Final commit
-    conn.commit()
-    
+
+    # Clean every row in one statement: first country, primary genre,
+    # normalized date_added (date_utils parses each distinct string once)
+    column_list = ', '.join(f'"{column}"' for column in CLEANED_COLUMNS)
+    expressions = {column: source(column) for column in CLEANED_COLUMNS}
+    expressions.update({
+        'country': first_item('country'),
+        'listed_in': first_item('listed_in'),
+        'date_added': 'normalize_date(date_added)',
+        'awards': f"COALESCE({source('awards')}, 0)",
+        'political_context_score': f"COALESCE({source('political_context_score')}, 0)"
+    })
+    with conn:
+        cursor.execute(f"""
+            INSERT INTO netflix_titles_cleaned ({column_list})
+            SELECT {', '.join(expressions[c] for c in CLEANED_COLUMNS)}
+            FROM netflix_titles
+        """)
+    print(f"Cleaned {total_records} records in {time.monotonic() - started:.1f}s")
+    report_format_stats()
+
     # Create data directory if it doesn't exist
-    os.makedirs('../data', exist_ok=True)
-    
-    # Write to JSON file
-    with open('../data/netflix_titles.json', 'w', encoding='utf-8') as f:
-        json.dump(cleaned_data, f, ensure_ascii=False, indent=2)
-    
+    os.makedirs(os.path.dirname(output_path), exist_ok=True)
+
+    # Stream the cleaned table to JSON instead of holding every record in memory
+    cursor.execute(f"SELECT {column_list} FROM netflix_titles_cleaned ORDER BY rowid")
+    with open(output_path + '.tmp', 'w', encoding='utf-8') as f:
+        writer = RecordWriter(f, 'json', indent=2)
+        while True:
+            rows = cursor.fetchmany(CHUNK_SIZE)
+            if not rows:
+                break
+            for row in rows:
+                writer.write(dict(zip(CLEANED_COLUMNS, row)))
+        writer.close()
+    os.replace(output_path + '.tmp', output_path)
+
     print("\nData cleanup complete!")
-    print(f"Cleaned data exported to netflix_titles.json")
-    
+    print(f"Cleaned data exported to {os.path.basename(output_path)}")
+
     # Print some statistics
     cursor.execute("SELECT COUNT(DISTINCT country) FROM netflix_titles_cleaned WHERE country IS NOT NULL")
     unique_countries = cursor.fetchone()[0]
-    
+
     cursor.execute("SELECT COUNT(DISTINCT listed_in) FROM netflix_titles_cleaned WHERE listed_in IS NOT NULL")
     unique_genres = cursor.fetchone()[0]
-    
+
     print(f"\nStatistics:")
     print(f"Total records: {total_records}")
     print(f"Unique countries: {unique_countries}")
     print(f"Unique primary genres: {unique_genres}")
-    
+    print(f"Total time: {time.monotonic() - started:.1f}s")
+
     conn.close()
 
 if __name__ == '__main__':
-    clean_netflix_data() 
\ No newline at end of file
+    clean_netflix_data()
@@ -0,0 +1,71 @@
+import argparse
+import os
+import sys
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_ROOT)
+
+from compression import ENCODINGS, MIN_COMPRESS_SIZE, STATIC_LEVELS, SUFFIXES, compress
+
+# Static assets the front-end downloads; run this after every data build
+ASSET_DIRS = ['data', 'dashboards', 'js', 'css', 'static']
+ASSET_FILES = ['index.html', 'manifest.json', 'sw.js']
+EXTENSIONS = ('.json', '.ndjson', '.js', '.css', '.html', '.svg', '.txt')
+
+def iter_assets(root):
+    for name in ASSET_FILES:
+        path = os.path.join(root, name)
+        if os.path.isfile(path):
+            yield path
+    for directory in ASSET_DIRS:
+        for dirpath, _, filenames in os.walk(os.path.join(root, directory)):
+            for filename in sorted(filenames):
+                if filename.endswith(EXTENSIONS):
+                    yield os.path.join(dirpath, filename)
+
+def remove_orphans(root):
+    """Delete .gz/.br files whose source asset no longer exists."""
+    removed = 0
+    for directory in ASSET_DIRS:
+        for dirpath, _, filenames in os.walk(os.path.join(root, directory)):
+            for filename in filenames:
+                for suffix in SUFFIXES.values():
+                    if filename.endswith(suffix) and filename[:-len(suffix)] not in filenames:
+                        os.remove(os.path.join(dirpath, filename))
+                        removed += 1
+    return removed
+
+def precompress(root=PROJECT_ROOT, encodings=None, force=False):
+    """Write a compressed sibling (file.json.gz, file.json.br) next to each asset.
+
+    Siblings newer than their source are left alone, so rerunning after a
+    partial rebuild only compresses what changed. Returns (written, skipped).
+    """
+    encodings = encodings or ENCODINGS
+    written = skipped = 0
+    for path in iter_assets(root):
+        source_mtime = os.stat(path).st_mtime_ns
+        if os.path.getsize(path) < MIN_COMPRESS_SIZE:
+            continue
+        data = None
+        for encoding in encodings:
+            target = path + SUFFIXES[encoding]
+            if not force and os.path.exists(target) and os.stat(target).st_mtime_ns >= source_mtime:
+                skipped += 1
+                continue
+            if data is None:
+                with open(path, 'rb') as f:
+                    data = f.read()
+            with open(target + '.tmp', 'wb') as f:
+                f.write(compress(data, encoding, STATIC_LEVELS))
+            os.replace(target + '.tmp', target)
+            written += 1
+    removed = remove_orphans(root)
+    print(f"Precompressed {written} files ({skipped} up to date, {removed} orphans removed)")
+    return written, skipped
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Write .gz/.br siblings for the static assets.")
+    parser.add_argument('--force', action='store_true', help="Recompress even if siblings are up to date")
+    args = parser.parse_args()
+    precompress(force=args.force)
@@ -1,10 +1,235 @@
+import argparse
+import io
 import sqlite3
 import json
-from datetime import datetime
 import os
+import re
+import shutil
+import sys
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from date_utils import normalize_date, report_format_stats
+
+# Rows fetched from SQLite per round trip while streaming the export
+CHUNK_SIZE = 1000
+
+# Pretty-printing of the exported JSON (None writes compact output)
+DEFAULT_INDENT = 2
+
+# Serialized shard records held in memory before they are appended to disk
+SHARD_BUFFER_SIZE = 64 * 1024
+
+def transform_record(item):
+    """Add derived list/duration fields and normalize date_added in place."""
+    # Handle multiple countries
+    if item.get('country'):
+        countries = [c.strip() for c in str(item['country']).split(',') if c.strip()]
+        item['countries'] = countries
+    else:
+        item['countries'] = []
+        
+    # Handle genres
+    if item.get('listed_in'):
+        genres = [g.strip() for g in str(item['listed_in']).split(',') if g.strip()]
+        item['genres'] = genres
+    else:
+        item['genres'] = []
+        
+    # Ensure date format is consistent (unparseable dates are left as they are)
+    if item.get('date_added'):
+        item['date_added'] = normalize_date(item['date_added'])
+            
+    # Clean up duration field
+    if item.get('duration'):
+        duration = str(item['duration'])
+        if 'Season' in duration or 'season' in duration:
+            item['duration_type'] = 'Seasons'
+            item['duration_value'] = int(''.join(filter(str.isdigit, duration)))
+        elif 'min' in duration:
+            item['duration_type'] = 'Minutes'
+            item['duration_value'] = int(''.join(filter(str.isdigit, duration)))
+        else:
+            item['duration_type'] = None
+            item['duration_value'] = None
+    
+    return item
+
+def iter_records(cursor, chunk_size=CHUNK_SIZE):
+    """Yield transformed records from an executed cursor, chunk by chunk."""
+    columns = [description[0] for description in cursor.description]
+    while True:
+        rows = cursor.fetchmany(chunk_size)
+        if not rows:
+            break
+        for row in rows:
+            yield transform_record(dict(zip(columns, row)))
+
+class RecordWriter:
+    """Write records one at a time as a JSON array or as NDJSON."""
+    
+    def __init__(self, f, output_format='json', indent=DEFAULT_INDENT):
+        self.f = f
+        self.output_format = output_format
+        self.indent = indent
+        # Drop the spaces json.dumps puts after separators unless pretty-printing
+        self.separators = (',', ':') if indent is None else None
+        self.count = 0
+        if output_format == 'json':
+            f.write('[')
+    
+    def write(self, item):
+        if self.output_format == 'ndjson':
+            self.f.write(json.dumps(item, ensure_ascii=False, separators=(',', ':')))
+            self.f.write('\n')
+        else:
+            if self.count:
+                self.f.write(',')
+            if self.indent is not None:
+                self.f.write('\n')
+            self.f.write(json.dumps(item, ensure_ascii=False, indent=self.indent, separators=self.separators))
+        self.count += 1
+    
+    def close(self):
+        if self.output_format == 'json':
+            self.f.write('\n]' if self.indent is not None and self.count else ']')
+
+def shard_slug(key):
+    """File-name-safe version of a country name or year."""
+    return re.sub(r'[^a-z0-9]+', '_', str(key).lower()).strip('_') or 'unknown'
+
+class ShardWriter:
+    """Stream records into one JSON array file per country and per year.
+    
+    Files are written under a staging directory and only swapped into place
+    by close(), so the front-end never sees a half-written set of shards.
+    Each shard is serialized into a small in-memory buffer that is appended
+    to its file when full, so no file handles stay open between writes.
+    """
+    
+    def __init__(self, shard_dir, indent=DEFAULT_INDENT, buffer_size=SHARD_BUFFER_SIZE):
+        self.shard_dir = shard_dir
+        self.staging_dir = shard_dir + '.tmp'
+        self.indent = indent
+        self.buffer_size = buffer_size
+        self.shards = {}
+        self.slugs = set()
+        shutil.rmtree(self.staging_dir, ignore_errors=True)
+        for kind in ('country', 'year'):
+            os.makedirs(os.path.join(self.staging_dir, kind))
+    
+    def _unique_slug(self, kind, key):
+        """shard_slug(key), suffixed when another key already produced the same name."""
+        slug = shard_slug(key)
+        candidate, suffix = slug, 2
+        while (kind, candidate) in self.slugs:
+            candidate, suffix = f'{slug}_{suffix}', suffix + 1
+        self.slugs.add((kind, candidate))
+        return candidate
+    
+    def _writer(self, kind, key):
+        writer = self.shards.get((kind, key))
+        if writer is None:
+            writer = RecordWriter(io.StringIO(), 'json', self.indent)
+            writer.path = f'{kind}/{self._unique_slug(kind, key)}.json'
+            self.shards[(kind, key)] = writer
+        return writer
+    
+    def _flush(self, writer):
+        with open(os.path.join(self.staging_dir, writer.path), 'a', encoding='utf-8') as f:
+            f.write(writer.f.getvalue())
+        writer.f = io.StringIO()
+    
+    def _write(self, kind, key, item):
+        writer = self._writer(kind, key)
+        writer.write(item)
+        if writer.f.tell() >= self.buffer_size:
+            self._flush(writer)
+    
+    def write(self, item):
+        for country in item['countries']:
+            self._write('country', country, item)
+        if item.get('release_year') is not None:
+            self._write('year', item['release_year'], item)
+    
+    def close(self):
+        """Finish every shard, swap them into place and return manifest entries."""
+        entries = {'countries': {}, 'years': {}}
+        for (kind, key), writer in sorted(self.shards.items(), key=lambda x: (x[0][0], str(x[0][1]))):
+            writer.close()
+            self._flush(writer)
+            section = 'countries' if kind == 'country' else 'years'
+            entries[section][str(key)] = {
+                'file': f'{os.path.basename(self.shard_dir)}/{writer.path}',
+                'count': writer.count
+            }
+        shutil.rmtree(self.shard_dir, ignore_errors=True)
+        os.replace(self.staging_dir, self.shard_dir)
+        return entries
+
+def update_country_summary(country_summary, item):
+    """Count titles, movies, shows and distinct genres per country."""
+    for country in item['countries']:
+        if country not in country_summary:
+            country_summary[country] = {'total': 0, 'movies': 0, 'shows': 0, 'genres': set()}
+        country_summary[country]['total'] += 1
+        if item['type'] == 'Movie':
+            country_summary[country]['movies'] += 1
+        elif item['type'] == 'TV Show':
+            country_summary[country]['shows'] += 1
+        country_summary[country]['genres'].update(item['genres'])
+
+def write_json(path, payload):
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(payload, f, ensure_ascii=False, separators=(',', ':'))
+
+def write_summary(data_dir, total_titles, country_summary, year_counts):
+    summary = {
+        'total_titles': total_titles,
+        'countries': {
+            country: {**counts, 'genres': sorted(counts['genres'])}
+            for country, counts in sorted(country_summary.items())
+        },
+        'years': {str(year): count for year, count in sorted(year_counts.items())}
+    }
+    write_json(os.path.join(data_dir, 'summary.json'), summary)
+
+def write_manifest(data_dir, export_file, total_titles, shard_entries):
+    """Write the manifest.json index of the export, summary and shards."""
+    manifest = {
+        'generated_at': datetime.now().isoformat(timespec='seconds'),
+        'total_titles': total_titles,
+        'titles': os.path.basename(export_file),
+        'summary': 'summary.json',
+        **shard_entries
+    }
+    write_json(os.path.join(data_dir, 'manifest.json'), manifest)
+
+def remove_shards(data_dir):
+    """Drop the manifest and shards of an earlier run.
+
+    The front-end loads whatever manifest.json points at before falling
+    back to the full export, so they must not outlive an export without shards.
+    """
+    manifest_path = os.path.join(data_dir, 'manifest.json')
+    if os.path.exists(manifest_path):
+        os.remove(manifest_path)
+    shutil.rmtree(os.path.join(data_dir, 'shards'), ignore_errors=True)
 
-def process_netflix_data():
+def process_netflix_data(output_format='json', indent=DEFAULT_INDENT, chunk_size=CHUNK_SIZE, shards=True,
+                         db_path=None, data_dir=None):
+    """Stream netflix_titles into data/netflix_titles.json (or .ndjson).
+    
+    Records are written as they are read, so memory use does not grow with
+    the catalog; the per-country summary written to data/summary.json is
+    collected in the same pass. With shards enabled the same pass also writes
+    data/shards/country/*.json, data/shards/year/*.json and data/manifest.json
+    so the dashboards can fetch only what they render; without them any
+    earlier manifest and shards are removed.
+    """
     print("Starting data processing...")
+    conn = None
     
     # Get the absolute path to the project root
     script_dir = os.path.dirname(os.path.abspath(__file__))
@@ -12,7 +237,7 @@ def process_netflix_data():
     
     # Connect to SQLite database
     try:
-        db_path = os.path.join(project_root, 'netflix_titles.db')
+        db_path = db_path or os.path.join(project_root, 'netflix_titles.db')
         conn = sqlite3.connect(db_path)
         cursor = conn.cursor()
         
@@ -28,92 +253,47 @@ def process_netflix_data():
             FROM netflix_titles
         """)
         
-        # Get column names
-        columns = [description[0] for description in cursor.description]
-        netflix_data = []
-        
-        print("Processing records...")
-        for row in cursor.fetchall():
-            item = dict(zip(columns, row))
-            
-            # Handle multiple countries
-            if item.get('country'):
-                countries = [c.strip() for c in str(item['country']).split(',') if c.strip()]
-                item['countries'] = countries
-            else:
-                item['countries'] = []
-                
-            # Handle genres
-            if item.get('listed_in'):
-                genres = [g.strip() for g in str(item['listed_in']).split(',') if g.strip()]
-                item['genres'] = genres
-            else:
-                item['genres'] = []
-                
-            # Ensure date format is consistent
-            if item.get('date_added'):
-                try:
-                    # Try different date formats
-                    date_formats = ['%B %d, %Y', '%Y-%m-%d', '%d/%m/%Y', '%m/%d/%Y']
-                    date_str = str(item['date_added']).strip()
-                    
-                    for date_format in date_formats:
-                        try:
-                            date_obj = datetime.strptime(date_str, date_format)
-                            item['date_added'] = date_obj.strftime('%Y-%m-%d')
-                            break
-                        except ValueError:
-                            continue
-                            
-                except Exception as e:
-                    print(f"Warning: Could not parse date '{item['date_added']}': {str(e)}")
-                    item['date_added'] = None
-                    
-            # Clean up duration field
-            if item.get('duration'):
-                duration = str(item['duration'])
-                if 'Season' in duration or 'season' in duration:
-                    item['duration_type'] = 'Seasons'
-                    item['duration_value'] = int(''.join(filter(str.isdigit, duration)))
-                elif 'min' in duration:
-                    item['duration_type'] = 'Minutes'
-                    item['duration_value'] = int(''.join(filter(str.isdigit, duration)))
-                else:
-                    item['duration_type'] = None
-                    item['duration_value'] = None
-                    
-            netflix_data.append(item)
-        
         # Create data directory if it doesn't exist
-        data_dir = os.path.join(project_root, 'data')
+        data_dir = data_dir or os.path.join(project_root, 'data')
         os.makedirs(data_dir, exist_ok=True)
         
-        # Write to JSON file
-        output_file = os.path.join(data_dir, 'netflix_titles.json')
-        with open(output_file, 'w', encoding='utf-8') as f:
-            json.dump(netflix_data, f, ensure_ascii=False, indent=2)
+        extension = 'ndjson' if output_format == 'ndjson' else 'json'
+        output_file = os.path.join(data_dir, f'netflix_titles.{extension}')
+        temp_file = output_file + '.tmp'
+        
+        print("Processing records...")
+        country_summary = {}
+        year_counts = {}
+        shard_writer = ShardWriter(os.path.join(data_dir, 'shards'), indent) if shards else None
+        with open(temp_file, 'w', encoding='utf-8') as f:
+            writer = RecordWriter(f, output_format, indent)
+            for item in iter_records(cursor, chunk_size):
+                writer.write(item)
+                update_country_summary(country_summary, item)
+                if item.get('release_year') is not None:
+                    year_counts[item['release_year']] = year_counts.get(item['release_year'], 0) + 1
+                if shard_writer:
+                    shard_writer.write(item)
+            writer.close()
+        # Swap the finished file in so readers never see a partial export
+        os.replace(temp_file, output_file)
+        
+        write_summary(data_dir, writer.count, country_summary, year_counts)
+        if shard_writer:
+            shard_entries = shard_writer.close()
+            write_manifest(data_dir, output_file, writer.count, shard_entries)
+            print(f"Wrote {len(shard_entries['countries'])} country and {len(shard_entries['years'])} year shards")
+        else:
+            remove_shards(data_dir)
         
         # Print statistics
-        total_titles = len(netflix_data)
-        unique_countries = set()
-        for item in netflix_data:
-            unique_countries.update(item['countries'])
+        total_titles = writer.count
             
         print(f"\nProcessing complete!")
         print(f"Total titles processed: {total_titles}")
-        print(f"Unique countries found: {len(unique_countries)}")
+        print(f"Unique countries found: {len(country_summary)}")
         print(f"Data saved to: {output_file}")
-        
-        # Create a summary of content by country
-        country_summary = {}
-        for item in netflix_data:
-            for country in item['countries']:
-                if country not in country_summary:
-                    country_summary[country] = {'movies': 0, 'shows': 0}
-                if item['type'] == 'Movie':
-                    country_summary[country]['movies'] += 1
-                elif item['type'] == 'TV Show':
-                    country_summary[country]['shows'] += 1
+        report_format_stats()
         
         print("\nTop 10 countries by content volume:")
         sorted_countries = sorted(country_summary.items(), 
@@ -132,4 +312,12 @@ def process_netflix_data():
             conn.close()
 
 if __name__ == '__main__':
-    process_netflix_data() 
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Export netflix_titles to JSON for the front-end.")
+    parser.add_argument('--format', choices=['json', 'ndjson'], default='json')
+    parser.add_argument('--indent', type=int, default=DEFAULT_INDENT, help="Spaces to indent JSON records by")
+    parser.add_argument('--compact', action='store_true', help="Write JSON without indentation or spaces")
+    parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE)
+    parser.add_argument('--no-shards', action='store_true', help="Skip the per-country/per-year bundles")
+    args = parser.parse_args()
+    indent = None if args.compact else args.indent
+    process_netflix_data(args.format, indent, args.chunk_size, shards=not args.no_shards)
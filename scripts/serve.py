@@ -1,24 +1,13 @@
-import http.server
-import socketserver
 import os
+import sys
 
-class CORSHTTPRequestHandler(http.server.SimpleHTTPRequestHandler):
-    def end_headers(self):
-        self.send_header('Access-Control-Allow-Origin', '*')
-        self.send_header('Access-Control-Allow-Methods', 'GET')
-        self.send_header('Cache-Control', 'no-store, no-cache, must-revalidate')
-        return super().end_headers()
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_ROOT)
 
-    def do_GET(self):
-        # Serve files from parent directory
-        os.chdir('..')
-        return http.server.SimpleHTTPRequestHandler.do_GET(self)
+from static_server import serve
 
 PORT = 8000
 
-Handler = CORSHTTPRequestHandler
-
-with socketserver.TCPServer(("", PORT), Handler) as httpd:
-    print(f"Serving at http://localhost:{PORT}")
-    print("Press Ctrl+C to stop the server")
-    httpd.serve_forever() 
\ No newline at end of file
+if __name__ == '__main__':
+    # Serve files from the project root (the parent of this directory)
+    serve(PROJECT_ROOT, port=PORT, host='')
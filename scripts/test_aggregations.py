@@ -0,0 +1,77 @@
+import os
+import sqlite3
+import sys
+
+import numpy as np
+import pandas as pd
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_ROOT)
+
+import aggregations
+
+def create_titles_db():
+    """In-memory catalog with missing countries, genres, years and awards."""
+    rng = np.random.default_rng(7)
+    countries = ['United States'] * 12 + ['India'] * 8 + ['France'] * 5 + [None] * 3 + ['Chile'] * 2
+    rows = []
+    for i, country in enumerate(countries):
+        rows.append((
+            f's{i}', 'Movie' if i % 3 else 'TV Show', f'Title {i}', country,
+            None if i % 11 == 5 else int(rng.integers(2016, 2021)),
+            [None, 'Dramas', 'Comedies', 'Documentaries'][i % 4],
+            None if i % 7 == 3 else int(rng.integers(0, 5)),
+            float(rng.integers(0, 4))
+        ))
+    conn = sqlite3.connect(':memory:')
+    conn.execute("""
+        CREATE TABLE netflix_titles (
+            show_id TEXT, type TEXT, title TEXT, country TEXT, release_year INTEGER,
+            genre TEXT, awards INTEGER, political_context_score REAL
+        )
+    """)
+    conn.executemany("INSERT INTO netflix_titles VALUES (?, ?, ?, ?, ?, ?, ?, ?)", rows)
+    return conn
+
+def pandas_frame(conn):
+    """The frame analyze_netflix_trends used to group in pandas, with its fills."""
+    df = pd.read_sql_query("SELECT * FROM netflix_titles", conn)
+    df['country'] = df['country'].fillna(aggregations.UNKNOWN_COUNTRY)
+    df['genre'] = df['genre'].fillna(aggregations.UNCATEGORIZED_GENRE)
+    return df
+
+def test_aggregates_match_pandas_groupbys():
+    """Every SQL aggregate equals the groupby analyze_netflix_trends used to run."""
+    conn = create_titles_db()
+    df = pandas_frame(conn)
+
+    expected = df.groupby(['release_year', 'type']).size().unstack(fill_value=0)
+    pd.testing.assert_frame_equal(aggregations.yearly_type_counts(conn), expected,
+                                  check_dtype=False, check_index_type=False)
+
+    expected = df.groupby(['release_year', 'genre']).size().unstack(fill_value=0)
+    pd.testing.assert_frame_equal(aggregations.yearly_genre_counts(conn), expected,
+                                  check_dtype=False, check_index_type=False)
+
+    expected = df.groupby(['country', 'genre'])['awards'].mean().unstack()
+    pd.testing.assert_frame_equal(aggregations.country_genre_awards(conn), expected, check_dtype=False)
+
+    expected = df.groupby('genre')['awards'].agg(['mean', 'count']).reset_index()
+    expected = expected[expected['count'] >= 5].reset_index(drop=True)
+    pd.testing.assert_frame_equal(aggregations.genre_award_stats(conn, min_titles=5), expected,
+                                  check_dtype=False)
+
+    main_countries = df['country'].value_counts().nlargest(3).index
+    expected = df[df['country'].isin(main_countries)]
+    columns = ['title', 'country', 'release_year', 'political_context_score', 'genre', 'awards']
+    actual = aggregations.top_country_titles(conn, limit=3)
+    pd.testing.assert_frame_equal(
+        actual[columns].sort_values('title').reset_index(drop=True),
+        expected[columns].sort_values('title').reset_index(drop=True),
+        check_dtype=False
+    )
+    conn.close()
+
+if __name__ == '__main__':
+    test_aggregates_match_pandas_groupbys()
+    print("✓ Aggregation tests passed")
@@ -0,0 +1,286 @@
+import gzip
+import io
+import json
+import os
+import sys
+import sqlite3
+import time
+import tempfile
+
+import pytest
+from flask import Flask, jsonify
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_ROOT)
+
+import api_cache
+from api_cache import ResponseCache
+from db_utils import ReadOnlyPool
+import app as netflix_app
+import queries
+import search_index
+import setup_database
+
+def create_cached_app(data_path, **cache_options):
+    """Build a tiny Flask app whose single endpoint counts its own calls."""
+    test_app = Flask(__name__)
+    cache = ResponseCache([data_path], **cache_options)
+    calls = []
+
+    @test_app.route('/api/items')
+    @cache.cached
+    def items():
+        calls.append(1)
+        with open(data_path) as f:
+            return jsonify({'data': f.read()})
+
+    return test_app.test_client(), cache, calls
+
+def test_response_cache_hits_and_invalidates():
+    """Repeat requests are served from cache until the data file changes."""
+    handle, path = tempfile.mkstemp()
+    os.close(handle)
+    try:
+        with open(path, 'w') as f:
+            f.write('v1')
+        client, cache, calls = create_cached_app(path)
+
+        assert client.get('/api/items').json == {'data': 'v1'}
+        assert client.get('/api/items').json == {'data': 'v1'}
+        assert len(calls) == 1
+        assert cache.stats()['hits'] == 1
+
+        # Different query strings are cached separately
+        client.get('/api/items?page=2')
+        assert len(calls) == 2
+
+        with open(path, 'w') as f:
+            f.write('v2 changed')
+        os.utime(path, ns=(time.time_ns(), time.time_ns() + 1_000_000))
+
+        assert client.get('/api/items').json == {'data': 'v2 changed'}
+        assert len(calls) == 3
+        assert cache.stats()['invalidations'] == 1
+    finally:
+        os.remove(path)
+
+def test_response_cache_is_bounded():
+    """The least recently used entry is evicted once the cache is full."""
+    handle, path = tempfile.mkstemp()
+    os.close(handle)
+    try:
+        client, cache, calls = create_cached_app(path, max_entries=2)
+        for page in (1, 2, 3):
+            client.get(f'/api/items?page={page}')
+        assert cache.stats()['entries'] == 2
+
+        client.get('/api/items?page=1')
+        assert len(calls) == 4
+    finally:
+        os.remove(path)
+
+def build_api_database(data_dir):
+    """Write a small titles database and preferences file; return their paths."""
+    db_path = os.path.join(data_dir, 'netflix_titles.db')
+    conn = sqlite3.connect(db_path)
+    conn.execute("""
+        CREATE TABLE netflix_titles (
+            show_id TEXT PRIMARY KEY, type TEXT, title TEXT, director TEXT, "cast" TEXT,
+            country TEXT, release_year INTEGER, listed_in TEXT, description TEXT, genre TEXT,
+            awards INTEGER, political_context_score REAL
+        )
+    """)
+    conn.executemany("""
+        INSERT INTO netflix_titles (show_id, type, title, director, "cast", country, release_year,
+                                    listed_in, description, genre, awards, political_context_score)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    """, [
+        (f's{i}', 'Movie' if i % 2 else 'TV Show', f'Title {i}', f'Director {i % 3}', f'Actor {i}',
+         'India, France' if i % 3 else 'Nigeria', 2019 + i % 4, 'Dramas',
+         f'A story told in {2019 + i % 4}', 'Dramas', i, 1.0)
+        for i in range(1, 13)
+    ])
+    conn.commit()
+    setup_database.refresh_bridge_tables(conn)
+    setup_database.create_title_indexes(conn.cursor())
+    setup_database.refresh_political_matrix(conn)
+    search_index.rebuild_search_index(conn)
+    conn.close()
+    return db_path, write_preferences(data_dir)
+
+def write_preferences(data_dir):
+    preferences_path = os.path.join(data_dir, 'country_preferences.json')
+    with open(preferences_path, 'w') as f:
+        json.dump([{'country': 'India', 'preference': 'Balanced Content Preference'}], f)
+    return preferences_path
+
+def point_app_at(monkeypatch, db_path, preferences_path):
+    """Swap app.py's database, pool and cache paths for the test; monkeypatch restores them."""
+    pool = ReadOnlyPool(db_path)
+    monkeypatch.setattr(netflix_app, 'DB_PATH', db_path)
+    monkeypatch.setattr(netflix_app, 'db_pool', pool)
+    monkeypatch.setattr(netflix_app, 'PREFERENCES_PATH', preferences_path)
+    monkeypatch.setattr(netflix_app.response_cache, 'watched_paths', [db_path, preferences_path])
+    netflix_app.response_cache.clear()
+    return pool
+
+@pytest.fixture
+def api_client(tmp_path, monkeypatch):
+    """A test client for app.py backed by a throwaway database."""
+    pool = point_app_at(monkeypatch, *build_api_database(str(tmp_path)))
+    yield netflix_app.app.test_client()
+    pool.close()
+    netflix_app.response_cache.clear()
+
+def test_political_matrix_on_freshly_set_up_database(tmp_path, monkeypatch):
+    """A database that has only been through setup_database already serves the matrix."""
+    db_path = str(tmp_path / 'netflix_titles.db')
+    conn = sqlite3.connect(db_path)
+    conn.execute("CREATE TABLE netflix_titles (show_id TEXT, type TEXT, title TEXT, country TEXT, "
+                 "release_year INTEGER, listed_in TEXT, description TEXT)")
+    conn.execute("INSERT INTO netflix_titles VALUES ('s1', 'Movie', 'A', 'India', 2020, 'Dramas', 'x')")
+    conn.commit()
+    conn.close()
+    setup_database.setup_database(db_path)
+
+    pool = point_app_at(monkeypatch, db_path, write_preferences(str(tmp_path)))
+    try:
+        response = netflix_app.app.test_client().get('/api/political-matrix')
+    finally:
+        pool.close()
+    assert response.status_code == 200
+    assert response.json == []
+
+def test_covid_analysis_pagination_and_fields(api_client):
+    """Keyset pages cover every row exactly once with only the requested fields."""
+    unpaged = api_client.get('/api/covid-analysis').json
+    assert set(unpaged[0]) == set(netflix_app.COVID_DEFAULT_FIELDS)
+
+    seen = []
+    cursor = None
+    while True:
+        url = '/api/covid-analysis?limit=4&fields=show_id,type' + (f'&after={cursor}' if cursor else '')
+        page = api_client.get(url).json
+        assert all(set(row) == {'show_id', 'type'} for row in page['data'])
+        seen.extend(row['show_id'] for row in page['data'])
+        cursor = page['next_cursor']
+        if cursor is None:
+            break
+    assert len(seen) == len(set(seen))
+    assert len(seen) == len(unpaged)
+
+    assert api_client.get('/api/covid-analysis?fields=title').status_code == 400
+    assert api_client.get('/api/covid-analysis?limit=abc').status_code == 400
+
+def test_country_data_streams_ndjson(api_client):
+    response = api_client.get('/api/country/India?format=ndjson&fields=show_id,awards')
+    assert response.mimetype == 'application/x-ndjson'
+    rows = [json.loads(line) for line in response.data.decode().splitlines()]
+    assert len(rows) == 8
+    assert all(set(row) == {'show_id', 'awards'} for row in rows)
+
+    # A stream has nowhere to put a cursor, so it cannot be paged
+    assert api_client.get('/api/country/India?format=ndjson&limit=3').status_code == 400
+    assert api_client.get('/api/covid-analysis?format=ndjson&after=s1').status_code == 400
+
+    legacy = api_client.get('/api/country/India').json
+    assert legacy['preferences']['country'] == 'India'
+    assert len(legacy['yearly_data']) == 8
+    assert 'next_cursor' not in legacy
+
+    # Every request above borrowed the same pooled connection
+    stats = api_client.get('/api/pool-stats').json
+    assert stats['opened'] == 1 and stats['reused'] >= 1 and stats['in_use'] == 0
+
+def test_conditional_requests_and_compression(api_client, monkeypatch):
+    """Unchanged data revalidates with a 304; large bodies are gzip-compressed."""
+    first = api_client.get('/api/covid-analysis')
+    etag = first.headers['ETag']
+    assert first.headers['Last-Modified']
+    assert 'no-cache' in first.headers['Cache-Control']
+
+    calls = netflix_app.response_cache.stats()['misses']
+    revalidated = api_client.get('/api/covid-analysis', headers={'If-None-Match': etag})
+    assert revalidated.status_code == 304
+    assert revalidated.data == b''
+    assert netflix_app.response_cache.stats()['misses'] == calls
+    assert api_client.get('/api/covid-analysis', headers={'If-Modified-Since': first.headers['Last-Modified']}).status_code == 304
+
+    # Other query strings have their own validator
+    assert api_client.get('/api/covid-analysis?limit=2', headers={'If-None-Match': etag}).status_code == 200
+
+    # The sample database is smaller than the compression threshold
+    monkeypatch.setattr(api_cache, 'MIN_COMPRESS_SIZE', 0)
+    compressed = api_client.get('/api/covid-analysis', headers={'Accept-Encoding': 'gzip'})
+    assert compressed.headers['Content-Encoding'] == 'gzip'
+    assert json.loads(gzip.decompress(compressed.data)) == first.json
+    assert compressed.headers['ETag'] == etag
+
+    # Rewriting the database changes the validator
+    os.utime(netflix_app.DB_PATH, ns=(time.time_ns(), time.time_ns() + 2_000_000_000))
+    assert api_client.get('/api/covid-analysis', headers={'If-None-Match': etag}).status_code == 200
+
+def test_endpoint_statements_use_indexes(api_client):
+    """Every named statement has a plan, and none of them scans a whole table."""
+    with netflix_app.get_db_connection() as conn:
+        assert queries.report_query_plans(conn, out=io.StringIO()) == {}
+
+    # Countries are bound parameters, never spliced into the SQL
+    response = api_client.get("/api/country/India' OR '1'='1")
+    assert response.status_code == 200
+    assert response.json['yearly_data'] == []
+
+def test_search_ranks_filters_and_pages(api_client):
+    """/api/search ranks title hits first, applies filters and stays in sync with edits."""
+    assert api_client.get('/api/search?q=').status_code == 400
+    assert api_client.get('/api/search?q=title&year=soon').status_code == 400
+
+    # "1*" reaches Title 10-12 as a prefix, and "Director 1" credits rank below title hits
+    results = [row['show_id'] for row in api_client.get('/api/search?q=title 1').json['data']]
+    assert results[0] == 's1'
+    assert sorted(results[:4]) == ['s1', 's10', 's11', 's12']
+    assert sorted(results[4:]) == ['s4', 's7']
+
+    # A title hit outranks the same word in the description
+    db = sqlite3.connect(netflix_app.DB_PATH)
+    with db:
+        db.execute("UPDATE netflix_titles SET description = 'Director 2 cameo' WHERE show_id = 's1'")
+        db.execute("""INSERT INTO netflix_titles (show_id, type, title, country, release_year)
+                      VALUES ('s13', 'Movie', 'Cameo', 'Nigeria', 2020)""")
+    results = api_client.get('/api/search?q=cameo').json['data']
+    assert [row['show_id'] for row in results] == ['s13', 's1']
+
+    filtered = api_client.get('/api/search?q=actor&type=Movie&year=2020&country=France').json['data']
+    assert {row['show_id'] for row in filtered} == {'s1', 's5'}
+    assert all(row['type'] == 'Movie' and row['release_year'] == 2020 for row in filtered)
+
+    seen = []
+    cursor = None
+    while True:
+        url = '/api/search?q=actor&limit=5&fields=show_id' + (f'&after={cursor}' if cursor else '')
+        page = api_client.get(url).json
+        seen.extend(row['show_id'] for row in page['data'])
+        cursor = page['next_cursor']
+        if cursor is None:
+            break
+    assert sorted(seen) == sorted(f's{i}' for i in range(1, 13))
+
+    with db:
+        db.execute("DELETE FROM netflix_titles WHERE show_id = 's13'")
+    db.close()
+    assert [row['show_id'] for row in api_client.get('/api/search?q=cameo').json['data']] == ['s1']
+
+def test_search_cursor_keeps_default_page_size(api_client, monkeypatch):
+    """Following next_cursor without limit= pages by SEARCH_PAGE_SIZE, not MAX_PAGE_SIZE."""
+    monkeypatch.setattr(netflix_app, 'SEARCH_PAGE_SIZE', 5)
+    sizes = []
+    url = '/api/search?q=actor&fields=show_id'
+    while url:
+        page = api_client.get(url).json
+        sizes.append(len(page['data']))
+        url = page['next_cursor'] and f"/api/search?q=actor&fields=show_id&after={page['next_cursor']}"
+    assert sizes == [5, 5, 2]
+
+if __name__ == '__main__':
+    # The app-backed tests need pytest's tmp_path and monkeypatch fixtures
+    sys.exit(pytest.main([__file__, '-q']))
@@ -0,0 +1,161 @@
+import os
+import sqlite3
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_ROOT)
+
+from country_dashboards import (
+    ESCAPIST_KEYWORDS,
+    REALITY_KEYWORDS,
+    calculate_content_preference_scores,
+    calculate_content_preference_scores_batch
+)
+import keyword_index
+
+def load_sample_titles():
+    """Load the raw catalog plus a few edge cases the CSV does not cover."""
+    df = pd.read_csv(os.path.join(PROJECT_ROOT, 'netflix_titles.csv'),
+                     usecols=['show_id', 'country', 'listed_in', 'description'])
+    edge_cases = pd.DataFrame([
+        {'show_id': 'x1', 'country': None, 'listed_in': None, 'description': None},
+        {'show_id': 'x2', 'country': 'Chile', 'listed_in': 'FANTASY, Political', 'description': 'A True Story of WAR'},
+        {'show_id': 'x3', 'country': 'Chile', 'listed_in': '', 'description': 'a fairy tale adventure in a dream'},
+        {'show_id': 'x4', 'country': 'Chile', 'listed_in': 'Documentaries', 'description': np.nan},
+    ])
+    return pd.concat([df, edge_cases], ignore_index=True)
+
+def test_batch_scores_match_row_wise():
+    """The vectorized scorer must reproduce the row-wise scores exactly."""
+    df = load_sample_titles()
+
+    expected = df.apply(calculate_content_preference_scores, axis=1)
+    actual = calculate_content_preference_scores_batch(df)
+
+    pd.testing.assert_frame_equal(actual, expected[['escapism_score', 'reality_score']], check_dtype=False)
+
+def test_batch_scores_keep_index():
+    """Scores must line up with a filtered frame's original index."""
+    df = load_sample_titles().iloc[::7]
+    scores = calculate_content_preference_scores_batch(df)
+    assert scores.index.equals(df.index)
+
+def build_keyword_index(df):
+    conn = sqlite3.connect(':memory:')
+    conn.execute("CREATE TABLE netflix_titles (show_id TEXT PRIMARY KEY, description TEXT)")
+    conn.executemany("INSERT INTO netflix_titles VALUES (?, ?)",
+                     df[['show_id', 'description']].astype(object).where(df.notna(), None).itertuples(index=False))
+    keyword_index.update_keyword_index(conn)
+    return conn
+
+def test_keyword_index_matches_substring_scan():
+    """Posting-list scores equal the substring scan, including partial words like 'war' in "award"."""
+    df = load_sample_titles()
+    conn = build_keyword_index(df)
+    index = keyword_index.read_keyword_index(conn)
+
+    expected = calculate_content_preference_scores_batch(df)
+    actual = calculate_content_preference_scores_batch(df, index)
+    pd.testing.assert_frame_equal(actual, expected)
+
+    # Keywords that are not in the configured lists need no re-indexing
+    lowered = df['description'].str.lower()
+    for keyword in REALITY_KEYWORDS + ESCAPIST_KEYWORDS + ['award', 'coming-of-age', 'of a', '!']:
+        expected_ids = set(df.loc[lowered.str.contains(keyword, regex=False, na=False), 'show_id'])
+        assert index.titles_matching(keyword) == expected_ids, keyword
+
+def test_keyword_index_updates_incrementally():
+    """Only added, edited and deleted titles are re-indexed."""
+    df = load_sample_titles()
+    conn = build_keyword_index(df)
+    assert keyword_index.update_keyword_index(conn) == 0
+
+    with conn:
+        conn.execute("UPDATE netflix_titles SET description = 'A war of dreams' WHERE show_id = 'x1'")
+        conn.execute("DELETE FROM netflix_titles WHERE show_id = 'x3'")
+        conn.execute("INSERT INTO netflix_titles VALUES ('x5', 'Fantasy politics in Quuxville')")
+    assert keyword_index.update_keyword_index(conn) == 3
+
+    index = keyword_index.read_keyword_index(conn)
+    assert {'x1', 'x2'} <= index.titles_matching('war')
+    assert 'x3' not in index.titles_matching('fairy tale')
+    assert index.count_matches(['x5', 'x1', 'missing'], REALITY_KEYWORDS).tolist() == [1, 1, 0]
+
+    # The incrementally maintained trigrams equal a rebuild from scratch
+    rebuilt = sqlite3.connect(':memory:')
+    conn.backup(rebuilt)
+    with rebuilt:
+        rebuilt.execute("DROP TABLE keyword_trigrams")
+    keyword_index.update_keyword_index(rebuilt)
+    query = "SELECT trigram, term FROM keyword_trigrams ORDER BY trigram, term"
+    assert conn.execute(query).fetchall() == rebuilt.execute(query).fetchall()
+
+    # A term that leaves the vocabulary takes its trigrams with it
+    assert conn.execute("SELECT 1 FROM keyword_trigrams WHERE term = 'quuxville'").fetchone()
+    with conn:
+        conn.execute("DELETE FROM netflix_titles WHERE show_id = 'x5'")
+    assert keyword_index.update_keyword_index(conn) == 1
+    assert not conn.execute("SELECT 1 FROM keyword_trigrams WHERE term = 'quuxville'").fetchone()
+
+def scan_vocabulary(index, part):
+    """Terms containing part, by the linear scan the trigram lookup replaces."""
+    return [term for term in index.postings if part in term]
+
+def test_trigram_lookup_matches_vocabulary_scan():
+    """terms_containing finds exactly the terms a vocabulary scan finds."""
+    index = keyword_index.read_keyword_index(build_keyword_index(load_sample_titles()))
+    for part in ['war', 'story', 'dream', 'ta', 'x', 'imagination', 'zzzq', 'ing', 'the']:
+        assert sorted(index.terms_containing(part)) == sorted(scan_vocabulary(index, part)), part
+
+def benchmark(repeat=5):
+    """Compare the row-wise and batch scorers on an enlarged catalog."""
+    df = load_sample_titles()
+    big = pd.concat([df] * repeat, ignore_index=True)
+    print(f"Scoring {len(big)} rows...")
+
+    start = time.perf_counter()
+    big.apply(calculate_content_preference_scores, axis=1)
+    row_wise = time.perf_counter() - start
+
+    start = time.perf_counter()
+    calculate_content_preference_scores_batch(big)
+    batch = time.perf_counter() - start
+
+    print(f"Row-wise: {row_wise:.2f}s")
+    print(f"Batch:    {batch:.2f}s ({row_wise / batch:.0f}x faster)")
+
+def benchmark_keyword_lookup(repeat=200):
+    """Compare the trigram lookup with a vocabulary scan for the scoring keywords."""
+    index = keyword_index.read_keyword_index(build_keyword_index(load_sample_titles()))
+    parts = [part for keyword in REALITY_KEYWORDS + ESCAPIST_KEYWORDS
+             for part in keyword_index.TOKEN_PATTERN.findall(keyword)]
+    print(f"Looking up {len(parts)} words in {len(index.postings)} terms {repeat} times...")
+
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for part in parts:
+            scan_vocabulary(index, part)
+    scan = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for part in parts:
+            index.terms_containing(part)
+    trigram = time.perf_counter() - start
+
+    print(f"Vocabulary scan: {scan:.2f}s")
+    print(f"Trigram lookup:  {trigram:.2f}s ({scan / trigram:.0f}x faster)")
+
+if __name__ == '__main__':
+    test_batch_scores_match_row_wise()
+    test_batch_scores_keep_index()
+    test_keyword_index_matches_substring_scan()
+    test_keyword_index_updates_incrementally()
+    test_trigram_lookup_matches_vocabulary_scan()
+    print("✓ Content scoring tests passed\n")
+    benchmark()
+    benchmark_keyword_lookup()
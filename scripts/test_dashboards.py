@@ -0,0 +1,122 @@
+import os
+import re
+import shutil
+import sys
+import tempfile
+
+import pandas as pd
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_ROOT)
+
+import country_dashboards
+from country_dashboards import (
+    add_content_preference_scores,
+    dashboard_path,
+    determine_content_preference,
+    render_country_dashboards,
+    split_by_country
+)
+
+def sample_titles():
+    """Three single-country catalogs with a few titles each."""
+    rows = []
+    for country, genre in (('India', 'Dramas'), ('France', 'Documentaries'), ('Chile', 'Fantasy')):
+        for i in range(4):
+            rows.append({
+                'show_id': f'{country[:2].lower()}{i}', 'type': 'Movie' if i % 2 else 'TV Show',
+                'country': country, 'release_year': 2018 + i, 'listed_in': genre, 'genre': genre,
+                'description': 'A war story' if i else 'A magical dream', 'awards': i
+            })
+    return pd.DataFrame(rows)
+
+def render(df, output_dir, previous=None, force=False):
+    df = add_content_preference_scores(df)
+    return render_country_dashboards(df, determine_content_preference(df), workers=1, output_dir=output_dir,
+                                     previous_fingerprints=previous, force=force)
+
+def rendered_since_reset(output_dir, countries):
+    """Countries whose dashboard was rewritten after reset_mtimes()."""
+    return {country for country in countries if os.path.getmtime(dashboard_path(country, output_dir)) > 0}
+
+def reset_mtimes(output_dir, countries):
+    for country in countries:
+        os.utime(dashboard_path(country, output_dir), (0, 0))
+
+def test_incremental_rendering():
+    """Unchanged countries are skipped, edits re-render one country, force re-renders all."""
+    output_dir = tempfile.mkdtemp()
+    countries = ['India', 'France', 'Chile']
+    try:
+        df = sample_titles()
+        fingerprints = render(df, output_dir)
+        assert set(fingerprints) == set(countries)
+
+        reset_mtimes(output_dir, countries)
+        assert render(df, output_dir, fingerprints) == fingerprints
+        assert rendered_since_reset(output_dir, countries) == set()
+
+        edited = df.copy()
+        edited.loc[edited['show_id'] == 'fr1', 'awards'] = 9
+        edited_fingerprints = render(edited, output_dir, fingerprints)
+        assert rendered_since_reset(output_dir, countries) == {'France'}
+        assert edited_fingerprints['India'] == fingerprints['India']
+
+        reset_mtimes(output_dir, countries)
+        render(edited, output_dir, edited_fingerprints, force=True)
+        assert rendered_since_reset(output_dir, countries) == set(countries)
+
+        # A country that leaves the data loses its dashboard and its fingerprint
+        remaining = render(edited[edited['country'] != 'Chile'], output_dir, edited_fingerprints)
+        assert set(remaining) == {'India', 'France'}
+        assert not os.path.exists(dashboard_path('Chile', output_dir))
+    finally:
+        shutil.rmtree(output_dir)
+
+def test_split_matches_per_country_filter():
+    """split_by_country gives each country the rows the old per-country regex filter selected."""
+    df = pd.read_csv(os.path.join(PROJECT_ROOT, 'netflix_titles.csv'),
+                     usecols=['show_id', 'type', 'country', 'release_year', 'listed_in', 'description'])
+    split = split_by_country(df)
+    assert len(split) > 50
+    for country, rows in split.items():
+        pattern = rf'(?:^|,)\s*{re.escape(country)}\s*(?:,|$)'
+        expected = df[df['country'].str.contains(pattern, na=False)]
+        pd.testing.assert_frame_equal(rows.sort_index(), expected)
+
+def test_parallel_render_writes_same_dashboards():
+    """The process pool renders the same set of dashboards as the in-process loop."""
+    serial_dir, parallel_dir = tempfile.mkdtemp(), tempfile.mkdtemp()
+    try:
+        df = add_content_preference_scores(sample_titles())
+        preferences = determine_content_preference(df)
+        serial = render_country_dashboards(df, preferences, workers=1, output_dir=serial_dir)
+        parallel = render_country_dashboards(df, preferences, workers=2, output_dir=parallel_dir)
+        assert serial == parallel
+        assert sorted(os.listdir(serial_dir)) == sorted(os.listdir(parallel_dir))
+    finally:
+        shutil.rmtree(serial_dir)
+        shutil.rmtree(parallel_dir)
+
+def test_plotly_bundle_follows_installed_version():
+    """A bundle from another plotly.js version is replaced; the current one is kept."""
+    output_dir = tempfile.mkdtemp()
+    bundle_path = os.path.join(output_dir, 'plotly.min.js')
+    try:
+        with open(bundle_path, 'w', encoding='utf-8') as f:
+            f.write("/**\n* plotly.js v0.0.1\n*/\n")
+        country_dashboards.write_plotly_bundle(output_dir)
+        assert os.path.getsize(bundle_path) > 100_000
+
+        os.utime(bundle_path, (0, 0))
+        country_dashboards.write_plotly_bundle(output_dir)
+        assert os.path.getmtime(bundle_path) == 0
+    finally:
+        shutil.rmtree(output_dir)
+
+if __name__ == '__main__':
+    test_incremental_rendering()
+    test_split_matches_per_country_filter()
+    test_parallel_render_writes_same_dashboards()
+    test_plotly_bundle_follows_installed_version()
+    print("✓ Dashboard tests passed")
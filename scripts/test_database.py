@@ -0,0 +1,327 @@
+import json
+import os
+import shutil
+import sys
+import sqlite3
+import tempfile
+
+import pandas as pd
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_ROOT)
+sys.path.insert(0, os.path.join(PROJECT_ROOT, 'scripts'))
+
+import setup_database
+from db_utils import BatchWriter, ReadOnlyPool, configure_for_writes
+import data_access
+import load_catalog
+import clean_data
+
+SAMPLE_TITLES = [
+    ('s1', 'Movie', 'Lagos Nights', 'Nigeria', 2020, 'Dramas, International Movies', 'A crisis in the city.'),
+    ('s2', 'Movie', 'Sahel', 'Niger, France', 2019, 'Documentaries', 'A true story of the desert.'),
+    ('s3', 'TV Show', 'Paris Magic', 'France, France,', 2021, 'Kids\' TV, TV Comedies', 'A magical adventure.'),
+    ('s4', 'Movie', 'Nowhere', None, 2018, None, None),
+]
+
+def create_sample_database():
+    """Create a throwaway database holding the base netflix_titles columns."""
+    handle, path = tempfile.mkstemp(suffix='.db')
+    os.close(handle)
+    conn = sqlite3.connect(path)
+    conn.execute("""
+        CREATE TABLE netflix_titles (
+            show_id TEXT PRIMARY KEY, type TEXT, title TEXT, country TEXT,
+            release_year INTEGER, listed_in TEXT, description TEXT
+        )
+    """)
+    conn.executemany("INSERT INTO netflix_titles VALUES (?, ?, ?, ?, ?, ?, ?)", SAMPLE_TITLES)
+    conn.commit()
+    conn.close()
+    return path
+
+def test_bridge_tables_use_exact_countries():
+    """Bridge rows are split, stripped and deduplicated per title."""
+    path = create_sample_database()
+    try:
+        conn = sqlite3.connect(path)
+        setup_database.refresh_bridge_tables(conn)
+
+        niger = conn.execute("SELECT show_id FROM title_country WHERE country = 'Niger'").fetchall()
+        assert niger == [('s2',)]
+
+        france = conn.execute("SELECT show_id FROM title_country WHERE country = 'France' ORDER BY show_id").fetchall()
+        assert france == [('s2',), ('s3',)]
+
+        genres = conn.execute("SELECT genre FROM title_genre WHERE show_id = 's1' ORDER BY position").fetchall()
+        assert genres == [('Dramas',), ('International Movies',)]
+
+        assert conn.execute("SELECT COUNT(*) FROM title_country WHERE show_id = 's4'").fetchone()[0] == 0
+
+        plan = conn.execute("EXPLAIN QUERY PLAN SELECT show_id FROM title_country WHERE country = ?", ('Niger',)).fetchall()
+        assert 'idx_title_country_country' in plan[0][-1]
+        conn.close()
+    finally:
+        os.remove(path)
+
+def test_bridge_tables_refresh_single_title():
+    """Refreshing a subset only rewrites the rows of those titles."""
+    path = create_sample_database()
+    try:
+        conn = sqlite3.connect(path)
+        setup_database.refresh_bridge_tables(conn)
+        conn.execute("UPDATE netflix_titles SET country = 'Ghana' WHERE show_id = 's1'")
+        setup_database.refresh_bridge_tables(conn, show_ids=['s1'])
+
+        rows = conn.execute("SELECT show_id, country FROM title_country ORDER BY show_id, position").fetchall()
+        assert rows == [('s1', 'Ghana'), ('s2', 'Niger'), ('s2', 'France'), ('s3', 'France')]
+        conn.close()
+    finally:
+        os.remove(path)
+
+def test_political_matrix_matches_groupby():
+    """The materialized matrix reproduces the old per-request groupby."""
+    df = pd.DataFrame({
+        'country': ['India', 'India', 'India', 'India', 'Ghana', 'Ghana'],
+        'release_year': [2020, 2020, 2020, 2019, 2020, 2020],
+        'genre': ['Dramas', 'Comedies', 'Comedies', 'Dramas', 'Thrillers', 'Dramas'],
+        'awards': [1, 2, 3, 0, 4, 0],
+        'political_context_score': [3, 3, 6, 1, 1, 2]
+    })
+    expected = df.groupby(['country', 'release_year']).agg({
+        'political_context_score': 'mean',
+        'awards': 'mean',
+        'genre': lambda x: x.value_counts().index[0]
+    }).reset_index()
+
+    pd.testing.assert_frame_equal(setup_database.build_political_matrix(df), expected)
+
+def test_batch_writer_flushes_in_chunks():
+    """Rows are written per chunk and the remainder is flushed on exit."""
+    path = create_sample_database()
+    try:
+        conn = configure_for_writes(sqlite3.connect(path))
+        assert conn.execute("PRAGMA journal_mode").fetchone()[0] == 'wal'
+
+        with BatchWriter(conn, "UPDATE netflix_titles SET release_year = ? WHERE show_id = ?", batch_size=3) as writer:
+            writer.add_many((2000 + i, show_id) for i, (show_id, *_) in enumerate(SAMPLE_TITLES))
+            assert writer.written == 3
+
+        assert writer.written == 4
+        years = [row[0] for row in conn.execute("SELECT release_year FROM netflix_titles ORDER BY show_id")]
+        assert years == [2000, 2001, 2002, 2003]
+        conn.close()
+    finally:
+        os.remove(path)
+
+def test_titles_snapshot_tracks_db_version():
+    """The snapshot is reused until the database changes, with compact dtypes."""
+    path = create_sample_database()
+    snapshot_dir = tempfile.mkdtemp()
+    default_dir = data_access.SNAPSHOT_DIR
+    try:
+        data_access.SNAPSHOT_DIR = snapshot_dir
+        conn = sqlite3.connect(path)
+        for column in ('date_added', 'rating', 'duration', 'awards', 'political_context_score', 'genre'):
+            conn.execute(f"ALTER TABLE netflix_titles ADD COLUMN {column}")
+        conn.commit()
+
+        df = data_access.load_titles(path)
+        assert df['type'].dtype == 'category'
+        assert df['release_year'].dtype == 'int16'
+        assert list(df['primary_genre'].iloc[:3]) == ['Dramas', 'Documentaries', "Kids' TV"]
+        assert pd.isna(df['primary_genre'].iloc[3])
+        assert len(os.listdir(snapshot_dir)) == 1
+
+        conn.execute("UPDATE netflix_titles SET title = 'Renamed' WHERE show_id = 's1'")
+        conn.commit()
+        conn.close()
+        os.utime(path, ns=(os.stat(path).st_atime_ns, os.stat(path).st_mtime_ns + 1_000_000))
+
+        assert data_access.load_titles(path)['title'].iloc[0] == 'Renamed'
+        assert len(os.listdir(snapshot_dir)) == 1
+    finally:
+        data_access.SNAPSHOT_DIR = default_dir
+        shutil.rmtree(snapshot_dir)
+        os.remove(path)
+
+def test_read_only_pool_reuses_connections():
+    """Pooled connections are reused, refuse writes and follow a replaced file."""
+    path = create_sample_database()
+    pool = ReadOnlyPool(path, max_idle=1)
+    try:
+        with pool.connection() as conn:
+            assert conn.execute("SELECT COUNT(*) FROM netflix_titles").fetchone()[0] == 4
+            assert conn.execute("PRAGMA query_only").fetchone()[0] == 1
+        try:
+            with pool.connection() as conn:
+                conn.execute("DELETE FROM netflix_titles")
+            assert False, "read-only connection accepted a write"
+        except sqlite3.OperationalError:
+            pass
+        stats = pool.stats()
+        assert (stats['opened'], stats['reused']) == (1, 1)
+        # The failed statement discarded that connection
+        assert stats['idle'] == 0 and stats['closed'] == 1
+
+        # Two concurrent borrowers, but only one is kept afterwards
+        with pool.connection(), pool.connection():
+            assert pool.stats()['in_use'] == 2
+        assert pool.stats()['idle'] == 1
+
+        def replace_database(remove_id):
+            replacement = create_sample_database()
+            conn = sqlite3.connect(replacement)
+            conn.execute("DELETE FROM netflix_titles WHERE show_id = ?", (remove_id,))
+            conn.commit()
+            conn.close()
+            os.replace(replacement, path)
+
+        replace_database('s4')
+        with pool.connection() as conn:
+            assert conn.execute("SELECT COUNT(*) FROM netflix_titles").fetchone()[0] == 3
+
+        # A connection checked out while the file is swapped is not put back
+        with pool.connection() as conn:
+            replace_database('s1')
+        assert pool.stats()['idle'] == 0
+        for _ in range(2):
+            with pool.connection() as conn:
+                assert conn.execute("SELECT COUNT(*) FROM netflix_titles WHERE show_id = 's1'").fetchone()[0] == 0
+    finally:
+        pool.close()
+        os.remove(path)
+
+CATALOG_CSV = '''show_id,type,title,director,cast,country,date_added,release_year,rating,duration,listed_in,description
+s1,Movie,Lagos Nights,,,Nigeria,"March 1, 2020",2020,PG,90 min,Dramas,A crisis in the city.
+s2,Movie,Sahel,,,"Niger, France",,2019,,,Documentaries,"A story, with commas."
+s3,TV Show,Paris Magic,,,France,2021-06-01,2021,TV-Y,1 Season,Kids' TV,
+'''
+
+def test_catalog_loader_builds_and_upserts():
+    """A full load types the columns; an upsert merges changes and keeps enrichment."""
+    data_dir = tempfile.mkdtemp()
+    csv_path = os.path.join(data_dir, 'netflix_titles.csv')
+    db_path = os.path.join(data_dir, 'netflix_titles.db')
+    try:
+        with open(csv_path, 'w', encoding='utf-8') as f:
+            f.write(CATALOG_CSV)
+        assert load_catalog.load_full(csv_path, db_path, chunk_size=2) == 3
+
+        conn = sqlite3.connect(db_path)
+        assert conn.execute("SELECT release_year, typeof(release_year), date_added FROM netflix_titles "
+                            "WHERE show_id = 's2'").fetchone() == (2019, 'integer', None)
+        assert conn.execute("SELECT COUNT(*) FROM title_country").fetchone()[0] == 4
+        conn.execute("UPDATE netflix_titles SET awards = 7 WHERE show_id = 's1'")
+        conn.commit()
+        conn.close()
+
+        with open(csv_path, 'w', encoding='utf-8') as f:
+            f.write(CATALOG_CSV.replace('Lagos Nights,,,Nigeria', 'Lagos Nights,,,Ghana')
+                    + 's4,Movie,New Arrival,,,India,,2024,,,Dramas,\n')
+        assert load_catalog.load_upsert(csv_path, db_path, chunk_size=2) == (1, 1)
+        assert load_catalog.load_upsert(csv_path, db_path) == (0, 0)
+
+        conn = sqlite3.connect(db_path)
+        assert conn.execute("SELECT country, awards FROM netflix_titles WHERE show_id = 's1'").fetchone() == ('Ghana', 7)
+        assert conn.execute("SELECT COUNT(*) FROM netflix_titles").fetchone()[0] == 4
+        assert conn.execute("SELECT country FROM title_country WHERE show_id IN ('s1', 's4') "
+                            "ORDER BY show_id").fetchall() == [('Ghana',), ('India',)]
+        conn.close()
+    finally:
+        shutil.rmtree(data_dir)
+
+def test_upsert_replaces_legacy_show_id_index():
+    """A database set up with the old non-unique show_id index can still be upserted into."""
+    data_dir = tempfile.mkdtemp()
+    csv_path = os.path.join(data_dir, 'netflix_titles.csv')
+    db_path = os.path.join(data_dir, 'netflix_titles.db')
+    try:
+        with open(csv_path, 'w', encoding='utf-8') as f:
+            f.write(CATALOG_CSV)
+        conn = sqlite3.connect(db_path)
+        load_catalog.create_titles_table(conn)
+        conn.execute("CREATE TABLE legacy AS SELECT * FROM netflix_titles")
+        conn.execute("DROP TABLE netflix_titles")
+        conn.execute("ALTER TABLE legacy RENAME TO netflix_titles")
+        conn.execute(f"CREATE INDEX {setup_database.LEGACY_SHOW_ID_INDEX} ON netflix_titles (show_id)")
+        conn.commit()
+        conn.close()
+
+        assert load_catalog.load_upsert(csv_path, db_path) == (3, 0)
+        conn = sqlite3.connect(db_path)
+        indexes = {row[1]: row[2] for row in conn.execute("PRAGMA index_list(netflix_titles)")}
+        assert indexes[setup_database.SHOW_ID_INDEX] == 1
+        assert setup_database.LEGACY_SHOW_ID_INDEX not in indexes
+        conn.close()
+    finally:
+        shutil.rmtree(data_dir)
+
+def test_checkpoint_keeps_wal_commits():
+    """Commits still in the -wal file reach the database file before a full load replaces it."""
+    data_dir = tempfile.mkdtemp()
+    db_path = os.path.join(data_dir, 'netflix_titles.db')
+    try:
+        writer = configure_for_writes(sqlite3.connect(db_path))
+        writer.execute("PRAGMA wal_autocheckpoint=0")
+        writer.execute("CREATE TABLE t (x INTEGER)")
+        writer.execute("INSERT INTO t VALUES (1)")
+        writer.commit()
+        assert os.path.getsize(db_path + '-wal') > 0
+
+        load_catalog.checkpoint(db_path)
+        copy_path = os.path.join(data_dir, 'copy.db')
+        shutil.copyfile(db_path, copy_path)
+        assert sqlite3.connect(copy_path).execute("SELECT x FROM t").fetchall() == [(1,)]
+        writer.close()
+    finally:
+        shutil.rmtree(data_dir)
+
+def test_clean_data_is_set_based():
+    """Cleaning keeps the first country and genre and normalizes every date format."""
+    data_dir = tempfile.mkdtemp()
+    db_path = os.path.join(data_dir, 'netflix_titles.db')
+    output_path = os.path.join(data_dir, 'data', 'netflix_titles.json')
+    try:
+        conn = sqlite3.connect(db_path)
+        conn.execute("""
+            CREATE TABLE netflix_titles (
+                show_id TEXT, type TEXT, title TEXT, director TEXT, "cast" TEXT, country TEXT,
+                date_added TEXT, release_year INTEGER, rating TEXT, duration TEXT,
+                listed_in TEXT, description TEXT, awards INTEGER, political_context_score REAL,
+                conflict_intensity TEXT, event_keywords TEXT, genre TEXT
+            )
+        """)
+        conn.executemany("INSERT INTO netflix_titles VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", [
+            ('s1', 'Movie', 'A', None, None, ' India , France', ' March 1, 2020', 2020, None, None,
+             'Dramas, Comedies', None, 3, 4.5, 'High', 'riots', 'Dramas'),
+            ('s2', 'Movie', 'B', None, None, None, '15/06/2019', 2019, None, None, None, None, None, None, None, None, None),
+            ('s3', 'Movie', 'C', None, None, '', 'sometime', 2018, None, None, 'Kids\' TV', None, 1, 1, None, None, None),
+        ])
+        conn.commit()
+        conn.close()
+
+        clean_data.clean_netflix_data(db_path, output_path)
+
+        with open(output_path, encoding='utf-8') as f:
+            records = {record['show_id']: record for record in json.load(f)}
+        assert (records['s1']['country'], records['s1']['listed_in'], records['s1']['date_added']) == ('India', 'Dramas', '2020-03-01')
+        assert (records['s1']['event_keywords'], records['s1']['genre']) == ('riots', 'Dramas')
+        assert (records['s2']['country'], records['s2']['date_added'], records['s2']['awards']) == (None, '2019-06-15', 0)
+        # Unparseable dates are left as they were
+        assert (records['s3']['country'], records['s3']['date_added']) == ('', 'sometime')
+    finally:
+        shutil.rmtree(data_dir)
+
+if __name__ == '__main__':
+    test_bridge_tables_use_exact_countries()
+    test_bridge_tables_refresh_single_title()
+    test_political_matrix_matches_groupby()
+    test_batch_writer_flushes_in_chunks()
+    test_titles_snapshot_tracks_db_version()
+    test_read_only_pool_reuses_connections()
+    test_catalog_loader_builds_and_upserts()
+    test_upsert_replaces_legacy_show_id_index()
+    test_checkpoint_keeps_wal_commits()
+    test_clean_data_is_set_based()
+    print("✓ Database tests passed")
@@ -0,0 +1,53 @@
+import os
+import sys
+from datetime import datetime
+
+import pandas as pd
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_ROOT)
+
+import date_utils
+
+def try_every_format(value):
+    """The strptime loop process_data.py and clean_data.py used to inline."""
+    for date_format in date_utils.DATE_FORMATS:
+        try:
+            return datetime.strptime(str(value).strip(), date_format).strftime('%Y-%m-%d')
+        except ValueError:
+            continue
+    return value
+
+SAMPLE_DATES = [
+    'September 25, 2021', ' April 1, 2020 ', '2021-09-05', '2021-9-5', '01/02/2020',
+    '12/31/2020', '13/13/2020', '2020/01/02', 'sometime', 'March 32, 2020'
+]
+
+def test_normalize_date_matches_strptime_loop():
+    """Guessing the format from the string's shape gives the same dates as trying all four."""
+    for value in SAMPLE_DATES:
+        assert date_utils.normalize_date(value) == try_every_format(value), value
+    assert date_utils.normalize_date(None) is None
+    assert date_utils.normalize_date('') == ''
+
+def test_vectorized_paths_and_stats():
+    """Column helpers parse each distinct string once and count the formats seen."""
+    date_utils.reset_format_stats()
+    column = pd.Series(['September 25, 2021'] * 50 + ['01/02/2020', None, 'junk'])
+
+    normalized = date_utils.normalize_dates(column)
+    assert normalized.tolist() == [try_every_format(v) if v else v for v in column]
+
+    stats = date_utils.format_stats()
+    assert stats['formats'] == {'%B %d, %Y': 1, '%d/%m/%Y': 1, 'unparsed': 1}
+    assert stats['cache_misses'] == 3
+
+    parsed = date_utils.parse_dates(column)
+    assert parsed.iloc[0] == pd.Timestamp('2021-09-25')
+    assert parsed.iloc[50] == pd.Timestamp('2020-02-01')
+    assert parsed.iloc[51:].isna().all()
+
+if __name__ == '__main__':
+    test_normalize_date_matches_strptime_loop()
+    test_vectorized_paths_and_stats()
+    print("✓ Date parsing tests passed")
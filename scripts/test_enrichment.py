@@ -0,0 +1,192 @@
+import contextlib
+import io
+import os
+import sys
+import sqlite3
+import tempfile
+import threading
+import time
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_ROOT)
+
+import enrich_netflix_data
+from country_resolver import FixtureProvider, IMDbProvider, resolve_missing_countries
+import setup_database
+from lookups import LookupCache, RateLimiter, run_lookups
+
+class FakeMovie(dict):
+    def __init__(self, movie_id, title, **fields):
+        super().__init__(title=title, **fields)
+        self.movieID = movie_id
+
+class FakeIMDb:
+    """Offline stand-in for imdb.IMDb serving a fixed catalog."""
+
+    calls = []
+    lock = threading.Lock()
+
+    def __init__(self, catalog):
+        self.catalog = catalog
+
+    def search_movie(self, title):
+        with self.lock:
+            self.calls.append(title)
+        if title == 'Broken':
+            raise ConnectionError("simulated network error")
+        return [FakeMovie(title, title)] if title in self.catalog else []
+
+    def get_movie(self, movie_id):
+        return FakeMovie(movie_id, movie_id, **self.catalog[movie_id])
+
+CATALOG = {
+    'Dick Johnson Is Dead': {'awards': '2 wins & 3 nominations'},
+    'Blood & Water': {'awards': 'nominated for 1 award', 'countries': ['South Africa']},
+    'Ganglands': {}
+}
+
+def create_sample_database():
+    handle, path = tempfile.mkstemp(suffix='.db')
+    os.close(handle)
+    conn = sqlite3.connect(path)
+    conn.execute("""
+        CREATE TABLE netflix_titles (
+            show_id TEXT PRIMARY KEY, type TEXT, title TEXT, country TEXT, release_year INTEGER, listed_in TEXT
+        )
+    """)
+    conn.executemany("INSERT INTO netflix_titles VALUES (?, ?, ?, ?, ?, ?)", [
+        ('s1', 'Movie', 'Dick Johnson Is Dead', 'United States', 2020, 'Documentaries'),
+        ('s2', 'TV Show', 'Blood & Water', 'South Africa', 2021, 'International TV Shows, TV Dramas'),
+        ('s3', 'TV Show', 'Ganglands', None, 2021, 'Crime TV Shows'),
+        ('s4', 'Movie', 'Broken', 'India', 2020, 'Dramas'),
+    ])
+    conn.commit()
+    conn.close()
+    default_path = setup_database.DB_PATH
+    try:
+        setup_database.DB_PATH = path
+        setup_database.setup_database()
+    finally:
+        setup_database.DB_PATH = default_path
+    return path
+
+def test_enrichment_uses_fake_provider_and_cache():
+    """Awards come from the provider once; the rerun is served from cache."""
+    db_path = create_sample_database()
+    handle, cache_path = tempfile.mkstemp(suffix='.db')
+    os.close(handle)
+    try:
+        factory = lambda: FakeIMDb(CATALOG)
+        FakeIMDb.calls.clear()
+        enrich_netflix_data.main(db_path, imdb_factory=factory, cache_path=cache_path)
+
+        conn = sqlite3.connect(db_path)
+        awards = dict(conn.execute("SELECT show_id, awards FROM netflix_titles"))
+        assert awards == {'s1': 2, 's2': 1, 's3': 0, 's4': 0}
+        conn.close()
+        assert sorted(FakeIMDb.calls) == sorted(['Dick Johnson Is Dead', 'Blood & Water', 'Ganglands', 'Broken'])
+
+        # Only the failed lookup is retried on the next run
+        FakeIMDb.calls.clear()
+        enrich_netflix_data.main(db_path, imdb_factory=factory, cache_path=cache_path)
+        assert FakeIMDb.calls == ['Broken']
+    finally:
+        os.remove(db_path)
+        os.remove(cache_path)
+
+def test_lookup_cache_expires_entries():
+    handle, cache_path = tempfile.mkstemp(suffix='.db')
+    os.close(handle)
+    try:
+        cache = LookupCache(cache_path, namespace='test', ttl_days=1)
+        cache.put_many({('A', 2020): 1, ('B', None): None})
+        assert cache.get_many([('A', 2020), ('B', None), ('C', 2020)]) == {('A', 2020): 1, ('B', None): None}
+
+        cache.conn.execute("UPDATE lookup_cache SET fetched_at = fetched_at - 2 * 86400 WHERE title = 'A'")
+        assert cache.get_many([('A', 2020)]) == {}
+        cache.close()
+    finally:
+        os.remove(cache_path)
+
+def test_run_lookups_deduplicates_and_rate_limits():
+    fetched = []
+    keys = [('A', 2020), ('B', 2020), ('A', 2020), ('C', 2021)]
+
+    output = io.StringIO()
+    start = time.monotonic()
+    with contextlib.redirect_stdout(output):
+        results = run_lookups(keys, lambda key: fetched.append(key) or key[0].lower(),
+                              workers=4, rate_limiter=RateLimiter(rate=20, burst=1), progress_every=2)
+    elapsed = time.monotonic() - start
+
+    assert results == {('A', 2020): 'a', ('B', 2020): 'b', ('C', 2021): 'c'}
+    assert len(fetched) == 3
+    # The first token is free; the other two wait 1/20s each
+    assert elapsed >= 0.09
+    assert "Looked up 2/3 titles" in output.getvalue()
+
+class CountingLimiter:
+    def __init__(self):
+        self.tokens = 0
+
+    def acquire(self):
+        self.tokens += 1
+
+def test_imdb_lookups_take_a_token_per_request():
+    """Search and detail fetches are each rate limited; a miss costs one request."""
+    imdb = FakeIMDb(CATALOG)
+    limiter = CountingLimiter()
+    assert enrich_netflix_data.fetch_awards_count(imdb, 'Dick Johnson Is Dead', limiter) == 2
+    assert limiter.tokens == 2
+    assert enrich_netflix_data.fetch_awards_count(imdb, 'Not In Catalog', limiter) == 0
+    assert limiter.tokens == 3
+
+    provider = IMDbProvider(imdb_factory=lambda: imdb)
+    assert provider.lookup('Blood & Water', limiter) == 'South Africa'
+    assert limiter.tokens == 5
+
+class CountingFixture(FixtureProvider):
+    def __init__(self, fixture):
+        super().__init__(fixture)
+        self.calls = []
+
+    def lookup(self, title, rate_limiter=None):
+        self.calls.append(title)
+        return super().lookup(title, rate_limiter)
+
+def test_resolver_dedupes_and_resumes():
+    """Duplicate titles are fetched once and answered titles are not refetched."""
+    db_path = create_sample_database()
+    handle, cache_path = tempfile.mkstemp(suffix='.db')
+    os.close(handle)
+    try:
+        conn = sqlite3.connect(db_path)
+        conn.execute("INSERT INTO netflix_titles (show_id, title) VALUES ('s5', 'Ganglands')")
+        conn.execute("INSERT INTO netflix_titles (show_id, title) VALUES ('s6', 'Unknown Film')")
+        conn.commit()
+
+        # A previous, interrupted run already checkpointed one answer
+        cache = LookupCache(cache_path, namespace='country:fixture')
+        cache.put_many({('Unknown Film', None): None})
+        cache.close()
+
+        provider = CountingFixture({'Ganglands': 'France', 'Unknown Film': 'Chile'})
+        assert resolve_missing_countries(provider, db_path, workers=2, requests_per_second=100, cache_path=cache_path) == 2
+        assert provider.calls == ['Ganglands']
+
+        countries = dict(conn.execute("SELECT show_id, country FROM netflix_titles WHERE show_id IN ('s3', 's5', 's6')"))
+        assert countries == {'s3': 'France', 's5': 'France', 's6': None}
+        bridge = conn.execute("SELECT show_id FROM title_country WHERE country = 'France' ORDER BY show_id").fetchall()
+        assert bridge == [('s3',), ('s5',)]
+        conn.close()
+    finally:
+        os.remove(db_path)
+        os.remove(cache_path)
+
+if __name__ == '__main__':
+    test_enrichment_uses_fake_provider_and_cache()
+    test_lookup_cache_expires_entries()
+    test_run_lookups_deduplicates_and_rate_limits()
+    test_imdb_lookups_take_a_token_per_request()
+    test_resolver_dedupes_and_resumes()
+    print("✓ Enrichment tests passed")
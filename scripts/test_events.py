@@ -0,0 +1,96 @@
+import os
+import sqlite3
+import sys
+
+import numpy as np
+import pandas as pd
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_ROOT)
+
+import events
+from enrich_netflix_data import MAJOR_EVENTS, calculate_political_context_score
+
+def per_title_scores(countries, years, events_dict):
+    """The loop enrich_netflix_data.main used before the event index."""
+    scores = []
+    for country, year in zip(countries, years):
+        if country and year:
+            parts = [c.strip() for c in country.split(',')]
+            scores.append(max(calculate_political_context_score(c, year, events_dict) for c in parts))
+        else:
+            scores.append(0)
+    return scores
+
+def test_event_index_matches_per_title_loop():
+    """Vectorized scores equal the nested-dict loop for every title."""
+    events_dict = {events.normalize_country(country): years for country, years in MAJOR_EVENTS.items()}
+    index = events.EventIndex.from_events(events.events_from_dict(events_dict))
+
+    rng = np.random.default_rng(7)
+    pool = ['United States', 'India', 'France', 'India, United States', 'Nigeria, India,', '', None]
+    countries = [pool[i] for i in rng.integers(0, len(pool), 2000)]
+    years = [None if i == 0 else int(2014 + i) for i in rng.integers(0, 9, 2000)]
+
+    expected = per_title_scores(countries, years, events_dict)
+    assert np.allclose(index.score_titles(countries, years), expected)
+
+def test_events_sheet_parses_every_cell():
+    """The shipped sheet yields one dated event per filled cell, with aliases applied."""
+    try:
+        sheet = events.read_events_sheet(os.path.join(PROJECT_ROOT, events.EVENTS_PATH))
+    except ImportError:
+        print("openpyxl is not installed; skipping the events sheet test")
+        return
+    loaded = events.load_events(os.path.join(PROJECT_ROOT, events.EVENTS_PATH))
+    assert len(loaded) == int(sheet.iloc[:, 1:].notna().sum().sum())
+    assert (loaded['start_year'] <= loaded['end_year']).all()
+    assert {'United States', 'South Korea', 'Colombia'} <= set(loaded['country'])
+    assert events.parse_event('(2019 - 2020) Black Summer Bushfires') == ('Black Summer Bushfires', 2019, 2020)
+    assert events.parse_event('Trump Election (2021)') == ('Trump Election', 2021, 2021)
+    assert events.parse_event('No year here') is None
+
+def test_match_events_by_date_window():
+    """Titles match their own countries' events by date_added, widened by the window."""
+    conn = sqlite3.connect(':memory:')
+    sample = pd.DataFrame([
+        ('India', 'Delhi Riots', 2020, 2020, 'High'),
+        ('India', 'Farm Protests', 2020, 2021, 'Moderate'),
+        ('France', 'Yellow Vests Protests', 2018, 2019, 'Moderate'),
+    ], columns=['country', 'event', 'start_year', 'end_year', 'intensity'])
+    assert events.ingest_events(conn, sample) == 3
+    stored = events.read_events_table(conn)
+    assert stored.loc[0, 'keywords'] == 'delhi,riots'
+
+    titles = pd.DataFrame({
+        'show_id': ['s1', 's2', 's3', 's4', 's5', 's6'],
+        'country': ['India', 'India, France', 'France', 'Nigeria', None, 'India'],
+        'date_added': ['March 1, 2020', '2019-12-20', '15/06/2019', '2020-05-05', '2020-05-05', None]
+    })
+
+    exact = events.match_events(titles, stored)
+    assert sorted(zip(exact['show_id'], exact['event'])) == [
+        ('s1', 'Delhi Riots'), ('s1', 'Farm Protests'),
+        ('s2', 'Yellow Vests Protests'), ('s3', 'Yellow Vests Protests')
+    ]
+
+    # s2 was added 12 days before the Indian events started
+    windowed = events.match_events(titles, stored, window_days=30)
+    assert sorted(zip(windowed['show_id'], windowed['country'], windowed['event'])) == [
+        ('s1', 'India', 'Delhi Riots'), ('s1', 'India', 'Farm Protests'),
+        ('s2', 'France', 'Yellow Vests Protests'),
+        ('s2', 'India', 'Delhi Riots'), ('s2', 'India', 'Farm Protests'),
+        ('s3', 'France', 'Yellow Vests Protests')
+    ]
+
+    plan = conn.execute(
+        "EXPLAIN QUERY PLAN SELECT * FROM events WHERE country = ? AND start_date <= ? AND end_date >= ?",
+        ('India', '2020-01-01', '2020-01-01')).fetchall()
+    assert 'idx_events_country_dates' in plan[0][-1]
+    conn.close()
+
+if __name__ == '__main__':
+    test_event_index_matches_per_title_loop()
+    test_events_sheet_parses_every_cell()
+    test_match_events_by_date_window()
+    print("✓ Event tests passed")
@@ -0,0 +1,120 @@
+import json
+import os
+import shutil
+import sqlite3
+import sys
+import tempfile
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, PROJECT_ROOT)
+sys.path.insert(0, SCRIPTS_DIR)
+
+import process_data
+
+TITLES = [
+    ('s1', 'Movie', 'A', 'India, France', 'September 25, 2021', 2020, '90 min', 'Dramas, Comedies'),
+    ('s2', 'TV Show', 'B', 'India', '2021-01-05', 2020, '2 Seasons', 'Dramas'),
+    ('s3', 'Movie', 'C', 'United States', None, 2019, '100 min', 'Documentaries'),
+    ('s4', 'Movie', 'D', 'United-States', None, 2019, None, None),
+    ('s5', 'TV Show', 'E', None, None, None, '1 Season', 'Kids\' TV'),
+]
+
+def create_titles_db(data_dir):
+    db_path = os.path.join(data_dir, 'netflix_titles.db')
+    conn = sqlite3.connect(db_path)
+    conn.execute("""
+        CREATE TABLE netflix_titles (
+            show_id TEXT, type TEXT, title TEXT, country TEXT, date_added TEXT,
+            release_year INTEGER, duration TEXT, listed_in TEXT
+        )
+    """)
+    conn.executemany("INSERT INTO netflix_titles VALUES (?, ?, ?, ?, ?, ?, ?, ?)", TITLES)
+    conn.commit()
+    conn.close()
+    return db_path
+
+def read_json(data_dir, name):
+    with open(os.path.join(data_dir, name), encoding='utf-8') as f:
+        return json.load(f)
+
+def test_export_writes_json_shards_and_manifest():
+    """The streamed export, shards, summary and manifest all agree with the table."""
+    data_dir = tempfile.mkdtemp()
+    try:
+        db_path = create_titles_db(data_dir)
+        out_dir = os.path.join(data_dir, 'data')
+        process_data.process_netflix_data(db_path=db_path, data_dir=out_dir)
+
+        with open(os.path.join(out_dir, 'netflix_titles.json'), encoding='utf-8') as f:
+            text = f.read()
+        assert text.startswith('[\n{\n  "show_id"')
+        titles = json.loads(text)
+        assert [t['show_id'] for t in titles] == ['s1', 's2', 's3', 's4', 's5']
+        assert titles[0]['countries'] == ['India', 'France']
+        assert titles[0]['date_added'] == '2021-09-25'
+        assert (titles[1]['duration_type'], titles[1]['duration_value']) == ('Seasons', 2)
+
+        manifest = read_json(out_dir, 'manifest.json')
+        assert manifest['total_titles'] == 5
+        assert manifest['countries']['India'] == {'file': 'shards/country/india.json', 'count': 2}
+        # "United States" and "United-States" slug to the same name and must not overwrite each other
+        us_files = {manifest['countries'][c]['file'] for c in ('United States', 'United-States')}
+        assert us_files == {'shards/country/united_states.json', 'shards/country/united_states_2.json'}
+        for country, entry in manifest['countries'].items():
+            shard = read_json(out_dir, entry['file'])
+            assert len(shard) == entry['count']
+            assert all(country in t['countries'] for t in shard)
+        assert [t['show_id'] for t in read_json(out_dir, manifest['years']['2020']['file'])] == ['s1', 's2']
+
+        summary = read_json(out_dir, 'summary.json')
+        assert summary['countries']['India'] == {'total': 2, 'movies': 1, 'shows': 1, 'genres': ['Comedies', 'Dramas']}
+        assert summary['years'] == {'2019': 2, '2020': 2}
+    finally:
+        shutil.rmtree(data_dir)
+
+def test_ndjson_compact_and_no_shards():
+    """NDJSON is one record per line; an export without shards removes the old manifest."""
+    data_dir = tempfile.mkdtemp()
+    try:
+        db_path = create_titles_db(data_dir)
+        out_dir = os.path.join(data_dir, 'data')
+        process_data.process_netflix_data(db_path=db_path, data_dir=out_dir)
+        assert os.path.exists(os.path.join(out_dir, 'manifest.json'))
+
+        process_data.process_netflix_data('ndjson', db_path=db_path, data_dir=out_dir, shards=False)
+        with open(os.path.join(out_dir, 'netflix_titles.ndjson'), encoding='utf-8') as f:
+            lines = f.read().splitlines()
+        assert [json.loads(line)['show_id'] for line in lines] == ['s1', 's2', 's3', 's4', 's5']
+        assert not os.path.exists(os.path.join(out_dir, 'manifest.json'))
+        assert not os.path.exists(os.path.join(out_dir, 'shards'))
+        assert read_json(out_dir, 'summary.json')['total_titles'] == 5
+
+        process_data.process_netflix_data(indent=None, db_path=db_path, data_dir=out_dir, shards=False)
+        with open(os.path.join(out_dir, 'netflix_titles.json'), encoding='utf-8') as f:
+            text = f.read()
+        assert '\n' not in text and '": ' not in text
+        assert len(json.loads(text)) == 5
+    finally:
+        shutil.rmtree(data_dir)
+
+def test_shard_writer_flushes_without_open_files():
+    """Shards are appended in buffered pieces and still form valid JSON arrays."""
+    data_dir = tempfile.mkdtemp()
+    try:
+        writer = process_data.ShardWriter(os.path.join(data_dir, 'shards'), buffer_size=1)
+        for i in range(30):
+            writer.write({'show_id': f's{i}', 'countries': [f'Country {i % 3}'], 'release_year': 2000 + i % 2})
+        entries = writer.close()
+        assert sum(entry['count'] for entry in entries['countries'].values()) == 30
+        shard = read_json(data_dir, entries['countries']['Country 0']['file'])
+        assert [t['show_id'] for t in shard] == [f's{i}' for i in range(0, 30, 3)]
+        assert not os.path.exists(os.path.join(data_dir, 'shards.tmp'))
+    finally:
+        shutil.rmtree(data_dir)
+
+if __name__ == '__main__':
+    test_export_writes_json_shards_and_manifest()
+    test_ndjson_compact_and_no_shards()
+    test_shard_writer_flushes_without_open_files()
+    print("✓ Export tests passed")
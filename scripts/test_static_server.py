@@ -0,0 +1,165 @@
+import gzip
+import http.client
+import os
+import shutil
+import socket
+import sys
+import tempfile
+import threading
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_ROOT)
+sys.path.insert(0, os.path.join(PROJECT_ROOT, 'scripts'))
+
+import compression
+import static_server
+from precompress import precompress
+
+def start_server(directory):
+    httpd = static_server.make_server(directory, port=0)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    return httpd
+
+def fetch(httpd, path, headers=None):
+    conn = http.client.HTTPConnection('localhost', httpd.server_address[1], timeout=10)
+    conn.request('GET', path, headers=headers or {})
+    response = conn.getresponse()
+    body = response.read()
+    conn.close()
+    return response, body
+
+def create_site():
+    root = tempfile.mkdtemp()
+    os.makedirs(os.path.join(root, 'data'))
+    payload = ('{"title": "Example"}\n' * 500).encode()
+    with open(os.path.join(root, 'data', 'netflix_titles.json'), 'wb') as f:
+        f.write(payload)
+    with open(os.path.join(root, 'index.html'), 'w') as f:
+        f.write('<html></html>')
+    return root, payload
+
+def test_conditional_get():
+    """A matching ETag or Last-Modified gets a 304 with CORS headers intact."""
+    root, payload = create_site()
+    httpd = start_server(root)
+    try:
+        response, body = fetch(httpd, '/data/netflix_titles.json')
+        assert response.status == 200 and body == payload
+        assert response.getheader('Access-Control-Allow-Origin') == '*'
+        assert response.getheader('Cache-Control') == 'no-cache'
+        etag = response.getheader('ETag')
+        last_modified = response.getheader('Last-Modified')
+
+        response, body = fetch(httpd, '/data/netflix_titles.json', {'If-None-Match': etag})
+        assert response.status == 304 and body == b''
+        assert response.getheader('Access-Control-Allow-Origin') == '*'
+
+        response, _ = fetch(httpd, '/data/netflix_titles.json', {'If-Modified-Since': last_modified})
+        assert response.status == 304
+
+        response, _ = fetch(httpd, '/', {'If-None-Match': fetch(httpd, '/')[0].getheader('ETag')})
+        assert response.status == 304
+    finally:
+        httpd.shutdown()
+        httpd.server_close()
+        shutil.rmtree(root)
+
+def test_precompressed_siblings():
+    """Fresh .gz siblings are served as-is; stale ones are ignored."""
+    root, payload = create_site()
+    httpd = start_server(root)
+    try:
+        written, _ = precompress(root, encodings=['gzip'])
+        assert written == 1  # index.html is below the size threshold
+        assert precompress(root, encodings=['gzip']) == (0, 1)
+
+        response, body = fetch(httpd, '/data/netflix_titles.json', {'Accept-Encoding': 'gzip'})
+        assert response.getheader('Content-Encoding') == 'gzip'
+        assert response.getheader('Content-Type') == 'application/json'
+        assert gzip.decompress(body) == payload
+        # Build-time siblings use maximum compression (gzip XFL byte 2), API responses a faster level
+        assert body[8] == 2
+        assert compression.compress(payload, 'gzip')[8] == 0
+
+        response, body = fetch(httpd, '/data/netflix_titles.json')
+        assert response.getheader('Content-Encoding') is None and body == payload
+
+        # A source newer than its sibling is served uncompressed until rebuilt
+        source = os.path.join(root, 'data', 'netflix_titles.json')
+        stat = os.stat(source)
+        os.utime(source, ns=(stat.st_atime_ns, stat.st_mtime_ns + 5_000_000_000))
+        response, body = fetch(httpd, '/data/netflix_titles.json', {'Accept-Encoding': 'gzip'})
+        assert response.getheader('Content-Encoding') is None and body == payload
+
+        os.remove(source)
+        precompress(root, encodings=['gzip'])
+        assert not os.path.exists(source + '.gz')
+    finally:
+        httpd.shutdown()
+        httpd.server_close()
+        shutil.rmtree(root)
+
+def test_range_requests():
+    """Single byte ranges return 206 slices; out-of-range requests get a 416."""
+    root, payload = create_site()
+    httpd = start_server(root)
+    try:
+        precompress(root, encodings=['gzip'])
+        response, body = fetch(httpd, '/data/netflix_titles.json',
+                               {'Range': 'bytes=10-29', 'Accept-Encoding': 'gzip'})
+        assert response.status == 206
+        assert body == payload[10:30]
+        assert response.getheader('Content-Range') == f'bytes 10-29/{len(payload)}'
+        assert response.getheader('Content-Encoding') is None
+
+        response, body = fetch(httpd, '/data/netflix_titles.json', {'Range': 'bytes=-5'})
+        assert response.status == 206 and body == payload[-5:]
+
+        response, _ = fetch(httpd, '/data/netflix_titles.json', {'Range': f'bytes={len(payload)}-'})
+        assert response.status == 416
+
+        # A stale If-Range validator means the client gets the whole file
+        response, body = fetch(httpd, '/data/netflix_titles.json',
+                               {'Range': 'bytes=0-9', 'If-Range': 'W/"stale"'})
+        assert response.status == 200 and body == payload
+
+        # The file's own ETag is weak, so If-Range must not accept it either
+        etag = fetch(httpd, '/data/netflix_titles.json')[0].getheader('ETag')
+        response, body = fetch(httpd, '/data/netflix_titles.json', {'Range': 'bytes=0-9', 'If-Range': etag})
+        assert response.status == 200 and body == payload
+
+        # An unchanged Last-Modified date is a strong validator once it is a second old
+        data_path = os.path.join(root, 'data', 'netflix_titles.json')
+        os.utime(data_path, (os.path.getmtime(data_path) - 60,) * 2)
+        last_modified = fetch(httpd, '/data/netflix_titles.json')[0].getheader('Last-Modified')
+        response, body = fetch(httpd, '/data/netflix_titles.json', {'Range': 'bytes=0-9', 'If-Range': last_modified})
+        assert response.status == 206 and body == payload[:10]
+    finally:
+        httpd.shutdown()
+        httpd.server_close()
+        shutil.rmtree(root)
+
+def test_slow_client_does_not_block_others():
+    """An idle connection does not stop other clients from being served."""
+    root, payload = create_site()
+    httpd = start_server(root)
+    try:
+        stalled = socket.create_connection(('localhost', httpd.server_address[1]))
+        stalled.sendall(b'GET /data/netflix_titles.json HTTP/1.1\r\n')  # never finishes
+        try:
+            response, body = fetch(httpd, '/index.html')
+            assert response.status == 200
+        finally:
+            stalled.close()
+    finally:
+        httpd.shutdown()
+        httpd.server_close()
+        shutil.rmtree(root)
+
+if __name__ == '__main__':
+    test_conditional_get()
+    test_precompressed_siblings()
+    test_range_requests()
+    test_slow_client_does_not_block_others()
+    print("✓ Static server tests passed")
@@ -0,0 +1,72 @@
+import re
+
+from db_utils import quote
+
+# Columns indexed for /api/search, with their bm25 weights (a title hit
+# counts for more than a word somewhere in the description)
+SEARCH_COLUMNS = {
+    'title': 10.0,
+    'director': 3.0,
+    'cast': 3.0,
+    'description': 1.0
+}
+
+TOKEN_PATTERN = re.compile(r'\w+', re.UNICODE)
+
+def create_search_index(conn):
+    """Create the title_search FTS5 table and the triggers that keep it current.
+
+    title_search is an external-content index over netflix_titles: it stores
+    only the index, reading the column values from netflix_titles by rowid.
+    The triggers mirror inserts, deletes and edits of the indexed columns,
+    so the loader's upserts and the country/awards enrichment updates keep
+    it in sync without a rebuild.
+    """
+    columns = ', '.join(quote(column) for column in SEARCH_COLUMNS)
+    new_values = ', '.join(f"new.{quote(column)}" for column in SEARCH_COLUMNS)
+    old_values = ', '.join(f"old.{quote(column)}" for column in SEARCH_COLUMNS)
+    conn.execute(f"""
+        CREATE VIRTUAL TABLE IF NOT EXISTS title_search USING fts5(
+            {columns},
+            content='netflix_titles', content_rowid='rowid',
+            tokenize='unicode61 remove_diacritics 2'
+        )
+    """)
+    conn.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS title_search_insert AFTER INSERT ON netflix_titles BEGIN
+            INSERT INTO title_search (rowid, {columns}) VALUES (new.rowid, {new_values});
+        END
+    """)
+    conn.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS title_search_delete AFTER DELETE ON netflix_titles BEGIN
+            INSERT INTO title_search (title_search, rowid, {columns}) VALUES ('delete', old.rowid, {old_values});
+        END
+    """)
+    conn.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS title_search_update AFTER UPDATE OF {columns} ON netflix_titles BEGIN
+            INSERT INTO title_search (title_search, rowid, {columns}) VALUES ('delete', old.rowid, {old_values});
+            INSERT INTO title_search (rowid, {columns}) VALUES (new.rowid, {new_values});
+        END
+    """)
+
+def rebuild_search_index(conn):
+    """Create the index if needed and re-read every row of netflix_titles into it."""
+    create_search_index(conn)
+    with conn:
+        conn.execute("INSERT INTO title_search (title_search) VALUES ('rebuild')")
+        conn.execute("INSERT INTO title_search (title_search) VALUES ('optimize')")
+    return conn.execute("SELECT COUNT(*) FROM netflix_titles").fetchone()[0]
+
+def to_match_query(text):
+    """Turn free text into an FTS5 query that cannot be a syntax error.
+
+    Every word must appear (in any indexed column); the last word also
+    matches as a prefix so results show up while someone is still typing.
+    Returns None when the text has no searchable words.
+    """
+    tokens = TOKEN_PATTERN.findall(text or '')
+    if not tokens:
+        return None
+    terms = [f'"{token}"' for token in tokens]
+    terms[-1] += '*'
+    return ' '.join(terms)
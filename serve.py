@@ -1,23 +1,7 @@
-from http.server import HTTPServer, SimpleHTTPRequestHandler
 import os
 
-class CORSRequestHandler(SimpleHTTPRequestHandler):
-    def end_headers(self):
-        self.send_header('Access-Control-Allow-Origin', '*')
-        self.send_header('Access-Control-Allow-Methods', 'GET')
-        self.send_header('Cache-Control', 'no-store, no-cache, must-revalidate')
-        return super().end_headers()
-
-    def do_OPTIONS(self):
-        self.send_response(200)
-        self.end_headers()
+from static_server import serve
 
 if __name__ == '__main__':
-    port = 8000
-    print(f"Starting server at http://localhost:{port}")
-    
-    # Change to the directory containing this script
-    os.chdir(os.path.dirname(os.path.abspath(__file__)))
-    
-    httpd = HTTPServer(('localhost', port), CORSRequestHandler)
-    httpd.serve_forever() 
\ No newline at end of file
+    # Serve the directory containing this script
+    serve(os.path.dirname(os.path.abspath(__file__)), port=8000)
@@ -1,27 +1,168 @@
 import sqlite3
+import numpy as np
+import pandas as pd
+from aggregations import COUNTRY, GENRE
+from events import ingest_events, load_events
+from search_index import SEARCH_COLUMNS, rebuild_search_index
+from keyword_index import update_keyword_index
 
 DB_PATH = "netflix_titles.db"
 
-def setup_database():
+# Normalized lookup tables for the comma-separated country and listed_in columns
+BRIDGE_TABLES = {
+    'title_country': ('country', 'country'),
+    'title_genre': ('genre', 'listed_in')
+}
+
+# Indexes backing the GROUP BYs in aggregations.py; the COALESCE expressions
+# must match the queries exactly for SQLite to use them
+TITLE_INDEXES = {
+    'idx_titles_year_type': 'release_year, type',
+    'idx_titles_year_genre': f'release_year, {GENRE}',
+    'idx_titles_country_genre_awards': f'{COUNTRY}, {GENRE}, awards',
+    'idx_titles_genre_awards': f'{GENRE}, awards'
+}
+
+# Databases imported by hand from the CSV have no key on show_id, which the
+# API joins and pages on and load_catalog.py upserts on. ON CONFLICT(show_id)
+# needs it to be unique; older set-ups created a plain index under the
+# legacy name, which is replaced.
+SHOW_ID_INDEX = 'uq_titles_show_id'
+LEGACY_SHOW_ID_INDEX = 'idx_titles_show_id'
+
+# Columns the enrichment pipeline adds on top of the CSV catalog
+ENRICHMENT_COLUMNS = {
+    'awards': 'INTEGER DEFAULT 0',
+    'political_context_score': 'INTEGER DEFAULT 0',
+    'conflict_intensity': 'TEXT',
+    'event_keywords': 'TEXT',
+    'genre': 'TEXT'
+}
+
+def create_title_indexes(cursor):
+    cursor.execute("PRAGMA table_info(netflix_titles)")
+    if not any(name == 'show_id' and pk for _, name, _, _, _, pk in cursor.fetchall()):
+        cursor.execute(f"CREATE UNIQUE INDEX IF NOT EXISTS {SHOW_ID_INDEX} ON netflix_titles (show_id)")
+        cursor.execute(f"DROP INDEX IF EXISTS {LEGACY_SHOW_ID_INDEX}")
+    for name, columns in TITLE_INDEXES.items():
+        cursor.execute(f"CREATE INDEX IF NOT EXISTS {name} ON netflix_titles ({columns})")
+
+def split_list(value):
+    """Split a comma-separated field into its stripped, non-empty parts."""
+    if not value:
+        return []
+    return [part.strip() for part in str(value).split(',') if part.strip()]
+
+def create_bridge_tables(cursor):
+    """Create the title_country / title_genre tables and their indexes."""
+    for table, (column, _) in BRIDGE_TABLES.items():
+        cursor.execute(f"""
+            CREATE TABLE IF NOT EXISTS {table} (
+                show_id TEXT NOT NULL,
+                {column} TEXT NOT NULL,
+                position INTEGER NOT NULL,
+                PRIMARY KEY (show_id, {column})
+            ) WITHOUT ROWID
+        """)
+        cursor.execute(f"CREATE INDEX IF NOT EXISTS idx_{table}_{column} ON {table} ({column}, show_id)")
+
+def refresh_bridge_tables(conn, show_ids=None):
+    """Rebuild bridge rows for the given show_ids, or for every title if None."""
+    cursor = conn.cursor()
+    create_bridge_tables(cursor)
+    
+    if show_ids is None:
+        cursor.execute("SELECT show_id, country, listed_in FROM netflix_titles")
+        rows = cursor.fetchall()
+        for table in BRIDGE_TABLES:
+            cursor.execute(f"DELETE FROM {table}")
+    else:
+        show_ids = list(show_ids)
+        rows = []
+        for start in range(0, len(show_ids), 500):
+            chunk = show_ids[start:start + 500]
+            placeholders = ','.join('?' * len(chunk))
+            cursor.execute(f"SELECT show_id, country, listed_in FROM netflix_titles WHERE show_id IN ({placeholders})", chunk)
+            rows.extend(cursor.fetchall())
+            for table in BRIDGE_TABLES:
+                cursor.execute(f"DELETE FROM {table} WHERE show_id IN ({placeholders})", chunk)
+    
+    source_index = {'country': 1, 'listed_in': 2}
+    for table, (column, source) in BRIDGE_TABLES.items():
+        bridge_rows = []
+        for row in rows:
+            # dict.fromkeys drops duplicates like "France, France" but keeps order
+            parts = dict.fromkeys(split_list(row[source_index[source]]))
+            bridge_rows.extend((row[0], part, position) for position, part in enumerate(parts))
+        cursor.executemany(f"INSERT INTO {table} (show_id, {column}, position) VALUES (?, ?, ?)", bridge_rows)
+    
+    conn.commit()
+
+def build_political_matrix(df):
+    """Aggregate titles into one row per (country, release_year).
+    
+    Mirrors the old per-request groupby: mean political score, mean awards and
+    the most common genre, with ties going to the genre seen first.
+    """
+    keys = ['country', 'release_year']
+    matrix = df.groupby(keys).agg(
+        political_context_score=('political_context_score', 'mean'),
+        awards=('awards', 'mean')
+    ).reset_index()
+    
+    # Modal genre without a Python lambda per group: count every
+    # (country, year, genre) once, then keep the top genre of each group
+    ordered = df[keys + ['genre']].assign(order=np.arange(len(df)))
+    genres = ordered.dropna(subset=keys + ['genre'])
+    genre_counts = genres.groupby(keys + ['genre']).agg(
+        count=('order', 'size'),
+        first_seen=('order', 'min')
+    ).reset_index()
+    modal_genres = genre_counts.sort_values(
+        keys + ['count', 'first_seen'],
+        ascending=[True, True, False, True]
+    ).drop_duplicates(keys)[keys + ['genre']]
+    
+    return matrix.merge(modal_genres, on=keys, how='left')
+
+def refresh_political_matrix(conn):
+    """Materialize the political_matrix aggregate read by /api/political-matrix."""
+    df = pd.read_sql_query("""
+        SELECT country, release_year, genre, awards, political_context_score
+        FROM netflix_titles
+        WHERE political_context_score > 0
+    """, conn)
+    matrix = build_political_matrix(df)
+    
+    cursor = conn.cursor()
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS political_matrix (
+            country TEXT NOT NULL,
+            release_year INTEGER NOT NULL,
+            political_context_score REAL,
+            awards REAL,
+            genre TEXT,
+            PRIMARY KEY (country, release_year)
+        )
+    """)
+    cursor.execute("DELETE FROM political_matrix")
+    rows = matrix[['country', 'release_year', 'political_context_score', 'awards', 'genre']].astype(object)
+    rows = rows.where(rows.notna(), None)
+    cursor.executemany("INSERT INTO political_matrix VALUES (?, ?, ?, ?, ?)", rows.itertuples(index=False, name=None))
+    conn.commit()
+    return len(matrix)
+
+def setup_database(db_path=None):
     """Add necessary columns to the database if they don't exist."""
-    conn = sqlite3.connect(DB_PATH)
+    conn = sqlite3.connect(db_path or DB_PATH)
     cursor = conn.cursor()
     
     # Get existing columns
     cursor.execute("PRAGMA table_info(netflix_titles)")
     existing_columns = [row[1] for row in cursor.fetchall()]
     
-    # Define new columns to add
-    new_columns = {
-        'awards': 'INTEGER DEFAULT 0',
-        'political_context_score': 'INTEGER DEFAULT 0',
-        'conflict_intensity': 'TEXT',
-        'event_keywords': 'TEXT',
-        'genre': 'TEXT'
-    }
-    
     # Add missing columns
-    for column, dtype in new_columns.items():
+    for column, dtype in ENRICHMENT_COLUMNS.items():
         if column not in existing_columns:
             try:
                 cursor.execute(f"ALTER TABLE netflix_titles ADD COLUMN {column} {dtype}")
@@ -29,7 +170,30 @@ def setup_database():
             except sqlite3.OperationalError as e:
                 print(f"Error adding column {column}: {e}")
     
+    create_title_indexes(cursor)
     conn.commit()
+    
+    # Normalize countries and genres for indexed lookups
+    refresh_bridge_tables(conn)
+    print("Rebuilt title_country and title_genre tables")
+    
+    # /api/political-matrix reads this aggregate; enrichment refreshes it with real scores
+    print(f"Materialized {refresh_political_matrix(conn)} political matrix rows")
+    
+    # Full-text index behind /api/search (hand-made test tables may lack the text columns)
+    if set(SEARCH_COLUMNS) <= set(existing_columns):
+        print(f"Indexed {rebuild_search_index(conn)} titles for search")
+    
+    # Description keywords for the dashboards' reality/escapism scores
+    if 'description' in existing_columns:
+        print(f"Indexed keywords for {update_keyword_index(conn)} titles")
+    
+    # Load major_country_events.csv into the indexed events table
+    try:
+        print(f"Loaded {ingest_events(conn, load_events())} events")
+    except (OSError, ImportError, ValueError) as e:
+        print(f"Skipping events table: {e}")
+    
     conn.close()
     print("Database setup complete!")
 
@@ -0,0 +1,203 @@
+import email.utils
+import os
+import time
+import urllib.parse
+from functools import partial
+from http import HTTPStatus
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+from compression import SUFFIXES, choose_encoding
+
+# Configuration
+DEFAULT_PORT = 8000
+
+def file_etag(stat):
+    """Weak validator from a file's modification time and size."""
+    return f'W/"{stat.st_mtime_ns:x}-{stat.st_size:x}"'
+
+def parse_range(header, size):
+    """(start, length) for a single "bytes=" range, None if it does not apply.
+
+    Raises ValueError when the range cannot be satisfied. Multi-range
+    requests are answered with the whole file, which RFC 9110 allows.
+    """
+    unit, _, spec = header.partition('=')
+    first, _, last = spec.strip().partition('-')
+    if unit.strip() != 'bytes' or not (first or last) or not (first + last).isdigit():
+        return None  # malformed or multi-range: ignore the header
+    if not first:
+        # Suffix range: the last N bytes
+        length = min(int(last), size)
+        if length <= 0:
+            raise ValueError("empty suffix range")
+        return size - length, length
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if start >= size or end < start:
+        raise ValueError("range not satisfiable")
+    return start, end - start + 1
+
+def if_range_matches(header, etag, mtime, now=None):
+    """RFC 9110 If-Range evaluation: only a strong validator lets a range through.
+
+    Entity tags use the strong comparison, so a weak tag on either side (and
+    every file_etag is weak) never matches and the client gets the full
+    file. An HTTP-date matches when it equals Last-Modified and that date is
+    at least a second old, which makes it a strong validator.
+    """
+    header = header.strip()
+    if header.startswith(('"', 'W/')):
+        return header == etag and not etag.startswith('W/')
+    try:
+        date = email.utils.parsedate_to_datetime(header).timestamp()
+    except (TypeError, ValueError):
+        return False
+    now = time.time() if now is None else now
+    return date == int(mtime) and now - mtime >= 1
+
+def etag_matches(header, etag):
+    """Weak If-None-Match comparison (W/ prefixes are ignored)."""
+    if header.strip() == '*':
+        return True
+    opaque = etag.removeprefix('W/')
+    return any(tag.strip().removeprefix('W/') == opaque for tag in header.split(','))
+
+class StaticRequestHandler(SimpleHTTPRequestHandler):
+    """Static file handler with CORS, conditional requests and precompressed files.
+
+    Responses carry an ETag and Last-Modified and ask browsers to revalidate,
+    so an unchanged reload costs a 304 instead of the full body. When the
+    client accepts it and scripts/precompress.py has written an up-to-date
+    `.br`/`.gz` sibling, that file is sent as-is with a Content-Encoding.
+    Single byte ranges are supported on the uncompressed file, and bodies
+    are written with socket.sendfile() so the kernel does the copying.
+    """
+
+    # (offset, length) of the body send_head prepared for copyfile
+    _body_range = None
+
+    def end_headers(self):
+        self.send_header('Access-Control-Allow-Origin', '*')
+        self.send_header('Access-Control-Allow-Methods', 'GET')
+        self.send_header('Cache-Control', 'no-cache')
+        return super().end_headers()
+
+    def do_OPTIONS(self):
+        self.send_response(200)
+        self.end_headers()
+
+    def resolve_file(self):
+        """Filesystem path of the requested regular file, or None."""
+        path = self.translate_path(self.path)
+        if os.path.isdir(path):
+            if not urllib.parse.urlsplit(self.path).path.endswith('/'):
+                return None  # let the base class redirect
+            path = os.path.join(path, 'index.html')
+        return path if os.path.isfile(path) else None
+
+    def precompressed_variant(self, path, stat):
+        """(encoding, path) of the best fresh precompressed sibling, or (None, path)."""
+        available = {}
+        for encoding, suffix in SUFFIXES.items():
+            try:
+                if os.stat(path + suffix).st_mtime_ns >= stat.st_mtime_ns:
+                    available[encoding] = path + suffix
+            except OSError:
+                continue
+        encoding = choose_encoding(self.headers.get('Accept-Encoding'), list(available))
+        return (encoding, available[encoding]) if encoding else (None, path)
+
+    def is_not_modified(self, etag, stat):
+        if 'If-None-Match' in self.headers:
+            return etag_matches(self.headers['If-None-Match'], etag)
+        if 'If-Modified-Since' in self.headers:
+            try:
+                since = email.utils.parsedate_to_datetime(self.headers['If-Modified-Since'])
+            except (TypeError, IndexError, OverflowError, ValueError):
+                return False
+            return int(stat.st_mtime) <= since.timestamp()
+        return False
+
+    def send_head(self):
+        self._body_range = None
+        path = self.resolve_file()
+        if path is None:
+            return super().send_head()
+
+        stat = os.stat(path)
+        etag = file_etag(stat)
+        if self.is_not_modified(etag, stat):
+            self.send_response(HTTPStatus.NOT_MODIFIED)
+            self.send_header('ETag', etag)
+            self.send_header('Vary', 'Accept-Encoding')
+            self.end_headers()
+            return None
+
+        byte_range = None
+        if_range = self.headers.get('If-Range')
+        if 'Range' in self.headers and (if_range is None or if_range_matches(if_range, etag, stat.st_mtime)):
+            try:
+                byte_range = parse_range(self.headers['Range'], stat.st_size)
+            except ValueError:
+                self.send_response(HTTPStatus.REQUESTED_RANGE_NOT_SATISFIABLE)
+                self.send_header('Content-Range', f'bytes */{stat.st_size}')
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+                return None
+
+        # Ranges refer to the identity bytes, so they skip the compressed siblings
+        encoding, serve_path = (None, path) if byte_range else self.precompressed_variant(path, stat)
+        try:
+            f = open(serve_path, 'rb')
+        except OSError:
+            self.send_error(HTTPStatus.NOT_FOUND, "File not found")
+            return None
+        size = os.fstat(f.fileno()).st_size
+        offset, length = byte_range or (0, size)
+        self._body_range = (offset, length)
+
+        self.send_response(HTTPStatus.PARTIAL_CONTENT if byte_range else HTTPStatus.OK)
+        self.send_header('Content-Type', self.guess_type(path))
+        self.send_header('Content-Length', str(length))
+        if byte_range:
+            self.send_header('Content-Range', f'bytes {offset}-{offset + length - 1}/{size}')
+        self.send_header('Accept-Ranges', 'bytes')
+        self.send_header('Last-Modified', self.date_time_string(stat.st_mtime))
+        self.send_header('ETag', etag)
+        self.send_header('Vary', 'Accept-Encoding')
+        if encoding:
+            self.send_header('Content-Encoding', encoding)
+        self.end_headers()
+        return f
+
+    def copyfile(self, source, outputfile):
+        if self._body_range is None:
+            # Directory listings and other generated bodies
+            return super().copyfile(source, outputfile)
+        offset, length = self._body_range
+        self._body_range = None
+        if length:
+            # Headers are already flushed (wfile is unbuffered), so hand the
+            # file straight to the socket; this falls back to send() if needed
+            self.connection.sendfile(source, offset, length)
+
+class StaticServer(ThreadingHTTPServer):
+    """One thread per connection, so a slow download does not block other clients."""
+
+    daemon_threads = True
+    request_queue_size = 64
+
+def make_server(directory, port=DEFAULT_PORT, host='localhost'):
+    handler = partial(StaticRequestHandler, directory=directory)
+    return StaticServer((host, port), handler)
+
+def serve(directory, port=DEFAULT_PORT, host='localhost'):
+    httpd = make_server(directory, port, host)
+    print(f"Serving {directory} at http://{host or 'localhost'}:{port}")
+    print("Press Ctrl+C to stop the server")
+    try:
+        httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        httpd.server_close()